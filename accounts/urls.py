@@ -6,4 +6,5 @@ app_name = 'accounts'
 
 urlpatterns = [
     path('profile/', views.profile, name='profile'),
+    path('for-you/', views.for_you, name='for_you'),
 ]
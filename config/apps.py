@@ -0,0 +1,8 @@
+from django.contrib.staticfiles.apps import (
+    StaticFilesConfig as BaseStaticFilesConfig
+)
+
+
+class StaticFilesConfig(BaseStaticFilesConfig):
+    # README screenshots and other files the site never serves
+    ignore_patterns = [*BaseStaticFilesConfig.ignore_patterns, 'docs']
@@ -0,0 +1,242 @@
+"""
+Shared cache subsystem.
+
+``cache_config()`` builds ``CACHES`` from the ``CACHE_URL`` environment
+variable:
+
+    redis://host:6379/0 or rediss://...   Redis (needs the ``redis`` package)
+    file:///var/tmp/django_cache          file-based, shared by processes
+    locmem:// or unset                    per-process memory
+
+Invalidations only reach processes sharing the backend. With locmem each
+process has its own cache, so populate workers and management commands
+can't clear what the web workers hold; anything running more than one
+process needs a shared ``CACHE_URL`` (Redis, or file on one host).
+
+App code talks to the cache through a ``Namespace``. Keys are prefixed
+with the namespace name and its current version, so ``invalidate()``
+retires every key in the namespace at once. ``get_or_compute`` adds
+probabilistic early expiration and a single-flight lock so a hot key
+expiring doesn't send every worker to the database at the same moment.
+"""
+import math
+import random
+import time
+from collections import Counter
+from urllib.parse import urlparse
+
+DEFAULT_TIMEOUT = 5 * 60
+
+# How often in-process metrics are added to the shared counters
+METRICS_FLUSH_EVERY = 100
+
+
+def cache_config(url=None):
+    """``CACHES`` setting for ``url``"""
+    parsed = urlparse(url or 'locmem://')
+    if parsed.scheme in ('redis', 'rediss'):
+        backend = {
+            'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+            'LOCATION': url,
+        }
+    elif parsed.scheme == 'file':
+        backend = {
+            'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+            'LOCATION': parsed.path,
+        }
+    elif parsed.scheme == 'locmem':
+        backend = {
+            'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+            'LOCATION': parsed.netloc or 'default',
+        }
+    else:
+        raise ValueError(f'Unsupported CACHE_URL scheme: {parsed.scheme}')
+    backend['TIMEOUT'] = DEFAULT_TIMEOUT
+    backend['KEY_PREFIX'] = 'gamereviews'
+    return {'default': backend}
+
+
+class Namespace:
+    """Versioned, metered view of the default cache for one area of the
+    app"""
+
+    def __init__(self, name, timeout=DEFAULT_TIMEOUT):
+        self.name = name
+        self.timeout = timeout
+        self.metrics = Counter()
+
+    @property
+    def backend(self):
+        from django.core.cache import cache
+        return cache
+
+    def version(self):
+        # Versions are fresh timestamps rather than a counter, so a version
+        # key evicted and recreated can't bring back an older version's
+        # entries
+        return self.backend.get_or_set(
+            f'{self.name}:version', time.time_ns, None)
+
+    def key(self, *parts, version=None):
+        if version is None:
+            version = self.version()
+        return ':'.join([self.name, f'v{version}', *map(str, parts)])
+
+    def get(self, *parts, default=None):
+        entry = self.backend.get(self.key(*parts))
+        self._record('hits' if entry is not None else 'misses')
+        return default if entry is None else entry[0]
+
+    def set(self, *parts, value, timeout=None, delta=0.0):
+        """Store ``value``; ``delta`` is how long it took to compute, used
+        by ``get_or_compute`` to decide on early refreshes"""
+        timeout = self.timeout if timeout is None else timeout
+        self.backend.set(
+            self.key(*parts), (value, delta, time.time() + timeout), timeout)
+
+    def delete(self, *parts):
+        self.backend.delete(self.key(*parts))
+
+    def delete_many(self, keys):
+        """Delete several keys, each given as a tuple of key parts"""
+        version = self.version()
+        self.backend.delete_many(
+            [self.key(*parts, version=version) for parts in keys])
+
+    def update(self, *parts, change, lock_timeout=30):
+        """Replace the cached value for ``parts`` with ``change(value)``,
+        if there is one.
+
+        The edit holds the key's lock so two workers can't each overwrite
+        the other's change. While someone else holds it the value is
+        dropped instead and rebuilt on the next read.
+        """
+        key = self.key(*parts)
+        lock_key = f'{key}:lock'
+        if not self.backend.add(lock_key, 1, lock_timeout):
+            self.backend.delete(key)
+            return
+        try:
+            entry = self.backend.get(key)
+            if entry is not None:
+                self.set(*parts, value=change(entry[0]))
+        finally:
+            self.backend.delete(lock_key)
+
+    def invalidate(self):
+        """Retire every key in the namespace by moving it to a new
+        version"""
+        self.backend.set(f'{self.name}:version', time.time_ns(), None)
+        self._record('invalidations')
+
+    def get_or_compute(self, *parts, compute, timeout=None, beta=1.0,
+                       lock_timeout=30, wait=5.0):
+        """Return the cached value for ``parts``, computing it on a miss.
+
+        Entries remember how long they took to compute. Each read may
+        treat an entry as expired a little early, more likely the closer
+        it is to expiry and the slower it is to rebuild (XFetch), so one
+        request refreshes it before it vanishes for everyone.
+
+        Only the worker holding the lock recomputes. Others serve the
+        stale value if there is one, or wait up to ``wait`` seconds for
+        the new one before computing it themselves.
+
+        Entries are ``(value, compute_seconds, expires_at)`` tuples, the
+        same shape ``set`` writes, so both can be used on one key.
+        ``compute`` reads from the primary database, never a lagging
+        replica, see ``config.db_router``.
+        """
+        from config.db_router import primary_reads
+
+        timeout = self.timeout if timeout is None else timeout
+        key = self.key(*parts)
+        entry = self.backend.get(key)
+        now = time.time()
+
+        if entry is not None:
+            value, delta, expires = entry
+            early = delta * beta * -math.log(1.0 - random.random())
+            if now + early < expires:
+                self._record('hits')
+                return value
+            self._record('early_refreshes')
+        else:
+            self._record('misses')
+
+        lock_key = f'{key}:lock'
+        acquired = self.backend.add(lock_key, 1, lock_timeout)
+        if not acquired:
+            if entry is not None:
+                self._record('stale_hits')
+                return entry[0]
+            deadline = time.time() + wait
+            while time.time() < deadline:
+                time.sleep(0.05)
+                entry = self.backend.get(key)
+                if entry is not None:
+                    self._record('waited_hits')
+                    return entry[0]
+
+        try:
+            start = time.time()
+            with primary_reads():
+                value = compute()
+            delta = time.time() - start
+            self._record('computes')
+            self.backend.set(
+                key, (value, delta, time.time() + timeout), timeout)
+        finally:
+            # A lock still held by the worker we gave up waiting for is
+            # left alone, so nobody else starts a third recompute
+            if acquired:
+                self.backend.delete(lock_key)
+        return value
+
+    def _record(self, metric):
+        self.metrics[metric] += 1
+        if sum(self.metrics.values()) >= METRICS_FLUSH_EVERY:
+            self.flush_metrics()
+
+    def flush_metrics(self):
+        """Add this process's counters to the shared ones"""
+        metrics, self.metrics = self.metrics, Counter()
+        for metric, count in metrics.items():
+            key = f'metrics:{self.name}:{metric}'
+            try:
+                self.backend.incr(key, count)
+            except ValueError:
+                self.backend.set(key, count, None)
+
+
+namespaces = {}
+
+
+def namespace(name, timeout=DEFAULT_TIMEOUT):
+    """The shared ``Namespace`` called ``name``, created on first use"""
+    if name not in namespaces:
+        namespaces[name] = Namespace(name, timeout)
+    return namespaces[name]
+
+
+def cache_metrics():
+    """Shared hit/miss counters for every namespace created in this
+    process, including counts not flushed yet"""
+    from django.core.cache import cache
+
+    metrics = {}
+    for name, ns in namespaces.items():
+        ns.flush_metrics()
+        prefix = f'metrics:{name}:'
+        keys = [prefix + metric for metric in METRIC_NAMES]
+        stored = cache.get_many(keys)
+        metrics[name] = {
+            key[len(prefix):]: count for key, count in stored.items()
+        }
+    return metrics
+
+
+METRIC_NAMES = (
+    'hits', 'misses', 'computes', 'early_refreshes', 'stale_hits',
+    'waited_hits', 'invalidations',
+)
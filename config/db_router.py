@@ -0,0 +1,135 @@
+"""
+Primary/replica database routing.
+
+Writes, migrations and every read not explicitly marked go to the
+``default`` (primary) database. Views wrapped in ``read_from_replica``
+send their GET/HEAD reads, including those made while rendering the
+template and context processors, to the ``replica`` alias when one is
+configured and reachable.
+
+After a user sends any POST/PUT/PATCH/DELETE, a short-lived cookie keeps
+their reads on the primary so they see their own comment or review even
+if the replica is lagging.
+
+Cached values are computed inside ``primary_reads``. The caches are
+cleared when the primary commits, and a replica still behind at that
+moment would otherwise put the old rows back for the cache's whole
+timeout. Only cache misses pay for reading the primary.
+"""
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import wraps
+from django.conf import settings
+from django.db import connections
+from django.db.utils import DatabaseError
+
+REPLICA_ALIAS = 'replica'
+STICKY_COOKIE = 'db_primary'
+
+_use_replica = ContextVar('use_replica', default=False)
+_replica_down_until = 0.0
+
+
+def replica_configured():
+    return REPLICA_ALIAS in settings.DATABASES
+
+
+def replica_available():
+    """Whether the replica can take reads right now.
+
+    A failed connection attempt takes it out of rotation for
+    REPLICA_RETRY_SECONDS instead of failing every request.
+    """
+    global _replica_down_until
+    if not replica_configured():
+        return False
+    if time.monotonic() < _replica_down_until:
+        return False
+    try:
+        connections[REPLICA_ALIAS].ensure_connection()
+    except DatabaseError:
+        _replica_down_until = (
+            time.monotonic() + getattr(settings, 'REPLICA_RETRY_SECONDS', 30)
+        )
+        return False
+    return True
+
+
+@contextmanager
+def replica_reads():
+    """Route reads inside the block to the replica when it is usable"""
+    token = _use_replica.set(replica_available())
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+@contextmanager
+def primary_reads():
+    """Route reads inside the block to the primary, e.g. to fill a cache
+    that is invalidated on commit"""
+    token = _use_replica.set(False)
+    try:
+        yield
+    finally:
+        _use_replica.reset(token)
+
+
+def read_from_replica(view):
+    """Serve a read-only public view from the replica.
+
+    Unsafe methods and users who recently wrote something stay on the
+    primary. Template responses are rendered inside the block so lazy
+    querysets and context processors are routed too.
+    """
+    @wraps(view)
+    def wrapped(request, *args, **kwargs):
+        if (request.method not in ('GET', 'HEAD')
+                or STICKY_COOKIE in request.COOKIES
+                or not replica_configured()):
+            return view(request, *args, **kwargs)
+        with replica_reads():
+            response = view(request, *args, **kwargs)
+            if hasattr(response, 'render') and callable(response.render):
+                response.render()
+        return response
+    return wrapped
+
+
+class PrimaryReplicaRouter:
+    def db_for_read(self, model, **hints):
+        if _use_replica.get():
+            return REPLICA_ALIAS
+        return 'default'
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Both aliases hold the same data
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # The replica gets its schema through replication
+        return db == 'default'
+
+
+class StickyPrimaryMiddleware:
+    """Pin a client's reads to the primary for a few seconds after it
+    writes, so it reads its own writes"""
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (replica_configured()
+                and request.method not in ('GET', 'HEAD', 'OPTIONS')):
+            response.set_cookie(
+                STICKY_COOKIE, '1',
+                max_age=getattr(settings, 'REPLICA_STICKY_SECONDS', 10),
+                httponly=True, samesite='Lax',
+            )
+        return response
@@ -13,6 +13,7 @@ https://docs.djangoproject.com/en/5.2/ref/settings/
 from pathlib import Path
 import os
 import dj_database_url
+from config.cache import cache_config
 if os.path.isfile('env.py'):
     import env
 
@@ -38,7 +39,7 @@ INSTALLED_APPS = [
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
-    'django.contrib.staticfiles',
+    'config.apps.StaticFilesConfig',
     'django.contrib.sites',
     'allauth',
     'allauth.account',
@@ -71,6 +72,7 @@ MIDDLEWARE = [
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
     'allauth.account.middleware.AccountMiddleware',
+    'config.db_router.StickyPrimaryMiddleware',
 ]
 
 ROOT_URLCONF = 'config.urls'
@@ -108,10 +110,44 @@ WSGI_APPLICATION = 'config.wsgi.application'
 #     }
 # }
 
+# Connections are kept open between requests and checked before reuse
+DB_CONN_MAX_AGE = int(os.environ.get("DB_CONN_MAX_AGE", 60))
+
 DATABASES = {
-    'default': dj_database_url.parse(os.environ.get("DATABASE_URL"))
+    'default': dj_database_url.parse(
+        os.environ.get("DATABASE_URL"),
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=True,
+    )
 }
 
+# Optional read replica for public pages, see config/db_router.py.
+# For local testing point REPLICA_DATABASE_URL at a second SQLite file or
+# Postgres database holding a copy of the primary.
+if os.environ.get("REPLICA_DATABASE_URL"):
+    DATABASES['replica'] = dj_database_url.parse(
+        os.environ.get("REPLICA_DATABASE_URL"),
+        conn_max_age=DB_CONN_MAX_AGE,
+        conn_health_checks=True,
+        test_options={'MIRROR': 'default'},
+    )
+
+DATABASE_ROUTERS = ['config.db_router.PrimaryReplicaRouter']
+
+# Seconds a client reads from the primary after writing, and seconds an
+# unreachable replica is skipped before it is tried again
+REPLICA_STICKY_SECONDS = 10
+REPLICA_RETRY_SECONDS = 30
+
+# Longest a web worker may spend importing config.wsgi and the URLconf,
+# checked by the import_profile command
+STARTUP_IMPORT_BUDGET_MS = 1000
+
+# Cache backend from CACHE_URL (redis://, file:// or locmem://), see
+# config/cache.py. locmem is per process: set a shared CACHE_URL whenever
+# populate workers, management commands or several web workers run, or
+# their cache invalidations won't reach each other.
+CACHES = cache_config(os.environ.get("CACHE_URL"))
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -156,6 +192,37 @@ STATIC_URL = 'static/'
 STATICFILES_DIRS = [os.path.join(BASE_DIR, 'static')]
 STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
 
+# Hashed, gzip/Brotli-compressed static files with page script bundles,
+# see config/storage.py
+STORAGES = {
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'config.storage.StaticStorage',
+    },
+}
+
+# Scripts each page loads, built into js/<name>.bundle.js by collectstatic
+STATIC_BUNDLES = {
+    'review_detail': [
+        'js/user_comments.js',
+        'js/user_reviews.js',
+        'js/review_threads.js',
+        'js/review_detail.js',
+    ],
+    'approve_comments': ['js/utils.js', 'js/approve_comments.js'],
+    'approve_reviews': ['js/utils.js', 'js/approve_reviews.js'],
+    'populate_reviews': ['js/utils.js', 'js/populate_reviews.js'],
+    'populate_developers': ['js/utils.js', 'js/populate_developers.js'],
+    'populate_publishers': ['js/utils.js', 'js/populate_publishers.js'],
+    'populate_job': ['js/populate_job.js'],
+}
+
+# Largest gzipped size in bytes a bundle or stylesheet may reach before
+# static_size_report fails
+STATIC_SIZE_BUDGET = 8 * 1024
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
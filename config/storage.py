@@ -0,0 +1,48 @@
+"""
+Static files storage and page script bundles.
+
+``collectstatic`` with ``StaticStorage`` first writes one bundle per entry
+in ``STATIC_BUNDLES``: the page's scripts concatenated and minified. Then
+every file, bundles included, gets a content hash in its name plus gzip
+and Brotli variants (Brotli needs the ``Brotli`` package). WhiteNoise
+serves the hashed names with far-future ``immutable`` cache headers.
+
+Templates load a page's scripts with ``{% js_bundle 'name' %}``, which
+emits the single bundle, or the separate source files when DEBUG is on
+so they can be edited without re-running collectstatic.
+"""
+from django.conf import settings
+from django.core.files.base import ContentFile
+from whitenoise.storage import CompressedManifestStaticFilesStorage
+
+
+def bundle_path(name):
+    return f'js/{name}.bundle.js'
+
+
+def minify_js(source):
+    from rjsmin import jsmin
+    return jsmin(source)
+
+
+class StaticStorage(CompressedManifestStaticFilesStorage):
+
+    def post_process(self, paths, dry_run=False, **options):
+        if not dry_run:
+            for name, sources in settings.STATIC_BUNDLES.items():
+                path = bundle_path(name)
+                self.save_bundle(path, sources)
+                paths[path] = (self, path)
+        yield from super().post_process(paths, dry_run=dry_run, **options)
+
+    def save_bundle(self, path, sources):
+        """Write the minified concatenation of ``sources`` to ``path``"""
+        parts = []
+        for source in sources:
+            with self.open(source) as f:
+                parts.append(minify_js(f.read().decode('utf-8')))
+        if self.exists(path):
+            self.delete(path)
+        # Each file is a separate classic script on the unbundled page, so
+        # terminate every one in case it ends without a semicolon
+        self._save(path, ContentFile(';\n'.join(parts).encode('utf-8')))
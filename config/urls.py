@@ -31,6 +31,8 @@ urlpatterns = [
     path('publishers/', include('publisher.urls')),
     path('reviews/', include('reviews.urls'), name='reviews-urls'),
     path('summernote/', include('django_summernote.urls')),
+    path('api/', include('reviews.api_urls')),
+    path('', include('reviews.sitemap_urls')),
     path('accounts/', include(('accounts.urls', 'accounts'),
                               namespace='accounts')),
 ]
@@ -1,9 +1,17 @@
+from django.db.models import Count
+from config.cache import namespace
 from .models import Developer
 
+navigation_cache = namespace('navigation')
+
 
 def developers_context(request):
     # Only show developers that have associated games
-    developers_with_games = [
-        dev for dev in Developer.objects.all() if dev.games_count > 0
-    ]
+    developers_with_games = navigation_cache.get_or_compute(
+        'developers',
+        compute=lambda: list(
+            Developer.objects.annotate(num_games=Count('games'))
+            .filter(num_games__gt=0)
+        ),
+    )
     return {'all_developers': developers_with_games}
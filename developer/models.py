@@ -1,5 +1,6 @@
 from django.db import models
 from cloudinary.models import CloudinaryField
+from reviews.html import store_rendered_html
 
 # Create your models here.
 
@@ -7,9 +8,14 @@ from cloudinary.models import CloudinaryField
 class Developer(models.Model):
     name = models.CharField(max_length=200, unique=True)
     slug = models.SlugField(max_length=200, unique=True, blank=True)
+    igdb_id = models.PositiveIntegerField(unique=True, blank=True, null=True)
     founded_year = models.IntegerField(blank=True, null=True)
     website = models.URLField(blank=True)
     description = models.TextField(blank=True)
+    # Sanitized copy of description and its plain-text start for cards,
+    # filled in by save()
+    description_html = models.TextField(blank=True, editable=False)
+    excerpt = models.TextField(blank=True, editable=False)
     logo = CloudinaryField('image', default='placeholder')
     created_on = models.DateTimeField(auto_now_add=True)
     updated_on = models.DateTimeField(auto_now=True)
@@ -24,6 +30,9 @@ class Developer(models.Model):
         from django.utils.text import slugify
         if not self.slug:
             self.slug = slugify(self.name)
+        kwargs['update_fields'] = store_rendered_html(
+            self, {'description': 'description_html'},
+            kwargs.get('update_fields'))
         super().save(*args, **kwargs)
 
     @property
@@ -1,3 +1,48 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from reviews.tests.utils import company, make_review, plain_static
+from .models import Developer
+from .views import unused_developers
 
-# Create your tests here.
+
+class UnusedDeveloperTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review = make_review('Lead Game', developer='Lead')
+            self.review.developers.add(company(Developer, 'Co-developer'))
+            company(Developer, 'Idle')
+            company(Developer, 'Retired')
+
+    def test_unused_excludes_credited_developers(self):
+        self.assertEqual(
+            sorted(unused_developers().values_list('name', flat=True)),
+            ['Idle', 'Retired'])
+
+    def test_delete_unused(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('developer:populate_interface'),
+                {'action': 'delete_unused'})
+        self.assertRedirects(
+            response, reverse('developer:populate_interface'),
+            fetch_redirect_response=False)
+        self.assertEqual(
+            sorted(Developer.objects.values_list('name', flat=True)),
+            ['Co-developer', 'Lead'])
+        self.assertFalse(unused_developers().exists())
+
+    @plain_static
+    def test_listing_counts_match_cleanup(self):
+        response = self.client.get(reverse('developer:populate_interface'))
+        rows = {developer.name: developer
+                for developer in response.context['existing_developers']}
+        credited = rows['Co-developer']
+        self.assertEqual((credited.num_games, credited.num_credits), (0, 1))
+        self.assertContains(response, '+ 1 credited')
+        self.assertEqual(
+            {name for name, developer in rows.items()
+             if not (developer.num_games or developer.num_credits)},
+            set(unused_developers().values_list('name', flat=True)))
@@ -1,11 +1,16 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.db.models import Count
+from django.utils.decorators import method_decorator
 from django.views import generic
 from .models import Developer
-from reviews.models import Review
+from django.core.paginator import Paginator
+from config.db_router import read_from_replica
+from reviews.listings import LISTING_PAGE_SIZE, card_reviews, listing_ids
 
 # Create your views here.
 
 
+@method_decorator(read_from_replica, name='dispatch')
 class DeveloperList(generic.ListView):
     """List all developers with pagination"""
     model = Developer
@@ -29,17 +34,40 @@ class DeveloperList(generic.ListView):
         return queryset
 
 
+@read_from_replica
 def developer_games(request, slug):
-    """Show all games (reviews) by a specific developer"""
+    """Show the games (reviews) by a specific developer, a page at a time"""
     developer = get_object_or_404(Developer, slug=slug)
-    games = Review.objects.filter(developer=developer, is_published=True)
+    paginator = Paginator(
+        listing_ids('developer', developer.pk, 'newest'), LISTING_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.object_list = card_reviews(page_obj.object_list)
 
     return render(request, 'developer/developer_games.html', {
         'developer': developer,
-        'games': games
+        'games': page_obj,
+        'page_obj': page_obj,
+        'paginator': paginator,
+        'is_paginated': page_obj.has_other_pages(),
     })
 
 
+def with_game_counts(queryset):
+    """Annotate each developer with its games and its co-development
+    credits on other games"""
+    return queryset.annotate(
+        num_games=Count('games', distinct=True),
+        num_credits=Count('credited_reviews', distinct=True),
+    )
+
+
+def unused_developers():
+    """Developers with no games and no co-development credits, found in one
+    query"""
+    return with_game_counts(Developer.objects.all()).filter(
+        num_games=0, num_credits=0)
+
+
 def populate_interface(request):
     """Developer populate interface with bulk actions"""
     from django.contrib import messages
@@ -75,18 +103,28 @@ def populate_interface(request):
                 redirect_url += f'?page={current_page}'
             return redirect(redirect_url)
 
+        elif action == 'preview_unused':
+            unused = unused_developers().order_by('name')
+            count = unused.count()
+            if count > 0:
+                names = ', '.join(
+                    unused.values_list('name', flat=True)[:10]
+                )
+                more = f' and {count - 10} more' if count > 10 else ''
+                messages.info(
+                    request,
+                    f'{count} unused developer(s) would be deleted: '
+                    f'{names}{more}'
+                )
+            else:
+                messages.info(request, 'No unused developers found')
+            return redirect('developer:populate_interface')
+
         elif action == 'delete_unused':
             try:
-                # Find developers with 0 games
-                unused_developers = [
-                    dev for dev in Developer.objects.all()
-                    if dev.games_count == 0
-                ]
-                count = len(unused_developers)
+                _, deleted = unused_developers().delete()
+                count = deleted.get(Developer._meta.label, 0)
                 if count > 0:
-                    Developer.objects.filter(
-                        id__in=[dev.id for dev in unused_developers]
-                    ).delete()
                     messages.success(
                         request,
                         f'Successfully deleted {count} unused developer(s)'
@@ -100,9 +138,9 @@ def populate_interface(request):
             return redirect('developer:populate_interface')
 
     # Get existing developers and add pagination
-    existing_developers_queryset = Developer.objects.all().order_by(
-        '-created_on'
-    )
+    # The same counts "Delete Unused" goes by
+    existing_developers_queryset = with_game_counts(
+        Developer.objects.order_by('-created_on'))
     paginator = Paginator(existing_developers_queryset, 50)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
@@ -1,33 +1,28 @@
 from django.shortcuts import render
 from django.core.paginator import Paginator
-from reviews.models import Review
-from datetime import timedelta
-from django.utils import timezone
+from config.db_router import read_from_replica
+from reviews.featured import featured_slots
+from reviews.listings import card_reviews
+from reviews.recent import (
+    RECENT_WINDOWS, parse_recent_days, recent_review_ids
+)
 
 
+@read_from_replica
 def home_view(request):
-    # Get the days filter parameter, default to 7 days
-    days_filter = int(request.GET.get('days', 7))
+    # Only the supported ranges are accepted; anything else shows 7 days
+    days_filter = parse_recent_days(request.GET.get('days'))
 
-    # Calculate the date threshold based on the filter
-    filter_date = timezone.now() - timedelta(days=days_filter)
-
-    # Filter reviews based on the selected time period
-    review_queryset = Review.objects.filter(
-        is_published=True, review_date__gte=filter_date
-    ).order_by('-review_date')
-
-    # Pagination for recent reviews
-    paginator = Paginator(review_queryset, 16)  # 16 reviews per page
+    # Paginate the cached id list, then load just this page's reviews
+    paginator = Paginator(recent_review_ids(days_filter), 16)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
+    page_obj.object_list = card_reviews(page_obj.object_list)
 
     # Check if pagination is needed
     is_paginated = paginator.num_pages > 1
 
-    featured_reviews = Review.objects.filter(
-        is_featured=True, is_published=True
-    )
+    featured_reviews = featured_slots()
 
     context = {
         'review_list': page_obj,
@@ -36,5 +31,6 @@ def home_view(request):
         'page_obj': page_obj,
         'paginator': paginator,
         'days_filter': days_filter,
+        'recent_windows': RECENT_WINDOWS,
     }
     return render(request, 'home/index.html', context)
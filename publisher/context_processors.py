@@ -1,9 +1,17 @@
+from django.db.models import Count
+from config.cache import namespace
 from .models import Publisher
 
+navigation_cache = namespace('navigation')
+
 
 def publishers_context(request):
     # Only show publishers that have associated games
-    publishers_with_games = [
-        pub for pub in Publisher.objects.all() if pub.games_count > 0
-    ]
+    publishers_with_games = navigation_cache.get_or_compute(
+        'publishers',
+        compute=lambda: list(
+            Publisher.objects.annotate(num_games=Count('reviews'))
+            .filter(num_games__gt=0)
+        ),
+    )
     return {'all_publishers': publishers_with_games}
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('publisher', '0004_publisher_description_html_excerpt'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='publisher',
+            name='igdb_id',
+            field=models.PositiveIntegerField(blank=True, null=True, unique=True),
+        ),
+    ]
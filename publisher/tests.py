@@ -1,3 +1,48 @@
+from django.core.cache import cache
 from django.test import TestCase
+from django.urls import reverse
+from reviews.tests.utils import company, make_review, plain_static
+from .models import Publisher
+from .views import unused_publishers
 
-# Create your tests here.
+
+class UnusedPublisherTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review = make_review('Lead Game', publisher='Label')
+            self.review.publishers.add(company(Publisher, 'Co-publisher'))
+            company(Publisher, 'Idle')
+            company(Publisher, 'Retired')
+
+    def test_unused_excludes_credited_publishers(self):
+        self.assertEqual(
+            sorted(unused_publishers().values_list('name', flat=True)),
+            ['Idle', 'Retired'])
+
+    def test_delete_unused(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            response = self.client.post(
+                reverse('publisher:populate_interface'),
+                {'action': 'delete_unused'})
+        self.assertRedirects(
+            response, reverse('publisher:populate_interface'),
+            fetch_redirect_response=False)
+        self.assertEqual(
+            sorted(Publisher.objects.values_list('name', flat=True)),
+            ['Co-publisher', 'Label'])
+        self.assertFalse(unused_publishers().exists())
+
+    @plain_static
+    def test_listing_counts_match_cleanup(self):
+        response = self.client.get(reverse('publisher:populate_interface'))
+        rows = {publisher.name: publisher
+                for publisher in response.context['existing_publishers']}
+        credited = rows['Co-publisher']
+        self.assertEqual((credited.num_games, credited.num_credits), (0, 1))
+        self.assertContains(response, '+ 1 credited')
+        self.assertEqual(
+            {name for name, publisher in rows.items()
+             if not (publisher.num_games or publisher.num_credits)},
+            set(unused_publishers().values_list('name', flat=True)))
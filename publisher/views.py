@@ -1,11 +1,16 @@
 from django.shortcuts import render, get_object_or_404, redirect
+from django.db.models import Count
+from django.utils.decorators import method_decorator
 from django.views import generic
 from .models import Publisher
-from reviews.models import Review
+from django.core.paginator import Paginator
+from config.db_router import read_from_replica
+from reviews.listings import LISTING_PAGE_SIZE, card_reviews, listing_ids
 
 # Create your views here.
 
 
+@method_decorator(read_from_replica, name='dispatch')
 class PublisherList(generic.ListView):
     """List all publishers with pagination"""
     model = Publisher
@@ -29,17 +34,40 @@ class PublisherList(generic.ListView):
         return queryset
 
 
+@read_from_replica
 def publisher_games(request, slug):
-    """Show all games (reviews) by a specific publisher"""
+    """Show the games (reviews) by a specific publisher, a page at a time"""
     publisher = get_object_or_404(Publisher, slug=slug)
-    games = Review.objects.filter(publisher=publisher, is_published=True)
+    paginator = Paginator(
+        listing_ids('publisher', publisher.pk, 'newest'), LISTING_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.object_list = card_reviews(page_obj.object_list)
 
     return render(request, 'publisher/publisher_games.html', {
         'publisher': publisher,
-        'games': games
+        'games': page_obj,
+        'page_obj': page_obj,
+        'paginator': paginator,
+        'is_paginated': page_obj.has_other_pages(),
     })
 
 
+def with_game_counts(queryset):
+    """Annotate each publisher with its games and its co-publishing
+    credits on other games"""
+    return queryset.annotate(
+        num_games=Count('reviews', distinct=True),
+        num_credits=Count('credited_reviews', distinct=True),
+    )
+
+
+def unused_publishers():
+    """Publishers with no games and no co-publishing credits, found in one
+    query"""
+    return with_game_counts(Publisher.objects.all()).filter(
+        num_games=0, num_credits=0)
+
+
 def populate_interface(request):
     """Publisher populate interface with bulk actions"""
     from django.contrib import messages
@@ -75,18 +103,28 @@ def populate_interface(request):
                 redirect_url += f'?page={current_page}'
             return redirect(redirect_url)
 
+        elif action == 'preview_unused':
+            unused = unused_publishers().order_by('name')
+            count = unused.count()
+            if count > 0:
+                names = ', '.join(
+                    unused.values_list('name', flat=True)[:10]
+                )
+                more = f' and {count - 10} more' if count > 10 else ''
+                messages.info(
+                    request,
+                    f'{count} unused publisher(s) would be deleted: '
+                    f'{names}{more}'
+                )
+            else:
+                messages.info(request, 'No unused publishers found')
+            return redirect('publisher:populate_interface')
+
         elif action == 'delete_unused':
             try:
-                # Find publishers with 0 games
-                unused_publishers = [
-                    pub for pub in Publisher.objects.all()
-                    if pub.games_count == 0
-                ]
-                count = len(unused_publishers)
+                _, deleted = unused_publishers().delete()
+                count = deleted.get(Publisher._meta.label, 0)
                 if count > 0:
-                    Publisher.objects.filter(
-                        id__in=[pub.id for pub in unused_publishers]
-                    ).delete()
                     messages.success(
                         request,
                         f'Successfully deleted {count} unused publisher(s)'
@@ -100,9 +138,9 @@ def populate_interface(request):
             return redirect('publisher:populate_interface')
 
     # Get existing publishers and add pagination
-    existing_publishers_queryset = Publisher.objects.all().order_by(
-        '-created_on'
-    )
+    # The same counts "Delete Unused" goes by
+    existing_publishers_queryset = with_game_counts(
+        Publisher.objects.order_by('-created_on'))
     paginator = Paginator(existing_publishers_queryset, 50)
     page_number = request.GET.get('page')
     page_obj = paginator.get_page(page_number)
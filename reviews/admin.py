@@ -1,8 +1,13 @@
 from django.contrib import admin
 from django_summernote.admin import SummernoteModelAdmin
-from django.core.management import call_command
 from django.contrib import messages
-from .models import Review, Publisher, Developer, UserComment, UserReview
+from .models import (
+    Review, Publisher, Developer, UserComment, UserReview, FranchiseCursor,
+    PopulateJob, PopulateJobResult, Platform, SyncWatermark
+)
+from .detail import clear_review_details
+from .populate_jobs import queue_auto_generate
+from .signals import clear_review_caches, refresh_similar_games
 # Register your models here.
 
 
@@ -65,45 +70,57 @@ class ReviewAdmin(SummernoteModelAdmin):
     ]
 
     def mark_as_published(self, request, queryset):
+        review_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_published=True)
+        clear_review_caches()
+        refresh_similar_games(*review_ids)
         self.message_user(request, f'{updated} reviews marked as published.')
     mark_as_published.short_description = "Mark selected reviews as published"
 
     def mark_as_unpublished(self, request, queryset):
+        review_ids = list(queryset.values_list('pk', flat=True))
         updated = queryset.update(is_published=False)
+        clear_review_caches()
+        refresh_similar_games(*review_ids)
         self.message_user(request, f'{updated} reviews marked as unpublished.')
     mark_as_unpublished.short_description = "Mark selected as unpublished"
 
     def mark_as_featured(self, request, queryset):
         updated = queryset.update(is_featured=True)
+        clear_review_caches()
         self.message_user(request, f'{updated} reviews marked as featured.')
     mark_as_featured.short_description = "Mark selected reviews as featured"
 
     def mark_as_unfeatured(self, request, queryset):
         updated = queryset.update(is_featured=False)
+        clear_review_caches()
         self.message_user(request, f'{updated} reviews unmarked as featured.')
     mark_as_unfeatured.short_description = "Mark selected as not featured"
 
     def auto_generate_reviews(self, request, queryset):
-        """Generate 50 new reviews using the auto_generate_reviews command"""
-        try:
-            call_command('auto_generate_reviews', count=50)
-            messages.success(
-                request,
-                'Auto-generate reviews command executed successfully! '
-                'Check the review list to see new reviews.'
-            )
-        except Exception as e:
-            messages.error(
-                request,
-                f'Error running auto-generate reviews: {str(e)}'
-            )
+        """Queue a populate job generating 50 new reviews"""
+        job = queue_auto_generate(request.user, 50)
+        messages.success(
+            request,
+            f'Queued auto-generation of 50 reviews as populate job '
+            f'#{job.pk}. Track it under populate jobs.'
+        )
     auto_generate_reviews.short_description = "Auto-generate 50 new reviews"
 
 
+@admin.register(Platform)
+class PlatformAdmin(admin.ModelAdmin):
+    list_display = ('name', 'abbreviation', 'igdb_id')
+    search_fields = ('name', 'abbreviation')
+    prepopulated_fields = {'slug': ('name',)}
+    ordering = ('name',)
+    list_per_page = 25
+
+
 @admin.register(UserComment)
 class UserCommentAdmin(admin.ModelAdmin):
     list_display = ('author', 'body', 'review', 'created_on', 'approved')
+    list_select_related = ('author', 'review')
     list_filter = ('approved', 'created_on')
     search_fields = ('author__username', 'body')
     date_hierarchy = 'created_on'
@@ -113,12 +130,14 @@ class UserCommentAdmin(admin.ModelAdmin):
 
     def approve_comments(self, request, queryset):
         queryset.update(approved=True)
+        clear_review_details()
     approve_comments.short_description = "Mark selected comments as approved"
 
 
 @admin.register(UserReview)
 class UserReviewAdmin(admin.ModelAdmin):
     list_display = ('user', 'game', 'rating', 'created_on', 'approved')
+    list_select_related = ('user', 'game')
     list_filter = ('rating', 'approved', 'created_on')
     search_fields = ('user__username', 'game__title', 'review_text')
     date_hierarchy = 'created_on'
@@ -128,4 +147,53 @@ class UserReviewAdmin(admin.ModelAdmin):
 
     def approve_reviews(self, request, queryset):
         queryset.update(approved=True)
+        clear_review_details()
     approve_reviews.short_description = "Mark selected reviews as approved"
+
+
+@admin.register(FranchiseCursor)
+class FranchiseCursorAdmin(admin.ModelAdmin):
+    list_display = ('search_term', 'offset', 'exhausted', 'updated_on')
+    list_filter = ('exhausted',)
+    search_fields = ('search_term',)
+    ordering = ('search_term',)
+    actions = ['reopen_franchises']
+
+    def reopen_franchises(self, request, queryset):
+        updated = queryset.update(offset=0, exhausted=False)
+        self.message_user(request, f'{updated} franchise(s) reopened.')
+    reopen_franchises.short_description = "Restart paging for selected"
+
+
+@admin.register(SyncWatermark)
+class SyncWatermarkAdmin(admin.ModelAdmin):
+    list_display = ('endpoint', 'synced_until', 'updated_on')
+    actions = ['resync_from_scratch']
+
+    def resync_from_scratch(self, request, queryset):
+        updated = queryset.update(synced_until=None)
+        self.message_user(
+            request, f'{updated} endpoint(s) will be fully re-synced.')
+    resync_from_scratch.short_description = "Compare every row next sync"
+
+
+class PopulateJobResultInline(admin.TabularInline):
+    model = PopulateJobResult
+    extra = 0
+    fields = ('position', 'title', 'outcome', 'message', 'review')
+    readonly_fields = fields
+    can_delete = False
+
+
+@admin.register(PopulateJob)
+class PopulateJobAdmin(admin.ModelAdmin):
+    list_display = (
+        'id', 'kind', 'status', 'total', 'created_count', 'skipped_count',
+        'error_count', 'created_by', 'created_on'
+    )
+    list_filter = ('kind', 'status', 'created_on')
+    date_hierarchy = 'created_on'
+    ordering = ('-created_on',)
+    list_per_page = 25
+    exclude = ('items',)
+    inlines = [PopulateJobResultInline]
@@ -1,95 +1,130 @@
-from django.shortcuts import render
+from django.shortcuts import render, redirect
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib import messages
+from django.urls import reverse
+from django.utils.http import urlencode
+from .detail import clear_review_details
 from .models import UserComment, UserReview
+from .moderation import comment_queue, review_queue, moderation_filters
+
+
+def moderation_redirect(url_name, filters):
+    """Redirect back to a moderation queue keeping the active filter"""
+    url = reverse(url_name)
+    if filters:
+        url += f'?{urlencode(filters)}'
+    return redirect(url)
+
+
+def moderation_context(queue, request, filters):
+    """Context shared by both moderation queues"""
+    pending, next_cursor = queue.page(
+        filters, approved=False, cursor=request.GET.get('cursor'))
+    recent_approved, _ = queue.page(filters, approved=True)
+    counts = queue.counts()
+    return {
+        'pending': pending,
+        'recent_approved': recent_approved[:10],
+        'next_cursor': next_cursor,
+        'is_first_page': not request.GET.get('cursor'),
+        'filters': filters,
+        'filter_query': urlencode(filters),
+        'matching_count': (
+            queue.matching(filters).count() if filters
+            else counts['pending']
+        ),
+        'total_unapproved': counts['pending'],
+        'total_approved': counts['approved'],
+    }
 
 
 @user_passes_test(lambda u: u.is_superuser)
 def approve_comments(request):
     """View for approving user comments"""
+    filters = moderation_filters(request.POST or request.GET)
+
     if request.method == 'POST':
         action = request.POST.get('action')
 
         if action in ['approve', 'reject']:
             comment_ids = request.POST.getlist('comment_ids')
             if action == 'approve':
-                UserComment.objects.filter(id__in=comment_ids).update(
-                    approved=True)
-                messages.success(
-                    request, f'Approved {len(comment_ids)} comment(s)')
+                count = UserComment.objects.filter(
+                    id__in=comment_ids).update(approved=True)
+                clear_review_details()
+                messages.success(request, f'Approved {count} comment(s)')
             elif action == 'reject':
-                UserComment.objects.filter(id__in=comment_ids).delete()
-                messages.success(
-                    request, f'Deleted {len(comment_ids)} comment(s)')
+                count, _ = UserComment.objects.filter(
+                    id__in=comment_ids).delete()
+                messages.success(request, f'Deleted {count} comment(s)')
+
+        elif action == 'approve_matching':
+            count = comment_queue.approve_matching(filters)
+            clear_review_details()
+            messages.success(
+                request, f'Approved {count} matching comment(s)')
+
+        elif action == 'reject_matching':
+            count = comment_queue.delete_matching(filters)
+            messages.success(
+                request, f'Deleted {count} matching comment(s)')
 
         elif action == 'delete_approved':
             approved_comment_ids = request.POST.getlist('approved_comment_ids')
             if approved_comment_ids:
-                UserComment.objects.filter(
+                count, _ = UserComment.objects.filter(
                     id__in=approved_comment_ids).delete()
                 messages.success(
-                    request,
-                    f'Deleted {len(approved_comment_ids)} approved comment(s)')
-
-    # Get all unapproved comments
-    unapproved_comments = UserComment.objects.filter(
-        approved=False
-    ).order_by('-created_on')
-
-    # Get recently approved comments for reference
-    recent_approved = UserComment.objects.filter(
-        approved=True
-    ).order_by('-created_on')[:10]
-
-    context = {
-        'unapproved_comments': unapproved_comments,
-        'recent_approved': recent_approved,
-        'total_unapproved': unapproved_comments.count(),
-    }
+                    request, f'Deleted {count} approved comment(s)')
+
+        return moderation_redirect('reviews:approve_comments', filters)
 
+    context = moderation_context(comment_queue, request, filters)
+    context['unapproved_comments'] = context['pending']
     return render(request, 'reviews/approve_comments.html', context)
 
 
 @user_passes_test(lambda u: u.is_superuser)
 def approve_reviews(request):
     """View for approving user reviews"""
+    filters = moderation_filters(request.POST or request.GET)
+
     if request.method == 'POST':
         action = request.POST.get('action')
 
         if action in ['approve', 'reject']:
             review_ids = request.POST.getlist('review_ids')
             if action == 'approve':
-                UserReview.objects.filter(id__in=review_ids).update(
-                    approved=True)
-                messages.success(
-                    request, f'Approved {len(review_ids)} review(s)')
+                count = UserReview.objects.filter(
+                    id__in=review_ids).update(approved=True)
+                clear_review_details()
+                messages.success(request, f'Approved {count} review(s)')
             elif action == 'reject':
-                UserReview.objects.filter(id__in=review_ids).delete()
-                messages.success(
-                    request, f'Deleted {len(review_ids)} review(s)')
+                count, _ = UserReview.objects.filter(
+                    id__in=review_ids).delete()
+                messages.success(request, f'Deleted {count} review(s)')
+
+        elif action == 'approve_matching':
+            count = review_queue.approve_matching(filters)
+            clear_review_details()
+            messages.success(
+                request, f'Approved {count} matching review(s)')
+
+        elif action == 'reject_matching':
+            count = review_queue.delete_matching(filters)
+            messages.success(
+                request, f'Deleted {count} matching review(s)')
 
         elif action == 'delete_approved':
             approved_review_ids = request.POST.getlist('approved_review_ids')
             if approved_review_ids:
-                UserReview.objects.filter(id__in=approved_review_ids).delete()
+                count, _ = UserReview.objects.filter(
+                    id__in=approved_review_ids).delete()
                 messages.success(
-                    request,
-                    f'Deleted {len(approved_review_ids)} approved review(s)')
-
-    # Get all unapproved reviews
-    unapproved_reviews = UserReview.objects.filter(
-        approved=False
-    ).order_by('-created_on')
-
-    # Get recently approved reviews for reference
-    recent_approved = UserReview.objects.filter(
-        approved=True
-    ).order_by('-created_on')[:10]
-
-    context = {
-        'unapproved_reviews': unapproved_reviews,
-        'recent_approved': recent_approved,
-        'total_unapproved': unapproved_reviews.count(),
-    }
+                    request, f'Deleted {count} approved review(s)')
+
+        return moderation_redirect('reviews:approve_reviews', filters)
 
+    context = moderation_context(review_queue, request, filters)
+    context['unapproved_reviews'] = context['pending']
     return render(request, 'reviews/approve_reviews.html', context)
@@ -0,0 +1,308 @@
+"""
+Read-only JSON API over reviews, developers, publishers and genres.
+
+    GET /api/<resource>/              a page of rows, ordered by id
+    GET /api/<resource>/?ids=3,1,2    those rows, in that order
+    GET /api/<resource>/<id>/         one row
+
+``?fields=a,b`` picks the attributes returned; the query only loads the
+columns and relations those fields need. Pages are keyset-paginated:
+pass the ``next_cursor`` of one page as ``?cursor=`` for the next.
+
+Response bodies are cached per URL until a row changes (see
+``reviews.signals``) and carry a strong ETag, so a revalidation that
+still matches is answered with 304 Not Modified without touching the
+database. Bodies carry absolute links, so the cache key includes the
+scheme and host.
+"""
+import hashlib
+import json
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Count, Q
+from django.http import HttpResponse, JsonResponse
+from django.urls import reverse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.views.decorators.http import require_GET
+from config.cache import namespace
+from config.db_router import primary_reads, read_from_replica
+from developer.models import Developer
+from publisher.models import Publisher
+from .images import responsive_image
+from .models import Genre, Review
+
+API_PAGE_SIZE = 20
+API_MAX_PAGE_SIZE = 100
+API_CACHE_SECONDS = 60
+
+api_cache = namespace('api', API_CACHE_SECONDS)
+
+
+class ApiError(Exception):
+    def __init__(self, message, status=400):
+        super().__init__(message)
+        self.status = status
+
+
+class Field:
+    """One attribute of a resource: how to read it off a row and what the
+    query has to load for it"""
+
+    def __init__(self, get, only=(), select=(), prefetch=(), annotate=None):
+        self.get = get
+        self.only = only
+        self.select = select
+        self.prefetch = prefetch
+        self.annotate = annotate or {}
+
+
+def attribute(name):
+    return Field(lambda row, request: getattr(row, name), only=(name,))
+
+
+def company_field(relation):
+    return Field(
+        lambda row, request: company_ref(getattr(row, relation)),
+        only=(f'{relation}__id', f'{relation}__slug', f'{relation}__name'),
+        select=(relation,),
+    )
+
+
+def company_ref(company):
+    return {'id': company.pk, 'slug': company.slug, 'name': company.name}
+
+
+def games_count(relation):
+    return Field(
+        lambda row, request: row.num_games,
+        annotate={'num_games': Count(
+            relation, filter=Q(**{f'{relation}__is_published': True}),
+            distinct=True)},
+    )
+
+
+def page_url(view_name):
+    return Field(
+        lambda row, request: request.build_absolute_uri(
+            reverse(view_name, args=[row.slug])),
+        only=('slug',),
+    )
+
+
+class Resource:
+    """The fields one model exposes and the queryset they are read from"""
+
+    def __init__(self, queryset, fields, default_fields):
+        self.base_queryset = queryset
+        self.fields = {'id': attribute('id'), **fields}
+        self.default_fields = ('id', *default_fields)
+
+    def parse_fields(self, value):
+        if not value:
+            return self.default_fields
+        names = tuple(dict.fromkeys(
+            name.strip() for name in value.split(',') if name.strip()))
+        unknown = [name for name in names if name not in self.fields]
+        if unknown:
+            raise ApiError(
+                f'Unknown field(s): {", ".join(unknown)}. '
+                f'Available: {", ".join(self.fields)}')
+        return names or self.default_fields
+
+    def queryset(self, names):
+        fields = [self.fields[name] for name in names]
+        queryset = self.base_queryset.only(
+            'id', *(column for field in fields for column in field.only))
+        select = [name for field in fields for name in field.select]
+        if select:
+            queryset = queryset.select_related(*select)
+        prefetch = [name for field in fields for name in field.prefetch]
+        if prefetch:
+            queryset = queryset.prefetch_related(*prefetch)
+        for field in fields:
+            if field.annotate:
+                queryset = queryset.annotate(**field.annotate)
+        return queryset
+
+    def serialize(self, row, names, request):
+        return {name: self.fields[name].get(row, request) for name in names}
+
+
+RESOURCES = {
+    'reviews': Resource(
+        Review.objects.filter(is_published=True),
+        {
+            'slug': attribute('slug'),
+            'title': attribute('title'),
+            'igdb_id': attribute('igdb_id'),
+            'url': page_url('reviews:review_detail'),
+            'excerpt': attribute('excerpt'),
+            'description_html': attribute('description_html'),
+            'review_html': attribute('review_html'),
+            'review_score': attribute('review_score'),
+            'review_date': attribute('review_date'),
+            'release_date': attribute('release_date'),
+            'image': Field(
+                lambda row, request: responsive_image(row.featured_image).src,
+                only=('featured_image',)),
+            'developer': company_field('developer'),
+            'publisher': company_field('publisher'),
+            'genres': Field(
+                lambda row, request: [
+                    genre.name for genre in row.genres.all()],
+                prefetch=('genres',)),
+            'platforms': Field(
+                lambda row, request: [
+                    {'slug': platform.slug, 'name': platform.name}
+                    for platform in row.platforms.all()],
+                prefetch=('platforms',)),
+            'updated_on': attribute('updated_on'),
+        },
+        ('slug', 'title', 'url', 'excerpt', 'review_score', 'release_date',
+         'image', 'developer', 'publisher', 'genres'),
+    ),
+    'developers': Resource(
+        Developer.objects.all(),
+        {
+            'slug': attribute('slug'),
+            'name': attribute('name'),
+            'igdb_id': attribute('igdb_id'),
+            'url': page_url('developer:developer_games'),
+            'founded_year': attribute('founded_year'),
+            'website': attribute('website'),
+            'excerpt': attribute('excerpt'),
+            'description_html': attribute('description_html'),
+            'games_count': games_count('games'),
+            'updated_on': attribute('updated_on'),
+        },
+        ('slug', 'name', 'url', 'founded_year', 'website', 'excerpt'),
+    ),
+    'publishers': Resource(
+        Publisher.objects.all(),
+        {
+            'slug': attribute('slug'),
+            'name': attribute('name'),
+            'igdb_id': attribute('igdb_id'),
+            'url': page_url('publisher:publisher_games'),
+            'founded_year': attribute('founded_year'),
+            'website': attribute('website'),
+            'excerpt': attribute('excerpt'),
+            'description_html': attribute('description_html'),
+            'games_count': games_count('reviews'),
+            'updated_on': attribute('updated_on'),
+        },
+        ('slug', 'name', 'url', 'founded_year', 'website', 'excerpt'),
+    ),
+    'genres': Resource(
+        Genre.objects.all(),
+        {
+            'name': attribute('name'),
+            'igdb_id': attribute('igdb_id'),
+            'games_count': games_count('reviews'),
+        },
+        ('name', 'games_count'),
+    ),
+}
+
+
+def parse_int(value, name):
+    try:
+        number = int(value)
+    except (TypeError, ValueError):
+        raise ApiError(f'{name} must be an integer')
+    if number < 1:
+        raise ApiError(f'{name} must be positive')
+    return number
+
+
+def list_data(request, resource):
+    names = resource.parse_fields(request.GET.get('fields'))
+    queryset = resource.queryset(names)
+
+    ids = request.GET.get('ids')
+    if ids is not None:
+        ids = [parse_int(pk, 'ids') for pk in ids.split(',') if pk.strip()]
+        if len(ids) > API_MAX_PAGE_SIZE:
+            raise ApiError(f'At most {API_MAX_PAGE_SIZE} ids per request')
+        rows = queryset.in_bulk(ids)
+        return {'results': [
+            resource.serialize(rows[pk], names, request)
+            for pk in dict.fromkeys(ids) if pk in rows
+        ]}
+
+    limit = API_PAGE_SIZE
+    if request.GET.get('limit'):
+        limit = min(parse_int(request.GET['limit'], 'limit'),
+                    API_MAX_PAGE_SIZE)
+    cursor = request.GET.get('cursor')
+    if cursor:
+        queryset = queryset.filter(pk__gt=parse_int(cursor, 'cursor'))
+    rows = list(queryset.order_by('pk')[:limit + 1])
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = str(rows[-1].pk)
+    return {
+        'results': [resource.serialize(row, names, request) for row in rows],
+        'next_cursor': next_cursor,
+    }
+
+
+def detail_data(request, resource, pk):
+    names = resource.parse_fields(request.GET.get('fields'))
+    row = resource.queryset(names).filter(pk=pk).first()
+    if row is None:
+        raise ApiError('Not found', status=404)
+    return resource.serialize(row, names, request)
+
+
+def api_response(request, build):
+    """Serve ``build()``'s data as cached JSON with a strong ETag"""
+    # Bodies hold absolute URLs, so each scheme and host has its own copy
+    key = hashlib.sha1(request.build_absolute_uri().encode()).hexdigest()
+    entry = api_cache.get('response', key)
+    if entry is None:
+        try:
+            # Cached until the next commit clears it, so never built from
+            # a replica that hasn't caught up yet
+            with primary_reads():
+                data = build()
+        except ApiError as e:
+            return JsonResponse({'error': str(e)}, status=e.status)
+        body = json.dumps(data, cls=DjangoJSONEncoder).encode()
+        entry = (f'"{hashlib.sha256(body).hexdigest()}"', body)
+        api_cache.set('response', key, value=entry)
+
+    etag, body = entry
+    response = get_conditional_response(request, etag=etag)
+    if response is None:
+        response = HttpResponse(body, content_type='application/json')
+    response.headers['ETag'] = etag
+    patch_cache_control(response, public=True, max_age=API_CACHE_SECONDS)
+    return response
+
+
+def get_resource(name):
+    resource = RESOURCES.get(name)
+    if resource is None:
+        raise ApiError(
+            f'Unknown resource. Available: {", ".join(RESOURCES)}', 404)
+    return resource
+
+
+@require_GET
+@read_from_replica
+def resource_list(request, name):
+    return api_response(
+        request, lambda: list_data(request, get_resource(name)))
+
+
+@require_GET
+@read_from_replica
+def resource_detail(request, name, pk):
+    return api_response(
+        request, lambda: detail_data(request, get_resource(name), pk))
+
+
+def clear_api_cache():
+    """Retire every cached response, after any exposed row changes"""
+    api_cache.invalidate()
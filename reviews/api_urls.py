@@ -0,0 +1,10 @@
+from django.urls import path
+from . import api
+
+app_name = 'api'
+
+urlpatterns = [
+    path('<str:name>/', api.resource_list, name='resource_list'),
+    path('<str:name>/<int:pk>/', api.resource_detail,
+         name='resource_detail'),
+]
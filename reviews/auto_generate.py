@@ -0,0 +1,99 @@
+"""
+Reviews of new franchise games with random scores.
+
+``ReviewGenerator`` draws candidates from the franchise list through a
+:class:`~reviews.candidate_frontier.CandidateFrontier` and creates a
+review for each, every game in its own savepoint. The
+``auto_generate_reviews`` command runs it directly; the auto-generate
+page queues it as a populate job for ``process_populate_jobs``.
+"""
+import random
+from django.db import transaction
+from .candidate_frontier import CandidateFrontier
+from .ingest import GameIngestor, SkipGame
+from .models import PopulateJobResult
+
+# Popular game franchises
+FRANCHISES = [
+    "Call of Duty", "FIFA", "Grand Theft Auto", "The Witcher",
+    "Assassin's Creed", "Super Mario", "The Legend of Zelda",
+    "Final Fantasy", "Resident Evil", "Halo", "God of War",
+    "Minecraft", "Fortnite", "Red Dead Redemption", "Cyberpunk",
+    "Apex Legends", "Overwatch", "Counter-Strike", "Valorant",
+    "Destiny", "Battlefield", "Mass Effect", "Elder Scrolls",
+    "Fallout", "Dark Souls", "Sekiro", "Bloodborne",
+    "Monster Hunter", "Street Fighter", "Tekken", "Pokemon",
+    "Spider-Man", "Batman", "Mortal Kombat", "Tomb Raider",
+    "Bioshock", "Portal", "Half-Life", "Dota", "League",
+    "Starcraft", "Diablo", "World of Warcraft", "Borderlands",
+    "Dishonored", "Hitman", "Splinter Cell", "Ghost Recon",
+    "Rainbow Six", "Watch Dogs", "Far Cry", "Crysis",
+    "Metro", "S.T.A.L.K.E.R.", "Dying Light", "Dead Island",
+    "Left 4 Dead", "Team Fortress", "Garry's Mod", "Rust",
+    "PUBG", "Among Us", "Fall Guys", "Rocket League",
+    "Cities", "Civilization", "Total War", "Age of Empires",
+    "Starcraft", "Command", "Anno", "SimCity"
+]
+
+
+class ReviewGenerator:
+    """Create up to ``count`` reviews with scores between ``min_score``
+    and ``max_score``.
+
+    ``report(title, outcome, review, message)`` is called after every
+    attempt with a :model:`reviews.PopulateJobResult` outcome. Candidates
+    are already de-duplicated, so only creation errors count towards
+    giving up after ``count * 3`` failures. ``stop_reason`` says why a run
+    ended short. ``ingestor`` is a lenient :class:`GameIngestor` to reuse,
+    e.g. a worker's, with its company and genre lookups.
+    """
+
+    def __init__(self, igdb, count, min_score=5.0, max_score=10.0,
+                 batch_size=50, warn=None, ingestor=None):
+        self.count = count
+        self.min_score = min_score
+        self.max_score = max_score
+        self.frontier = CandidateFrontier(
+            igdb, FRANCHISES, batch_size=batch_size)
+        self.ingestor = ingestor or GameIngestor(lenient=True, warn=warn)
+        self.created = 0
+        self.failures = 0
+        self.stop_reason = ''
+
+    def run(self, report):
+        """Generate the reviews, returning how many were created"""
+        while self.created < self.count and self.failures < self.count * 3:
+            try:
+                game = self.frontier.next_candidate()
+            except Exception as e:
+                self.stop_reason = f'Error fetching candidates: {e}'
+                break
+            if game is None:
+                self.stop_reason = (
+                    'All franchises exhausted. Use --reset-frontier to '
+                    'start paging from the beginning again.')
+                break
+            self.create(game, report)
+        return self.created
+
+    def create(self, game, report):
+        title = game['name']
+        review_score = round(
+            random.uniform(self.min_score, self.max_score), 1)
+        try:
+            # Savepoint so one failed insert doesn't poison the batch
+            with transaction.atomic():
+                review = self.ingestor.create_review(game, review_score)
+        except SkipGame as skip:
+            if skip.review is not None:
+                self.frontier.consume(game)
+            self.failures += 1
+            report(title, PopulateJobResult.OUTCOME_SKIPPED, skip.review,
+                   str(skip))
+        except Exception as e:
+            self.failures += 1
+            report(title, PopulateJobResult.OUTCOME_ERROR, None, str(e))
+        else:
+            self.frontier.consume(game)
+            self.created += 1
+            report(title, PopulateJobResult.OUTCOME_CREATED, review, '')
@@ -0,0 +1,170 @@
+import random
+from django.db.models import Q
+from django.utils.text import slugify
+from .models import Review, FranchiseCursor, SeenIGDBGame
+
+
+class CandidateFrontier:
+    """Supply new IGDB games for auto-generated reviews
+
+    Each franchise is paged through with an offset stored in
+    :model:`reviews.FranchiseCursor`, and every IGDB id that has been
+    used is recorded in :model:`reviews.SeenIGDBGame`. A refill fetches
+    a whole batch, drops anything already seen or already in the catalog
+    and buffers the rest, so each API call yields new games instead of one
+    random pick that is usually a duplicate.
+
+    A candidate counts as used once the caller passes it to ``consume``,
+    after its review is created or found to exist. The stored offset only
+    moves past results that were used or dropped, so candidates left in
+    the buffer or whose creation failed are fetched again next run.
+    """
+
+    def __init__(self, igdb_service, search_terms, batch_size=50):
+        self.igdb = igdb_service
+        self.search_terms = list(dict.fromkeys(search_terms))
+        self.batch_size = batch_size
+        self.buffer = []
+        self.api_calls = 0
+        # Per franchise this run: its cursor, the offset of the next page
+        # to fetch and the offsets of fetched results not used yet
+        self.cursors = {}
+        self.fetched = {}
+        self.unused = {}
+        # IGDB id of each buffered candidate -> (search term, offset)
+        self.origins = {}
+
+        existing = set(FranchiseCursor.objects.filter(
+            search_term__in=self.search_terms
+        ).values_list('search_term', flat=True))
+        FranchiseCursor.objects.bulk_create([
+            FranchiseCursor(search_term=term)
+            for term in self.search_terms if term not in existing
+        ], ignore_conflicts=True)
+
+    def next_candidate(self):
+        """Return the next unseen game dict, or None when every franchise
+        is exhausted"""
+        while not self.buffer:
+            if not self.refill():
+                return None
+        return self.buffer.pop(0)
+
+    def refill(self):
+        """Fetch one batch from a random open franchise into the buffer.
+
+        Returns False once no franchise has results left.
+        """
+        cursor = self.pick_cursor()
+        if cursor is None:
+            return False
+
+        term = cursor.search_term
+        self.cursors.setdefault(term, cursor)
+        self.unused.setdefault(term, set())
+        offset = self.fetched.setdefault(term, cursor.offset)
+        games = self.igdb.search_games_with_platforms(
+            term, limit=self.batch_size, offset=offset, raise_errors=True
+        )
+        self.api_calls += 1
+        self.fetched[term] = offset + len(games)
+        if len(games) < self.batch_size:
+            # Read to the end; not picked again this run
+            self.search_terms.remove(term)
+
+        positions = {}
+        for position, game in enumerate(games, offset):
+            positions.setdefault(game.get('id'), position)
+        fresh = self.filter_new(games)
+        for game in fresh:
+            self.origins[game['id']] = (term, positions[game['id']])
+            self.unused[term].add(positions[game['id']])
+        self.save_cursor(term)
+        self.buffer.extend(fresh)
+        random.shuffle(self.buffer)
+        return True
+
+    def pick_cursor(self):
+        """Choose a random franchise that still has unread results"""
+        open_cursors = list(FranchiseCursor.objects.filter(
+            search_term__in=self.search_terms, exhausted=False
+        ))
+        if not open_cursors:
+            return None
+        return random.choice(open_cursors)
+
+    def consume(self, game):
+        """Record ``game`` as used, so it is never offered again"""
+        SeenIGDBGame.objects.bulk_create([
+            SeenIGDBGame(igdb_id=game['id'], title=game['name'][:200])
+        ], ignore_conflicts=True)
+        term, position = self.origins.pop(game['id'])
+        self.unused[term].discard(position)
+        self.save_cursor(term)
+
+    def save_cursor(self, term):
+        """Store the offset of the franchise's first unused result, or the
+        end of what was fetched"""
+        cursor = self.cursors[term]
+        offset = min(self.unused[term], default=self.fetched[term])
+        exhausted = (term not in self.search_terms
+                     and offset == self.fetched[term])
+        if (offset, exhausted) != (cursor.offset, cursor.exhausted):
+            cursor.offset = offset
+            cursor.exhausted = exhausted
+            cursor.save(update_fields=['offset', 'exhausted', 'updated_on'])
+
+    def filter_new(self, games):
+        """Drop games already seen, reviewed or offered this run. Reviewed
+        games are marked as seen."""
+        games = [
+            game for game in games if game.get('id') and game.get('name')
+            and game['id'] not in self.origins
+        ]
+        if not games:
+            return []
+
+        ids = [game['id'] for game in games]
+        seen_ids = set(SeenIGDBGame.objects.filter(
+            igdb_id__in=ids
+        ).values_list('igdb_id', flat=True))
+
+        titles = [game['name'] for game in games]
+        slugs = [slugify(title) for title in titles]
+        title_query = Q(slug__in=slugs)
+        for title in titles:
+            title_query |= Q(title__iexact=title)
+        existing = Review.objects.filter(title_query).values_list(
+            'title', 'slug'
+        )
+        taken = set()
+        for title, slug in existing:
+            taken.add(title.lower())
+            taken.add(slug)
+
+        fresh = []
+        new_seen = []
+        for game in games:
+            # seen_ids also catches the same id twice in one batch
+            if game['id'] in seen_ids:
+                continue
+            seen_ids.add(game['id'])
+            title = game['name']
+            slug = slugify(title)
+            if title.lower() in taken or slug in taken:
+                new_seen.append(
+                    SeenIGDBGame(igdb_id=game['id'], title=title[:200]))
+                continue
+            # Guard against two results in one batch sharing a slug
+            taken.add(title.lower())
+            taken.add(slug)
+            fresh.append(game)
+
+        SeenIGDBGame.objects.bulk_create(new_seen, ignore_conflicts=True)
+        return fresh
+
+    @staticmethod
+    def reset():
+        """Forget all cursors and seen ids"""
+        FranchiseCursor.objects.all().delete()
+        SeenIGDBGame.objects.all().delete()
@@ -1,9 +1,17 @@
+from django.db.models import Count
+from config.cache import namespace
 from .models import Genre
 
+navigation_cache = namespace('navigation')
+
 
 def genres_context(request):
     # Only show genres that have associated games
-    genres_with_games = [
-        genre for genre in Genre.objects.all() if genre.games_count > 0
-    ]
+    genres_with_games = navigation_cache.get_or_compute(
+        'genres',
+        compute=lambda: list(
+            Genre.objects.annotate(num_games=Count('reviews'))
+            .filter(num_games__gt=0)
+        ),
+    )
     return {'genres': genres_with_games}
@@ -0,0 +1,175 @@
+from django.db.models import Avg, Count, Q
+from django.template.loader import render_to_string
+from config.cache import namespace
+from .game_relations import first_releases
+from .models import Review, UserComment, UserReview
+from .moderation import decode_cursor, encode_cursor
+from .similarity import similar_games
+
+DETAIL_CACHE_SECONDS = 10 * 60
+THREAD_PAGE_SIZE = 20
+
+detail_cache = namespace('review_detail', DETAIL_CACHE_SECONDS)
+
+
+class Thread:
+    """Approved comments or user reviews on one game, newest first.
+
+    Pages are keyset-paginated on ``(created_on, id)`` with the same
+    cursors as the moderation queues, and rendered with the fragment
+    template the detail page uses for each item.
+    """
+
+    page_size = THREAD_PAGE_SIZE
+
+    def __init__(self, model, game_field, author_field, template,
+                 item_name):
+        self.model = model
+        self.game_field = game_field
+        self.author_field = author_field
+        self.template = template
+        self.item_name = item_name
+
+    def page(self, review_id, cursor=None):
+        """Return ``(rows, next_cursor)`` for one page of the thread"""
+        queryset = self.model.objects.filter(
+            approved=True, **{f'{self.game_field}_id': review_id}
+        ).select_related(self.author_field).order_by('-created_on', '-id')
+
+        position = decode_cursor(cursor)
+        if position is not None:
+            created_on, pk = position
+            queryset = queryset.filter(
+                Q(created_on__lt=created_on) |
+                Q(created_on=created_on, id__lt=pk))
+
+        rows = list(queryset[:self.page_size + 1])
+        next_cursor = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            next_cursor = encode_cursor(rows[-1])
+        return rows, next_cursor
+
+    def render(self, rows, is_owner=False):
+        return ''.join(
+            render_to_string(
+                self.template, {self.item_name: row, 'is_owner': is_owner})
+            for row in rows
+        )
+
+
+comment_thread = Thread(
+    UserComment, game_field='review', author_field='author',
+    template='reviews/includes/user_comment.html', item_name='user_comment')
+review_thread = Thread(
+    UserReview, game_field='game', author_field='user',
+    template='reviews/includes/user_review.html', item_name='user_review')
+
+threads = {'comments': comment_thread, 'reviews': review_thread}
+
+
+def review_snapshot(slug):
+    """Everything the detail page shows every visitor, or None if there is
+    no published review at ``slug``.
+
+    Built once and served from the cache: the review with its raw text
+    fields deferred in favour of the stored sanitized HTML, its platforms,
+    genres, release dates and companies, and the first page of approved
+    comments and user reviews with cursors for the next, their counts and
+    average score, and the games most like it.
+    """
+    return detail_cache.get_or_compute(
+        'snapshot', slug, compute=lambda: build_review_snapshot(slug))
+
+
+def build_review_snapshot(slug):
+    review = Review.objects.filter(
+        is_published=True, slug=slug
+    ).select_related(
+        'developer', 'publisher', 'reviewed_by'
+    ).prefetch_related(
+        'genres',
+        'platforms',
+        'developers',
+        'publishers',
+        first_releases(),
+    ).defer('review_text', 'description').first()
+    if review is None:
+        return None
+
+    user_comments, comments_cursor = comment_thread.page(review.pk)
+    comment_count = len(user_comments)
+    if comments_cursor:
+        comment_count = review.user_comments.filter(approved=True).count()
+    user_reviews, reviews_cursor = review_thread.page(review.pk)
+    scores = review.user_reviews.filter(approved=True).aggregate(
+        average=Avg('rating'), total=Count('id'))
+    average_review_score = None
+    if scores['average'] is not None:
+        average_review_score = round(scores['average'], 1)
+
+    similar = similar_games(review.pk)
+    # Build the image URLs now so they are stored with the snapshot
+    for game in [review, *similar]:
+        game.card_image
+
+    return {
+        'review': review,
+        'game_platforms': list(review.platforms.all()),
+        'game_genres': list(review.genres.all()),
+        'game_release_dates': review.first_releases,
+        'game_developers': (
+            list(review.developers.all()) or [review.developer]),
+        'game_publishers': (
+            list(review.publishers.all()) or [review.publisher]),
+        'user_comments': user_comments,
+        'comments_cursor': comments_cursor,
+        'comment_count': comment_count,
+        'user_reviews': user_reviews,
+        'reviews_cursor': reviews_cursor,
+        'user_review_count': scores['total'],
+        'average_review_score': average_review_score,
+        'similar_games': similar,
+    }
+
+
+def user_state(review_id, user):
+    """What the detail page shows only to ``user``: their own comments and
+    review, approved or not, rendered as they appear in the threads, and
+    whether they have reviewed the game yet"""
+    comments = UserComment.objects.filter(
+        review_id=review_id, author=user
+    ).select_related('author').order_by('-created_on')
+    reviews = UserReview.objects.filter(
+        game_id=review_id, user=user).select_related('user')
+    return {
+        'user_has_reviewed': len(reviews) > 0,
+        'comments': [
+            {
+                'id': comment.pk,
+                'approved': comment.approved,
+                'html': comment_thread.render([comment], is_owner=True),
+            }
+            for comment in comments
+        ],
+        'reviews': [
+            {
+                'id': user_review.pk,
+                'approved': user_review.approved,
+                'html': review_thread.render([user_review], is_owner=True),
+            }
+            for user_review in reviews
+        ],
+    }
+
+
+def clear_review_detail(*slugs):
+    """Drop the cached snapshot and anonymous page for each slug"""
+    detail_cache.delete_many(
+        [(kind, slug) for slug in set(slugs) if slug
+         for kind in ('snapshot', 'page')])
+
+
+def clear_review_details():
+    """Drop every cached detail page, for bulk updates"""
+    detail_cache.invalidate()
@@ -0,0 +1,67 @@
+import time
+from django.conf import settings
+from django.db.models import Count
+from config.cache import namespace
+from .models import Review
+
+FEATURED_SLOTS = getattr(settings, 'FEATURED_SLOTS', 9)
+FEATURED_ROTATION_SECONDS = getattr(
+    settings, 'FEATURED_ROTATION_SECONDS', 60 * 60)
+
+featured_cache = namespace('featured', FEATURED_ROTATION_SECONDS)
+
+
+def current_rotation(now=None):
+    """Index of the rotation window ``now`` falls in"""
+    return int((now or time.time()) // FEATURED_ROTATION_SECONDS)
+
+
+def featured_slots():
+    """The featured reviews for the carousel, at most FEATURED_SLOTS.
+
+    Built once per rotation window and served from the cache, with
+    comment/review counts and image URLs already computed, so rendering
+    the carousel runs no queries.
+    """
+    rotation = current_rotation()
+    return featured_cache.get_or_compute(
+        'slots', rotation, compute=lambda: compute_featured_slots(rotation))
+
+
+def compute_featured_slots(rotation):
+    """Pick this window's slice of featured reviews.
+
+    Featured reviews are ordered newest first; each window starts
+    FEATURED_SLOTS further along the list and wraps around, so every
+    featured game gets shown when there are more than fit.
+    """
+    featured_ids = list(
+        Review.objects.filter(is_featured=True, is_published=True)
+        .order_by('-review_date', '-pk')
+        .values_list('pk', flat=True)
+    )
+    if len(featured_ids) > FEATURED_SLOTS:
+        start = (rotation * FEATURED_SLOTS) % len(featured_ids)
+        featured_ids = (featured_ids[start:] + featured_ids[:start])[
+            :FEATURED_SLOTS]
+    if not featured_ids:
+        return []
+
+    reviews = Review.objects.filter(pk__in=featured_ids).annotate(
+        comment_count=Count('user_comments', distinct=True),
+        user_review_count=Count('user_reviews', distinct=True),
+    ).only(
+        'id', 'title', 'slug', 'excerpt', 'review_date',
+        'featured_image', 'image_lqip',
+    )
+    by_id = {review.pk: review for review in reviews}
+    slots = [by_id[pk] for pk in featured_ids if pk in by_id]
+    for review in slots:
+        # Build the image URLs now so they are stored with the slot
+        review.card_image
+    return slots
+
+
+def clear_featured_slots():
+    """Drop the current window so the next page view rebuilds it"""
+    featured_cache.delete('slots', current_rotation())
@@ -0,0 +1,192 @@
+from django.db.models import Prefetch, Q
+from django.utils.text import slugify
+from developer.models import Developer
+from publisher.models import Publisher
+from .models import Platform, ReleaseDate
+import datetime
+
+
+# Prefetch for calling ``save_game_relations`` on many stored reviews
+RELATIONS_PREFETCH = ('platforms', 'developers', 'publishers', 'release_dates')
+
+
+def save_game_relations(review, game, create_company=None, created=False):
+    """Store the platforms, release dates and companies of an IGDB game
+    dict on ``review``.
+
+    Called at ingest time so the detail page can render from the database
+    instead of asking IGDB on every view. On a stored review only the
+    relations that differ from IGDB's are rewritten, so a sync over
+    unchanged games writes nothing; prefetch ``RELATIONS_PREFETCH`` when
+    doing it for many. ``created`` skips the comparison for a review
+    just created. Companies not found are made by
+    ``create_company(model, name, data)`` when given.
+    """
+    platforms = resolve_platforms(
+        list(game.get('platforms') or []) +
+        [release['platform'] for release in game.get('release_dates') or []
+         if isinstance(release.get('platform'), dict)]
+    )
+    set_if_changed(review.platforms, platforms.values(), created)
+    save_release_dates(review, game.get('release_dates') or [], platforms,
+                       created)
+
+    for model, manager, primary_id, key in (
+            (Developer, review.developers, review.developer_id,
+             'developers'),
+            (Publisher, review.publishers, review.publisher_id,
+             'publishers')):
+        companies = resolve_companies(
+            model, game.get(key) or [], create_company)
+        if primary_id and primary_id not in {c.pk for c in companies}:
+            companies.insert(0, model(pk=primary_id))
+        set_if_changed(manager, companies, created)
+
+
+def set_if_changed(manager, objs, created=False):
+    """``manager.set(objs)`` unless it already holds exactly those"""
+    if created or {obj.pk for obj in objs} != {
+            obj.pk for obj in manager.all()}:
+        manager.set(objs)
+
+
+def resolve_platforms(platform_data):
+    """Get or create Platform rows, returning a dict keyed by name"""
+    by_name = {}
+    for data in platform_data:
+        name = (data.get('name') or '').strip()
+        if name and name not in by_name:
+            by_name[name] = data
+
+    if not by_name:
+        return {}
+
+    platforms = {
+        platform.name: platform
+        for platform in Platform.objects.filter(name__in=by_name)
+    }
+    missing = [
+        Platform(
+            name=name,
+            slug=slugify(name),
+            abbreviation=data.get('abbreviation') or '',
+            igdb_id=data.get('id'),
+        )
+        for name, data in by_name.items() if name not in platforms
+    ]
+    if missing:
+        Platform.objects.bulk_create(missing, ignore_conflicts=True)
+        platforms.update({
+            platform.name: platform
+            for platform in Platform.objects.filter(
+                name__in=[platform.name for platform in missing])
+        })
+    return platforms
+
+
+def save_release_dates(review, release_dates_data, platforms,
+                       created=False):
+    """Replace the review's release dates with those from IGDB, marking
+    the first on each platform, unless they are the same already"""
+    rows = {}
+    for release in release_dates_data:
+        timestamp = release.get('date')
+        platform = release.get('platform')
+        if not timestamp or not isinstance(platform, dict):
+            continue
+        platform_obj = platforms.get(platform.get('name'))
+        if platform_obj is None:
+            continue
+        try:
+            date = datetime.datetime.fromtimestamp(timestamp).date()
+        except (ValueError, OSError, OverflowError):
+            continue
+        rows[(platform_obj.pk, date)] = ReleaseDate(
+            review=review, platform=platform_obj, date=date)
+
+    first = {}
+    for row in rows.values():
+        if (row.platform_id not in first or
+                row.date < first[row.platform_id].date):
+            first[row.platform_id] = row
+    for row in first.values():
+        row.is_first = True
+
+    def stored(rows):
+        return {(row.platform_id, row.date, row.is_first) for row in rows}
+    if created or stored(rows.values()) != stored(
+            review.release_dates.all()):
+        ReleaseDate.objects.filter(review=review).delete()
+        ReleaseDate.objects.bulk_create(rows.values(), ignore_conflicts=True)
+
+    # The game's release date is its first release on any platform
+    if first:
+        earliest = min(row.date for row in first.values())
+        if review.release_date != earliest:
+            review.release_date = earliest
+            review.save(update_fields=['release_date'])
+
+
+def resolve_companies(model, companies, create=None):
+    """Map IGDB company dicts to Developer/Publisher rows by IGDB id or
+    name, creating any that don't exist yet, with
+    ``create(model, name, data)`` if given"""
+    names = {}
+    igdb_ids = set()
+    for company in companies:
+        name = (company.get('name') or '').strip()
+        if name:
+            names.setdefault(name.lower(), name)
+            if company.get('id'):
+                igdb_ids.add(company['id'])
+    if not names:
+        return []
+
+    name_query = Q(igdb_id__in=igdb_ids)
+    for name in names.values():
+        name_query |= Q(name__iexact=name)
+    existing = {}
+    for obj in model.objects.filter(name_query):
+        existing[obj.name.lower()] = obj
+        if obj.igdb_id:
+            existing[obj.igdb_id] = obj
+
+    resolved = []
+    for company in companies:
+        name = (company.get('name') or '').strip()
+        if not name:
+            continue
+        igdb_id = company.get('id')
+        obj = existing.get(igdb_id) or existing.get(name.lower())
+        if obj is None and create is not None:
+            obj = create(model, name, company)
+            existing[name.lower()] = obj
+        elif obj is None:
+            logo_url = company.get('logo_url', '')
+            if logo_url and logo_url.startswith('//'):
+                logo_url = 'https:' + logo_url
+            obj, _ = model.objects.get_or_create(
+                name=name,
+                defaults={
+                    'igdb_id': igdb_id,
+                    'description': company.get('description', ''),
+                    'website': company.get('website', ''),
+                    'founded_year': company.get('founded_year') or None,
+                    'logo': logo_url or 'placeholder',
+                }
+            )
+            existing[name.lower()] = obj
+        if obj not in resolved:
+            resolved.append(obj)
+    return resolved
+
+
+def first_releases():
+    """Prefetch for ``Review.first_releases``: the earliest release on each
+    platform, ordered by date"""
+    return Prefetch(
+        'release_dates',
+        queryset=ReleaseDate.objects.filter(
+            is_first=True).select_related('platform').order_by('date', 'pk'),
+        to_attr='first_releases',
+    )
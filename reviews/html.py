@@ -0,0 +1,69 @@
+from functools import lru_cache
+from html import unescape
+from django.utils.html import strip_tags
+from django.utils.text import Truncator
+
+# Markup allowed in review text and descriptions: what Summernote and the
+# review generator produce, minus scripts, frames, forms, inline styles
+# and event handlers
+ALLOWED_TAGS = {
+    'a', 'abbr', 'b', 'blockquote', 'br', 'code', 'div', 'em', 'h2', 'h3',
+    'h4', 'h5', 'h6', 'hr', 'i', 'img', 'li', 'ol', 'p', 'pre', 's', 'span',
+    'strong', 'sub', 'sup', 'table', 'tbody', 'td', 'th', 'thead', 'tr', 'u',
+    'ul',
+}
+ALLOWED_ATTRIBUTES = {
+    '*': ['class'],
+    'a': ['href', 'title', 'target', 'rel'],
+    'abbr': ['title'],
+    'img': ['src', 'alt', 'title', 'width', 'height'],
+    'td': ['colspan', 'rowspan'],
+    'th': ['colspan', 'rowspan'],
+}
+ALLOWED_PROTOCOLS = {'http', 'https', 'mailto'}
+
+
+@lru_cache(maxsize=None)
+def cleaner():
+    # bleach and its bundled html5lib are only needed when saving, so
+    # they are imported on first use rather than with the models
+    import bleach
+    return bleach.Cleaner(
+        tags=ALLOWED_TAGS,
+        attributes=ALLOWED_ATTRIBUTES,
+        protocols=ALLOWED_PROTOCOLS,
+        strip=True,
+    )
+
+
+def sanitize_html(html):
+    """Strip anything outside the allowed markup from ``html``"""
+    return cleaner().clean(html or '')
+
+
+EXCERPT_LENGTH = 300
+
+
+def plain_excerpt(html, length=EXCERPT_LENGTH):
+    """Plain text of ``html`` with whitespace collapsed, cut to ``length``
+    characters on a word boundary, for cards"""
+    text = ' '.join(unescape(strip_tags(html or '')).split())
+    return Truncator(text).chars(length, truncate='…')
+
+
+def store_rendered_html(instance, fields, update_fields=None):
+    """Fill ``instance``'s stored HTML and ``excerpt`` from its raw HTML.
+
+    ``fields`` maps each raw field to the field holding its sanitized
+    copy; the excerpt comes from the first raw field. Called from
+    ``save()``, it returns ``update_fields`` with the stored fields added,
+    and leaves them alone when a partial save doesn't touch the raw ones.
+    """
+    if update_fields is not None and not set(fields) & set(update_fields):
+        return update_fields
+    for source, target in fields.items():
+        setattr(instance, target, sanitize_html(getattr(instance, source)))
+    instance.excerpt = plain_excerpt(getattr(instance, next(iter(fields))))
+    if update_fields is None:
+        return None
+    return {*update_fields, *fields.values(), 'excerpt'}
@@ -1,9 +1,28 @@
-from igdb.wrapper import IGDBWrapper
 from django.conf import settings
 import json
-import requests
+import datetime
 import os
 
+# Largest page IGDB returns for one query
+QUERY_LIMIT = 500
+
+COMPANY_FIELDS = (
+    'id, name, description, websites.url, websites.type, start_date, '
+    'logo.url'
+)
+
+# Everything ingest and sync read from a game, nested companies included
+GAME_FIELDS = (
+    'id, name, summary, release_dates.date, '
+    'release_dates.platform.id, release_dates.platform.name, '
+    'release_dates.platform.platform_type, '
+    'platforms.id, platforms.name, platforms.platform_type, cover.url, '
+    'genres.name, '
+    + ', '.join(f'involved_companies.company.{field.strip()}'
+                for field in COMPANY_FIELDS.split(',')) +
+    ', involved_companies.developer, involved_companies.publisher'
+)
+
 
 class IGDBService:
     """Service class for interacting with IGDB API"""
@@ -28,6 +47,7 @@ class IGDBService:
 
     def get_access_token(self):
         """Get Twitch access token for IGDB API"""
+        from .ingest.http import http_session
         if self.access_token:
             return self.access_token
 
@@ -38,7 +58,7 @@ class IGDBService:
             'grant_type': 'client_credentials'
         }
 
-        response = requests.post(url, data=data)
+        response = http_session().post(url, data=data)
         if response.status_code == 200:
             self.access_token = response.json()['access_token']
             return self.access_token
@@ -50,6 +70,9 @@ class IGDBService:
 
     def initialize_wrapper(self):
         """Initialize IGDB wrapper with credentials"""
+        # Imported here so web workers don't load the wrapper and requests
+        # until a populate page actually talks to IGDB
+        from igdb.wrapper import IGDBWrapper
         if not self.wrapper:
             if not self.access_token:
                 self.get_access_token()
@@ -70,194 +93,138 @@ class IGDBService:
             }
         return None
 
-    def search_games_with_platforms(self, game_name, limit=10):
+    def query(self, endpoint, query_string):
+        """Run an Apicalypse query against ``endpoint`` and return the
+        decoded rows. Errors are raised."""
+        wrapper = self.initialize_wrapper()
+        return json.loads(wrapper.api_request(endpoint, query_string))
+
+    def updated_since(self, endpoint, fields, ids, since=None):
+        """Rows of ``endpoint`` with one of the IGDB ``ids`` (at most
+        ``QUERY_LIMIT``) that changed after the unix time ``since``"""
+        where = f'id = ({",".join(str(pk) for pk in ids)})'
+        if since is not None:
+            where += f' & updated_at > {since}'
+        return self.query(
+            endpoint, f'fields {fields}; where {where}; limit {len(ids)};')
+
+    def ids_by_name(self, endpoint, names):
+        """Map each of ``names`` (at most ``QUERY_LIMIT``) to the IGDB ids
+        of the ``endpoint`` rows with exactly that name"""
+        quoted = ','.join(
+            '"{}"'.format(name.replace('\\', '\\\\').replace('"', '\\"'))
+            for name in names)
+        rows = self.query(
+            endpoint,
+            f'fields id, name; where name = ({quoted}); '
+            f'limit {QUERY_LIMIT};')
+        found = {}
+        for row in rows:
+            found.setdefault(row.get('name'), []).append(row['id'])
+        return found
+
+    def search_games_with_platforms(self, game_name, limit=10, offset=0,
+                                    raise_errors=False):
         """
         Search for games by name and return with detailed platform information
-        """
-        wrapper = self.initialize_wrapper()
 
+        ``offset`` skips that many results so callers can page through a
+        search term instead of re-reading the first page every time. Errors
+        are logged and an empty list returned unless ``raise_errors`` is set,
+        which lets paging callers tell a failed request from the last page.
+        """
         query_string = (
-            f'fields id, name, summary, release_dates.date, '
-            f'release_dates.platform.id, release_dates.platform.name, release_dates.platform.platform_type, '
-            f'platforms.id, platforms.name, platforms.platform_type, cover.url, genres.name, '
-            f'involved_companies.company.name, '
-            f'involved_companies.company.description, '
-            f'involved_companies.company.websites.url, '
-            f'involved_companies.company.websites.type, '
-            f'involved_companies.company.start_date_format, '
-            f'involved_companies.company.logo.url, '
-            f'involved_companies.developer, involved_companies.publisher; '
-            f'search "{game_name}"; limit {limit};'
+            f'fields {GAME_FIELDS}; '
+            f'search "{game_name}"; limit {limit}; offset {offset};'
         )
 
         try:
-            byte_array = wrapper.api_request('games', query_string)
-            games = json.loads(byte_array)
-
-            # Format the results to make platforms easier to work with
-            formatted_games = []
-            for game in games:
-                cover_url = (
-                    game.get('cover', {}).get('url', '')
-                    if game.get('cover') else ''
-                )
-                if cover_url:
-                    cover_url = cover_url.replace('t_thumb', 't_cover_big')
-                formatted_game = {
-                    'id': game.get('id'),
-                    'name': game.get('name'),
-                    'summary': game.get('summary', ''),
-                    'cover_url': cover_url,
-                    'platforms': [],
-                    'genres': [],
-                    'developers': [],
-                    'publishers': []
-                }
-
-                # Extract platform information
-                if 'platforms' in game:
-                    for platform in game['platforms']:
-                        platform_info = {
-                            'id': platform.get('id'),
-                            'name': platform.get('name'),
-                            'abbreviation': platform.get('abbreviation', '')
-                        }
-                        formatted_game['platforms'].append(platform_info)
-
-                # Extract genre information
-                if 'genres' in game:
-                    for genre in game['genres']:
-                        genre_info = {
-                            'id': genre.get('id'),
-                            'name': genre.get('name')
-                        }
-                        formatted_game['genres'].append(genre_info)
-
-                # Extract developer information
-                if 'involved_companies' in game:
-                    for company_data in game['involved_companies']:
-                        if (company_data.get('developer') and
-                                'company' in company_data):
-                            company = company_data['company']
-
-                            # Extract website URL
-                            website_url = ''
-                            if 'websites' in company:
-                                for website in company['websites']:
-                                    # Type 1 is official website (per new docs)
-                                    if website.get('type') == 1:
-                                        website_url = website.get('url', '')
-                                        break
-                                # If no official site, take the first one
-                                if not website_url and company['websites']:
-                                    first_site = company['websites'][0]
-                                    website_url = first_site.get('url', '')
-
-                            # Convert start_date_format timestamp to year
-                            founded_year = ''
-                            if company.get('start_date_format'):
-                                try:
-                                    import datetime
-                                    timestamp = company['start_date_format']
-                                    if (isinstance(timestamp, (int, float)) and
-                                            timestamp > 0):
-                                        date_obj = datetime.datetime.\
-                                            fromtimestamp(timestamp)
-                                        founded_year = date_obj.year
-                                    else:
-                                        founded_year = ''
-                                except (ValueError, TypeError, OSError):
-                                    founded_year = ''
-
-                            # Extract logo URL
-                            logo_url = ''
-                            if (company.get('logo') and
-                                    company['logo'].get('url')):
-                                logo_url = company['logo']['url']
-                                # Convert to HTTPS and larger size
-                                if logo_url.startswith('//'):
-                                    logo_url = 'https:' + logo_url
-                                # Replace t_thumb with t_logo_med for quality
-                                logo_url = logo_url.replace(
-                                    't_thumb', 't_logo_med')
-
-                            developer_info = {
-                                'id': company.get('id'),
-                                'name': company.get('name', ''),
-                                'description': company.get('description', ''),
-                                'website': website_url,
-                                'founded_year': founded_year,
-                                'logo_url': logo_url
-                            }
-                            formatted_game['developers'].append(developer_info)
-
-                # Extract publisher information
-                if 'involved_companies' in game:
-                    for company_data in game['involved_companies']:
-                        if (company_data.get('publisher') and
-                                'company' in company_data):
-                            company = company_data['company']
-
-                            # Extract website URL
-                            website_url = ''
-                            if 'websites' in company:
-                                for website in company['websites']:
-                                    # Category 1 is official website
-                                    if website.get('category') == 1:
-                                        website_url = website.get('url', '')
-                                        break
-                                # If no official site, take the first one
-                                if not website_url and company['websites']:
-                                    first_site = company['websites'][0]
-                                    website_url = first_site.get('url', '')
-
-                            # Convert start_date timestamp to year
-                            founded_year = ''
-                            if company.get('start_date'):
-                                try:
-                                    import datetime
-                                    timestamp = company['start_date']
-                                    if (isinstance(timestamp, (int, float)) and
-                                            timestamp > 0):
-                                        date_obj = datetime.datetime.\
-                                            fromtimestamp(timestamp)
-                                        founded_year = date_obj.year
-                                    else:
-                                        founded_year = ''
-                                except (ValueError, TypeError, OSError):
-                                    founded_year = ''
-
-                            # Extract logo URL
-                            logo_url = ''
-                            if (company.get('logo') and
-                                    company['logo'].get('url')):
-                                logo_url = company['logo']['url']
-                                # Convert to HTTPS and larger size
-                                if logo_url.startswith('//'):
-                                    logo_url = 'https:' + logo_url
-                                # Replace t_thumb with t_logo_med for quality
-                                logo_url = logo_url.replace(
-                                    't_thumb', 't_logo_med')
-
-                            publisher_info = {
-                                'id': company.get('id'),
-                                'name': company.get('name', ''),
-                                'description': company.get('description', ''),
-                                'website': website_url,
-                                'founded_year': founded_year,
-                                'logo_url': logo_url
-                            }
-                            formatted_game['publishers'].append(publisher_info)
-
-                # Extract release dates with platform information
-                if 'release_dates' in game:
-                    formatted_game['release_dates'] = game['release_dates']
-
-                formatted_games.append(formatted_game)
-
-            return formatted_games
+            return [format_game(game) for game in self.query(
+                'games', query_string)]
         except Exception as e:
             print(f"Error searching games with platforms: {e}")
             import traceback
             traceback.print_exc()
+            if raise_errors:
+                raise
             return []
+
+
+def format_game(game):
+    """Flatten an IGDB game row into the dict ingest and the populate
+    pages work with"""
+    cover_url = (
+        game.get('cover', {}).get('url', '')
+        if game.get('cover') else ''
+    )
+    if cover_url:
+        cover_url = cover_url.replace('t_thumb', 't_cover_big')
+    formatted_game = {
+        'id': game.get('id'),
+        'name': game.get('name'),
+        'summary': game.get('summary', ''),
+        'cover_url': cover_url,
+        'platforms': [
+            {
+                'id': platform.get('id'),
+                'name': platform.get('name'),
+                'abbreviation': platform.get('abbreviation', '')
+            }
+            for platform in game.get('platforms', [])
+        ],
+        'genres': [
+            {'id': genre.get('id'), 'name': genre.get('name')}
+            for genre in game.get('genres', [])
+        ],
+        'developers': [],
+        'publishers': []
+    }
+
+    for company_data in game.get('involved_companies', []):
+        if 'company' not in company_data:
+            continue
+        company = format_company(company_data['company'])
+        if company_data.get('developer'):
+            formatted_game['developers'].append(company)
+        if company_data.get('publisher'):
+            formatted_game['publishers'].append(company)
+
+    # Extract release dates with platform information
+    if 'release_dates' in game:
+        formatted_game['release_dates'] = game['release_dates']
+
+    return formatted_game
+
+
+def format_company(company):
+    """Flatten an IGDB company row for Developer/Publisher fields"""
+    # Type 1 is the official website; otherwise take the first one
+    websites = company.get('websites') or []
+    website_url = next(
+        (site.get('url', '') for site in websites if site.get('type') == 1),
+        websites[0].get('url', '') if websites else '')
+
+    founded_year = ''
+    timestamp = company.get('start_date')
+    if isinstance(timestamp, (int, float)):
+        try:
+            founded_year = datetime.datetime.fromtimestamp(timestamp).year
+        except (ValueError, OverflowError, OSError):
+            founded_year = ''
+
+    logo_url = ''
+    if company.get('logo') and company['logo'].get('url'):
+        logo_url = company['logo']['url']
+        if logo_url.startswith('//'):
+            logo_url = 'https:' + logo_url
+        # Replace t_thumb with t_logo_med for quality
+        logo_url = logo_url.replace('t_thumb', 't_logo_med')
+
+    return {
+        'id': company.get('id'),
+        'name': company.get('name', ''),
+        'description': company.get('description', ''),
+        'website': website_url,
+        'founded_year': founded_year,
+        'logo_url': logo_url
+    }
@@ -0,0 +1,133 @@
+import base64
+import re
+from functools import lru_cache
+from cloudinary import CloudinaryResource
+from cloudinary.models import CLOUDINARY_FIELD_DB_RE
+
+PLACEHOLDER_PUBLIC_ID = 'placeholder'
+PLACEHOLDER_URL = (
+    'https://via.placeholder.com/400x300/6c757d/ffffff?text=No+Image'
+)
+
+# Widths offered in srcset for cover cards; DEFAULT_WIDTH is used for src
+CARD_WIDTHS = (320, 480, 640, 960)
+DEFAULT_WIDTH = 640
+
+# ``sizes`` hint matching the col-md-3 card grid
+CARD_SIZES = '(min-width: 768px) 25vw, 100vw'
+
+# Tiny blurred preview stored on the model and inlined as a data URI
+LQIP_WIDTH = 24
+
+
+class ResponsiveImage:
+    """Delivery URLs for one stored image, built once.
+
+    ``placeholder`` is decided from the stored public id so templates can
+    branch on it without building a URL first.
+    """
+
+    def __init__(self, image, widths=CARD_WIDTHS, default_width=DEFAULT_WIDTH):
+        key = image_key(image)
+        self.placeholder = key is None
+        if self.placeholder:
+            self.src = PLACEHOLDER_URL
+            self.srcset = ''
+            self.urls = {}
+        else:
+            self.urls = {width: delivery_url(key, width) for width in widths}
+            self.src = self.urls.get(default_width) or delivery_url(
+                key, default_width)
+            self.srcset = ', '.join(
+                f'{url} {width}w' for width, url in self.urls.items())
+
+    def __str__(self):
+        return self.src
+
+
+def image_key(image):
+    """Hashable identity of a stored image version, or None for the
+    placeholder/empty value.
+
+    Includes the version so a re-upload under the same public id gets
+    fresh URLs.
+    """
+    if not image:
+        return None
+    if isinstance(image, CloudinaryResource):
+        public_id = image.public_id
+        if not public_id or PLACEHOLDER_PUBLIC_ID in public_id:
+            return None
+        return (public_id, image.format, image.version, image.type,
+                image.resource_type or 'image')
+    image = str(image)
+    if PLACEHOLDER_PUBLIC_ID in image:
+        return None
+    if image.startswith(('http://', 'https://')):
+        return (image, None, None, 'upload', 'image')
+    # A value assigned but not yet reloaded, e.g. a fresh upload's public id
+    match = re.match(CLOUDINARY_FIELD_DB_RE, image)
+    return (match.group('public_id'), match.group('format'),
+            match.group('version'), match.group('type') or 'upload',
+            match.group('resource_type') or 'image')
+
+
+@lru_cache(maxsize=8192)
+def delivery_url(key, width=None):
+    """Cloudinary delivery URL for ``key`` scaled down to ``width``.
+
+    Process-wide cache: the same image version always produces the same
+    URL, so it only has to be built once per worker.
+    """
+    public_id, format, version, type, resource_type = key
+    if public_id.startswith(('http://', 'https://')):
+        return public_id
+    options = {'fetch_format': 'auto', 'quality': 'auto', 'secure': True}
+    if width:
+        options.update(width=width, crop='limit')
+    return CloudinaryResource(
+        public_id, format=format, version=version, type=type,
+        resource_type=resource_type,
+    ).build_url(**options)
+
+
+def responsive_image(image, widths=CARD_WIDTHS, default_width=DEFAULT_WIDTH):
+    return ResponsiveImage(image, widths, default_width)
+
+
+def lqip_url(key):
+    """URL of a tiny, heavily blurred JPEG rendition of ``key``"""
+    public_id, format, version, type, resource_type = key
+    return CloudinaryResource(
+        public_id, format='jpg', version=version, type=type,
+        resource_type=resource_type,
+    ).build_url(width=LQIP_WIDTH, crop='scale', effect='blur:1000',
+                quality='auto:low', secure=True)
+
+
+def fetch_lqip(image):
+    """Download the blurred preview of ``image`` as a data URI.
+
+    Returns an empty string for placeholders, remote URLs or when the
+    download fails; cards then render without a preview.
+    """
+    import requests
+    from .ingest.http import http_session
+
+    key = image_key(image)
+    if key is None or key[0].startswith(('http://', 'https://')):
+        return ''
+    try:
+        response = http_session().get(lqip_url(key), timeout=5)
+        response.raise_for_status()
+    except requests.RequestException:
+        return ''
+    encoded = base64.b64encode(response.content).decode('ascii')
+    return f'data:image/jpeg;base64,{encoded}'
+
+
+def store_lqip(review):
+    """Compute and save the blurred preview for a review's cover"""
+    review.image_lqip = fetch_lqip(review.featured_image)
+    review.save(update_fields=['image_lqip'])
+    return review.image_lqip
@@ -0,0 +1,27 @@
+"""
+Turning IGDB game dicts into reviews.
+
+The populate job worker, ``populate_reviews`` and ``auto_generate_reviews``
+all create reviews through ``GameIngestor``, so company and genre
+resolution, image uploads and AI review text follow one code path.
+Downloads go through a single pooled HTTP session per process and uploads
+through Cloudinary's module-level connection pool, both reused across
+games and batches. ``CatalogSync`` later refreshes what was ingested,
+keyed on the stored IGDB ids.
+"""
+from .ai import generate_ai_review, get_ai_client
+from .http import absolute_url, http_session
+from .media import upload_image
+from .service import GameIngestor, SkipGame
+from .sync import CatalogSync
+
+__all__ = [
+    'CatalogSync',
+    'GameIngestor',
+    'SkipGame',
+    'absolute_url',
+    'generate_ai_review',
+    'get_ai_client',
+    'http_session',
+    'upload_image',
+]
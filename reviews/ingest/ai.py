@@ -0,0 +1,48 @@
+from functools import lru_cache
+import os
+
+# AI Client for review generation
+endpoint = "https://models.github.ai/inference"
+model = "openai/gpt-4.1"
+
+
+@lru_cache(maxsize=None)
+def get_ai_client():
+    """The review generation client, built on first use.
+
+    Importing the ingest package doesn't load the Azure SDK or need
+    GITHUB_TOKEN until a review is actually generated.
+    """
+    from azure.ai.inference import ChatCompletionsClient
+    from azure.core.credentials import AzureKeyCredential
+
+    token = os.environ.get("GITHUB_TOKEN")
+    if not token:
+        raise ValueError(
+            "GITHUB_TOKEN must be set in environment variables to "
+            "generate reviews"
+        )
+    return ChatCompletionsClient(
+        endpoint=endpoint,
+        credential=AzureKeyCredential(token),
+    )
+
+
+def generate_ai_review(title):
+    from azure.ai.inference.models import SystemMessage, UserMessage
+
+    prompt = (f"write 5-7 paragraphs including a conclusion on {title}. "
+              "Do not include a heading, break each paragraph with a "
+              "<p> tag, Please ensure the review has appropriate spacing "
+              "for the paragraphs to display as HTML.")
+    response = get_ai_client().complete(
+        messages=[
+            SystemMessage("You are a game reviewer and need to create "
+                          "professional gaming reviews"),
+            UserMessage(prompt),
+        ],
+        temperature=1,
+        top_p=1,
+        model=model
+    )
+    return response.choices[0].message.content
@@ -0,0 +1,30 @@
+from functools import lru_cache
+
+DOWNLOAD_TIMEOUT = 10
+POOL_SIZE = 10
+
+
+@lru_cache(maxsize=None)
+def http_session():
+    """The ``requests`` session every ingest download goes through.
+
+    Built once per process, so covers, logos and blurred previews keep
+    their connections to the image hosts open between games instead of
+    paying a TLS handshake per request.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(
+        pool_connections=POOL_SIZE, pool_maxsize=POOL_SIZE, max_retries=2)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    return session
+
+
+def absolute_url(url):
+    """IGDB returns protocol-relative image URLs"""
+    if url and url.startswith('//'):
+        return 'https:' + url
+    return url or ''
@@ -0,0 +1,23 @@
+from .http import DOWNLOAD_TIMEOUT, absolute_url, http_session
+
+
+def upload_image(url, folder, name):
+    """Copy the image at ``url`` to Cloudinary as ``<folder>/<name>`` and
+    return its public id.
+
+    The download uses the shared session and the bytes are uploaded from
+    memory, without a temporary file. Errors are raised for the caller to
+    handle.
+    """
+    from cloudinary.uploader import upload
+
+    response = http_session().get(absolute_url(url), timeout=DOWNLOAD_TIMEOUT)
+    response.raise_for_status()
+    result = upload(
+        response.content,
+        public_id=f"{folder}/{name.lower().replace(' ', '_')}",
+        folder=folder,
+        overwrite=True,
+        resource_type="image"
+    )
+    return result['public_id']
@@ -0,0 +1,260 @@
+from django.contrib.auth.models import User
+from django.db.models import Q
+from django.utils import timezone
+from django.utils.text import slugify
+from developer.models import Developer
+from publisher.models import Publisher
+from reviews.game_relations import save_game_relations
+from reviews.images import store_lqip
+from reviews.models import Genre, Review
+from .ai import generate_ai_review
+from .http import absolute_url
+from .media import upload_image
+import datetime
+import random
+
+LOGO_FOLDERS = {
+    Developer: 'developer_logos',
+    Publisher: 'publisher_logos',
+}
+
+# Used for games IGDB has no company for when the ingestor is lenient
+PLACEHOLDER_COMPANIES = {
+    Developer: ('Unknown Developer', 'Developer information not available'),
+    Publisher: ('Unknown Publisher', 'Publisher information not available'),
+}
+
+
+class SkipGame(Exception):
+    """The game was not turned into a review. ``review`` is the existing
+    review when that is the reason."""
+
+    def __init__(self, message, review=None):
+        super().__init__(message)
+        self.review = review
+
+
+class GameIngestor:
+    """Creates reviews from IGDB game dicts.
+
+    One instance serves a whole command run or worker process. Companies,
+    genres and candidate reviewers are looked up once and remembered, so
+    later games skip those queries and a company's logo is only uploaded
+    when the company is first created. Call ``reset`` between batches so a
+    long-running worker sees rows edited in the admin.
+
+    A lenient ingestor (``auto_generate_reviews``) fills in placeholder
+    companies, description and review text where the strict one skips the
+    game or lets the error propagate. ``warn`` is called with a message
+    whenever an upload or AI request fails and a fallback is used.
+    """
+
+    def __init__(self, lenient=False, warn=None):
+        self.lenient = lenient
+        self.warn = warn or (lambda message: None)
+        self.reset()
+
+    def reset(self):
+        self.companies = {}
+        self.genres = {}
+        self.reviewer_ids = None
+
+    def create_review(self, game, review_score, is_published=True,
+                      is_featured=False):
+        """Create and return the review for ``game``, with its genres,
+        platforms, release dates, companies and cover preview.
+
+        Raises ``SkipGame`` when a review already exists or a strict
+        ingestor finds no developer or publisher. Both are checked before
+        anything is uploaded or generated.
+        """
+        known = set(self.companies), set(self.genres)
+        try:
+            return self.save_review(
+                game, review_score, is_published, is_featured)
+        except Exception:
+            # Callers run each game in a savepoint, so the companies and
+            # genres created for it may have been rolled back; a later
+            # game must not be linked to their ids
+            self.forget_new(*known)
+            raise
+
+    def save_review(self, game, review_score, is_published, is_featured):
+        title = (game.get('name') or '').strip()
+        if not title:
+            raise SkipGame('Game has no name')
+        slug = slugify(title)
+        match = Q(title__iexact=title) | Q(slug=slug)
+        if game.get('id'):
+            match |= Q(igdb_id=game['id'])
+        existing = Review.objects.filter(match).first()
+        if existing:
+            raise SkipGame('Review already exists', existing)
+
+        developer = self.primary_company(Developer, game.get('developers'))
+        publisher = self.primary_company(Publisher, game.get('publishers'))
+        if not (developer and publisher):
+            raise SkipGame('Missing developer or publisher')
+
+        description = game.get('summary') or ''
+        if not description and self.lenient:
+            description = f'Great game: {title}'
+
+        review = Review.objects.create(
+            title=title,
+            slug=slug,
+            igdb_id=game.get('id'),
+            publisher=publisher,
+            developer=developer,
+            description=description,
+            release_date=release_date(game),
+            review_score=review_score,
+            review_text=self.review_text(title),
+            reviewed_by_id=self.reviewer_id(),
+            review_date=timezone.now(),
+            featured_image=self.cover(game, title),
+            is_featured=is_featured,
+            is_published=is_published
+        )
+
+        genres = self.genres_for(game)
+        if genres:
+            review.genres.set(genres)
+        save_game_relations(
+            review, game, create_company=self.create_company, created=True)
+        store_lqip(review)
+        return review
+
+    def forget_new(self, companies, genres):
+        """Drop the companies and genres remembered since the keys
+        ``companies`` and ``genres`` were taken"""
+        for key in self.companies.keys() - companies:
+            del self.companies[key]
+        for name in self.genres.keys() - genres:
+            del self.genres[name]
+
+    def primary_company(self, model, companies):
+        """The first named company in the IGDB list as a row, created with
+        an uploaded logo if it is new"""
+        for data in companies or []:
+            company = self.company(model, data)
+            if company:
+                return company
+        if self.lenient:
+            name, description = PLACEHOLDER_COMPANIES[model]
+            return self.company(model, {'name': name,
+                                        'description': description})
+        return None
+
+    def company(self, model, data):
+        name = (data.get('name') or '').strip()
+        if not name:
+            return None
+        key = (model, name.lower())
+        if key not in self.companies:
+            company = find_by_igdb_id_or_name(model, data.get('id'), name)
+            if company is None:
+                company = self.create_company(model, name, data)
+            self.companies[key] = company
+        return self.companies[key]
+
+    def create_company(self, model, name, data):
+        logo_url = absolute_url(data.get('logo_url'))
+        logo = logo_url
+        if logo_url:
+            try:
+                logo = upload_image(logo_url, LOGO_FOLDERS[model], name)
+            except Exception as e:
+                self.warn(f'Failed to upload logo for {name}: {e}')
+        company, _ = model.objects.get_or_create(
+            name=name,
+            defaults={
+                'igdb_id': data.get('id'),
+                'description': data.get('description', ''),
+                'website': data.get('website', ''),
+                'founded_year': data.get('founded_year') or None,
+                'logo': logo or 'placeholder',
+            }
+        )
+        return company
+
+    def genres_for(self, game):
+        genres = []
+        for data in game.get('genres') or []:
+            name = (data.get('name') or '').strip()
+            if not name:
+                continue
+            if name not in self.genres:
+                genre = find_by_igdb_id_or_name(Genre, data.get('id'), name)
+                if genre is None:
+                    # get_or_create rather than bulk_create so the
+                    # navigation menus are rebuilt by the post_save signal
+                    genre, _ = Genre.objects.get_or_create(
+                        name=name, defaults={'igdb_id': data.get('id')})
+                self.genres[name] = genre
+            if self.genres[name] not in genres:
+                genres.append(self.genres[name])
+        return genres
+
+    def cover(self, game, title):
+        """Cloudinary public id of the game's cover, or the placeholder"""
+        cover_url = game.get('cover_url') or ''
+        if not cover_url and game.get('cover'):
+            cover_url = game['cover'].get('url', '')
+        if cover_url:
+            try:
+                return upload_image(cover_url, 'game_covers', title)
+            except Exception as e:
+                self.warn(f'Failed to upload cover for {title}: {e}')
+        return 'placeholder'
+
+    def review_text(self, title):
+        fallback = f'Auto-generated review for {title}.'
+        if not self.lenient:
+            return generate_ai_review(title) or fallback
+        try:
+            return generate_ai_review(title) or fallback
+        except Exception as e:
+            self.warn(f'AI review generation failed for {title}: {e}')
+            return fallback
+
+    def reviewer_id(self):
+        """A random user to credit the review to.
+
+        User ids are fetched once per batch instead of sorting the whole
+        table randomly for every review.
+        """
+        if not self.reviewer_ids:
+            self.reviewer_ids = list(
+                User.objects.values_list('pk', flat=True))
+        if not self.reviewer_ids:
+            self.reviewer_ids = [User.objects.create_user(
+                'reviewer', 'reviewer@example.com', 'password').pk]
+        return random.choice(self.reviewer_ids)
+
+
+def release_date(game):
+    """Earliest listed release date, or today"""
+    dates = []
+    for release in game.get('release_dates') or []:
+        try:
+            dates.append(
+                datetime.datetime.fromtimestamp(release['date']).date())
+        except Exception:
+            pass
+    return min(dates, default=datetime.date.today())
+
+
+def find_by_igdb_id_or_name(model, igdb_id, name):
+    """The row for an IGDB entity, matched by id or else by name. A row
+    matched by name gets the id stored so later syncs can find it."""
+    match = Q(name__iexact=name)
+    if igdb_id:
+        match |= Q(igdb_id=igdb_id)
+    rows = list(model.objects.filter(match)[:2])
+    row = next((row for row in rows if igdb_id and row.igdb_id == igdb_id),
+               rows[0] if rows else None)
+    if row is not None and igdb_id and row.igdb_id is None:
+        row.igdb_id = igdb_id
+        model.objects.filter(pk=row.pk).update(igdb_id=igdb_id)
+    return row
@@ -0,0 +1,230 @@
+from itertools import batched
+from django.utils import timezone
+from developer.models import Developer
+from publisher.models import Publisher
+from reviews.game_relations import (
+    RELATIONS_PREFETCH, save_game_relations, set_if_changed
+)
+from reviews.html import store_rendered_html
+from reviews.igdb_service import (
+    COMPANY_FIELDS, GAME_FIELDS, QUERY_LIMIT, format_company, format_game
+)
+from reviews.models import Genre, Review, SyncWatermark
+from .service import GameIngestor, release_date
+import datetime
+
+# Local models holding rows of each IGDB endpoint, and the field IGDB's
+# ``name`` is stored in
+SOURCES = {
+    'genres': ((Genre, 'name'),),
+    'companies': ((Developer, 'name'), (Publisher, 'name')),
+    'games': ((Review, 'title'),),
+}
+
+FIELDS = {
+    'genres': 'id, name',
+    'companies': COMPANY_FIELDS,
+    'games': GAME_FIELDS,
+}
+
+# Re-read this much before the watermark so clock skew between IGDB and
+# this server can't drop an update
+SYNC_OVERLAP = datetime.timedelta(minutes=10)
+
+
+class CatalogSync:
+    """Refresh stored genres, companies and games from IGDB by IGDB id.
+
+    Each endpoint has a :model:`reviews.SyncWatermark`. A run asks IGDB,
+    one batch of local ids per request, for the rows updated since then,
+    compares them with the local rows and writes only those that differ,
+    with one ``bulk_update`` per batch. The watermark moves to the start
+    of the run once every batch has succeeded, so the next run only
+    fetches the delta.
+
+    Review titles, company names, logos and covers are left alone: they
+    are edited on the site. Empty IGDB values never blank out local ones.
+    """
+
+    def __init__(self, igdb, full=False, dry_run=False,
+                 batch_size=QUERY_LIMIT, log=None):
+        self.igdb = igdb
+        self.full = full
+        self.dry_run = dry_run
+        self.batch_size = min(batch_size, QUERY_LIMIT)
+        self.log = log or (lambda message: None)
+        self.ingestor = GameIngestor()
+
+    def run(self, endpoints=SOURCES):
+        """Sync ``endpoints`` and return the number of rows changed for
+        each"""
+        from reviews.signals import clear_review_caches, deferred_similarity
+        # Games whose genres change get their similar games recomputed
+        # together at the end rather than one at a time
+        with deferred_similarity():
+            changed = {
+                endpoint: self.sync(endpoint) for endpoint in endpoints}
+        if any(changed.values()) and not self.dry_run:
+            # bulk_update sends no signals
+            clear_review_caches()
+        return changed
+
+    def sync(self, endpoint):
+        # Unsaved until the run succeeds, so a dry run writes nothing
+        watermark = (
+            SyncWatermark.objects.filter(endpoint=endpoint).first()
+            or SyncWatermark(endpoint=endpoint))
+        started = timezone.now()
+        since = None
+        if watermark.synced_until and not self.full:
+            since = int((watermark.synced_until - SYNC_OVERLAP).timestamp())
+
+        updated = changed = 0
+        apply = getattr(self, f'apply_{endpoint}')
+        for ids in batched(self.local_ids(endpoint), self.batch_size):
+            rows = self.igdb.updated_since(
+                endpoint, FIELDS[endpoint], ids, since)
+            updated += len(rows)
+            if rows:
+                changed += apply(rows)
+
+        self.log(f'{endpoint}: {updated} updated on IGDB, '
+                 f'{changed} changed here')
+        if not self.dry_run:
+            watermark.synced_until = started
+            watermark.save()
+        return changed
+
+    def local_ids(self, endpoint):
+        ids = set()
+        for model, _ in SOURCES[endpoint]:
+            ids.update(model.objects.filter(
+                igdb_id__isnull=False).values_list('igdb_id', flat=True))
+        return sorted(ids)
+
+    def apply_genres(self, rows):
+        names = {row['id']: row.get('name') for row in rows}
+        taken = set(Genre.objects.filter(
+            name__in=[name for name in names.values() if name]
+        ).values_list('name', flat=True))
+        changed = []
+        for genre in Genre.objects.filter(igdb_id__in=names):
+            name = names[genre.igdb_id]
+            if name and name != genre.name and name not in taken:
+                genre.name = name
+                changed.append(genre)
+        self.save(Genre, changed, {'name'})
+        return len(changed)
+
+    def apply_companies(self, rows):
+        companies = {row['id']: format_company(row) for row in rows}
+        count = 0
+        for model, _ in SOURCES['companies']:
+            changed, fields = [], set()
+            for company in model.objects.filter(igdb_id__in=companies):
+                data = companies[company.igdb_id]
+                updates = set_changed(company, {
+                    'description': data['description'],
+                    'website': data['website'][:200],
+                    'founded_year': data['founded_year'] or None,
+                })
+                if 'description' in updates:
+                    updates |= rendered_fields(
+                        company, {'description': 'description_html'})
+                if updates:
+                    changed.append(company)
+                    fields |= updates
+            self.save(model, changed, fields)
+            count += len(changed)
+        return count
+
+    def apply_games(self, rows):
+        games = {row['id']: format_game(row) for row in rows}
+        changed, fields = [], set()
+        for review in Review.objects.filter(
+                igdb_id__in=games).prefetch_related(
+                'genres', *RELATIONS_PREFETCH):
+            game = games[review.igdb_id]
+            updates = set_changed(review, {
+                'description': game['summary'],
+                'release_date': (
+                    release_date(game) if game.get('release_dates')
+                    else None),
+            })
+            if 'description' in updates:
+                updates |= rendered_fields(
+                    review, {'description': 'description_html'})
+            if updates:
+                changed.append(review)
+                fields |= updates
+            if not self.dry_run:
+                self.save_relations(review, game)
+        self.save(Review, changed, fields)
+        return len(changed)
+
+    def save_relations(self, review, game):
+        """Rewrite the relations that differ from IGDB's. Companies new
+        here are created by the ingestor, with their logos uploaded."""
+        set_if_changed(review.genres, self.ingestor.genres_for(game))
+        save_game_relations(
+            review, game, create_company=self.ingestor.create_company)
+
+    def save(self, model, rows, fields):
+        if self.dry_run or not rows:
+            return
+        # bulk_update skips auto_now
+        if any(field.name == 'updated_on' for field in model._meta.fields):
+            now = timezone.now()
+            for row in rows:
+                row.updated_on = now
+            fields = fields | {'updated_on'}
+        model.objects.bulk_update(
+            rows, sorted(fields), batch_size=self.batch_size)
+
+    def link(self):
+        """Store IGDB ids on rows ingested before ids were kept.
+
+        Rows are matched on an exact name in batches; a name IGDB has
+        several entities for is left unlinked rather than guessed.
+        Returns the number of rows linked per endpoint.
+        """
+        linked = {}
+        for endpoint, sources in SOURCES.items():
+            linked[endpoint] = 0
+            for model, name_field in sources:
+                taken = set(model.objects.filter(
+                    igdb_id__isnull=False).values_list('igdb_id', flat=True))
+                unlinked = model.objects.filter(
+                    igdb_id__isnull=True).values_list('pk', name_field)
+                for batch in batched(unlinked, self.batch_size):
+                    found = self.igdb.ids_by_name(
+                        endpoint, [name for _, name in batch])
+                    rows = []
+                    for pk, name in batch:
+                        ids = found.get(name, [])
+                        if len(ids) == 1 and ids[0] not in taken:
+                            taken.add(ids[0])
+                            rows.append(model(pk=pk, igdb_id=ids[0]))
+                    if rows and not self.dry_run:
+                        model.objects.bulk_update(rows, ['igdb_id'])
+                    linked[endpoint] += len(rows)
+            self.log(f'{endpoint}: {linked[endpoint]} linked by name')
+        return linked
+
+
+def set_changed(obj, values):
+    """Set each non-empty value that differs from ``obj``'s, returning
+    the names of the fields changed"""
+    changed = set()
+    for field, value in values.items():
+        if value in (None, '') or getattr(obj, field) == value:
+            continue
+        setattr(obj, field, value)
+        changed.add(field)
+    return changed
+
+
+def rendered_fields(obj, fields):
+    """Refill the stored HTML and excerpt ``save()`` would have, for
+    ``bulk_update``"""
+    return store_rendered_html(obj, fields, set(fields))
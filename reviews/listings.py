@@ -0,0 +1,155 @@
+from django.db.models import Count
+from django.db.models.functions import ExtractYear
+from config.cache import namespace
+from .models import Platform, ReleaseDate, Review
+
+LISTING_PAGE_SIZE = 16
+LISTING_CACHE_SECONDS = 10 * 60
+
+# Orderings a listing can be requested in; each is cached separately
+LISTING_ORDERINGS = {
+    'az': ('title',),
+    'za': ('-title',),
+    'newest': ('-review_date', '-pk'),
+    'oldest': ('review_date', 'pk'),
+    'released': ('-release_date', '-pk'),
+}
+
+listing_cache = namespace('listings', LISTING_CACHE_SECONDS)
+navigation_cache = namespace('navigation')
+
+
+def listing_filter(kind, entity_id):
+    """Queryset filter for one listing; ``kind`` is 'all', 'genre',
+    'developer', 'publisher', 'platform' or 'year' (``entity_id`` is then
+    the year of first release)"""
+    if kind == 'genre':
+        return {'genres': entity_id}
+    if kind == 'platform':
+        return {'platforms': entity_id}
+    if kind == 'year':
+        return {'release_date__year': entity_id}
+    if kind == 'developer':
+        return {'developer_id': entity_id}
+    if kind == 'publisher':
+        return {'publisher_id': entity_id}
+    return {}
+
+
+def listing_ids(kind, entity_id=0, sort='az'):
+    """Ids of the published reviews in a listing, in display order.
+
+    Filters on the entity's id, so a genre listing is a plain join on the
+    M2M table rather than a case-insensitive name match.
+    """
+    if sort not in LISTING_ORDERINGS:
+        sort = 'az'
+    return listing_cache.get_or_compute(
+        kind, entity_id, sort,
+        compute=lambda: list(listing_queryset(kind, entity_id, sort)),
+    )
+
+
+def listing_queryset(kind, entity_id, sort):
+    if kind == 'platform' and sort == 'released':
+        # Newest first by the game's first release on this platform,
+        # read off the (platform, is_first, date) index
+        return ReleaseDate.objects.filter(
+            platform_id=entity_id, is_first=True, review__is_published=True
+        ).order_by('-date', '-review_id').values_list('review_id', flat=True)
+    return Review.objects.filter(
+        is_published=True, **listing_filter(kind, entity_id)
+    ).order_by(*LISTING_ORDERINGS[sort]).values_list(
+        'pk', flat=True).distinct()
+
+
+def card_reviews(ids):
+    """Load reviews for a page of cards in one query, keeping ``ids``
+    order, with the comment and user review counts the cards show.
+    Cards show the stored excerpt, so the full texts aren't loaded."""
+    reviews = Review.objects.annotate(
+        comment_count=Count('user_comments', distinct=True),
+        user_review_count=Count('user_reviews', distinct=True),
+    ).defer(
+        'description', 'review_text', 'description_html', 'review_html'
+    ).in_bulk(ids)
+    return [reviews[pk] for pk in ids if pk in reviews]
+
+
+def platform_counts():
+    """Platforms with published games, each with ``num_games``"""
+    return navigation_cache.get_or_compute(
+        'platforms',
+        compute=lambda: list(
+            Platform.objects.filter(reviews__is_published=True)
+            .annotate(num_games=Count('reviews', distinct=True))
+            .order_by('name')
+        ),
+    )
+
+
+def release_year_counts():
+    """``(year, num_games)`` for every year a published game was first
+    released in, newest first"""
+    return navigation_cache.get_or_compute(
+        'release_years',
+        compute=lambda: list(
+            Review.objects.filter(is_published=True)
+            .annotate(year=ExtractYear('release_date'))
+            .values('year').order_by('-year')
+            .annotate(num_games=Count('pk'))
+            .values_list('year', 'num_games')
+        ),
+    )
+
+
+def listing_keys(kind, entity_ids):
+    """Cache keys of the listings of the given entities"""
+    return [
+        (kind, entity_id, sort)
+        for entity_id in entity_ids if entity_id is not None
+        for sort in LISTING_ORDERINGS
+    ]
+
+
+def clear_listings(kind, entity_ids):
+    """Drop the cached listings of the given entities"""
+    listing_cache.delete_many(listing_keys(kind, entity_ids))
+
+
+def clear_listing_keys(keys):
+    listing_cache.delete_many(keys)
+
+
+def review_listing_keys(review, previous=None):
+    """Cache keys of every listing ``review`` appears in, and those it
+    appeared in before the change when ``previous`` holds its old
+    ``(developer_id, publisher_id, release_date)``. Its genres and
+    platforms are read now, so the keys can be cleared after commit."""
+    developer_ids = {review.developer_id}
+    publisher_ids = {review.publisher_id}
+    years = {release_year(review.release_date)}
+    if previous:
+        developer_ids.add(previous[0])
+        publisher_ids.add(previous[1])
+        years.add(release_year(previous[2]))
+    keys = (listing_keys('all', [0])
+            + listing_keys('developer', developer_ids)
+            + listing_keys('publisher', publisher_ids)
+            + listing_keys('year', years))
+    if review.pk:
+        keys += listing_keys(
+            'genre', review.genres.values_list('pk', flat=True))
+        keys += listing_keys(
+            'platform', review.platforms.values_list('pk', flat=True))
+    return keys
+
+
+def release_year(date):
+    # release_date may still be a string on an instance built from a form
+    return getattr(date, 'year', None)
+
+
+def clear_all_listings():
+    """Invalidate every listing at once, for bulk updates"""
+    listing_cache.invalidate()
@@ -1,17 +1,9 @@
 from django.core.management.base import BaseCommand
 from django.db import transaction
-from django.utils.text import slugify
+from reviews.auto_generate import ReviewGenerator
+from reviews.candidate_frontier import CandidateFrontier
 from reviews.igdb_service import IGDBService
-from reviews.management.commands.populate_reviews import (
-    Command as PopulateCommand
-)
-from reviews.models import Review, Genre
-from developer.models import Developer
-from publisher.models import Publisher
-from django.contrib.auth.models import User
-import datetime
-import random
-from django.utils import timezone
+from reviews.models import PopulateJobResult
 
 
 class Command(BaseCommand):
@@ -30,6 +22,17 @@ class Command(BaseCommand):
             '--max-score', type=float, default=10.0,
             help='Maximum review score (default 10.0)'
         )
+        parser.add_argument(
+            '--batch-size', type=int, default=50,
+            help='IGDB results fetched per franchise page (default 50)'
+        )
+        parser.add_argument(
+            '--reset-frontier', action='store_true',
+            help='Forget franchise paging positions and seen IGDB ids'
+        )
+
+    def warn(self, message):
+        self.stdout.write(self.style.WARNING(message))
 
     def handle(self, *args, **options):
         count = options['count']
@@ -39,308 +42,33 @@ class Command(BaseCommand):
         msg = f'Generating {count} reviews with scores {min_score}-{max_score}'
         self.stdout.write(self.style.NOTICE(msg))
 
-        igdb = IGDBService()
-        populate_helpers = PopulateCommand()
-
-        # Popular game franchises
-        games_list = [
-            "Call of Duty", "FIFA", "Grand Theft Auto", "The Witcher",
-            "Assassin's Creed", "Super Mario", "The Legend of Zelda",
-            "Final Fantasy", "Resident Evil", "Halo", "God of War",
-            "Minecraft", "Fortnite", "Red Dead Redemption", "Cyberpunk",
-            "Apex Legends", "Overwatch", "Counter-Strike", "Valorant",
-            "Destiny", "Battlefield", "Mass Effect", "Elder Scrolls",
-            "Fallout", "Dark Souls", "Sekiro", "Bloodborne",
-            "Monster Hunter", "Street Fighter", "Tekken", "Pokemon",
-            "Spider-Man", "Batman", "Mortal Kombat", "Tomb Raider",
-            "Bioshock", "Portal", "Half-Life", "Dota", "League",
-            "Starcraft", "Diablo", "World of Warcraft", "Borderlands",
-            "Dishonored", "Hitman", "Splinter Cell", "Ghost Recon",
-            "Rainbow Six", "Watch Dogs", "Far Cry", "Crysis",
-            "Metro", "S.T.A.L.K.E.R.", "Dying Light", "Dead Island",
-            "Left 4 Dead", "Team Fortress", "Garry's Mod", "Rust",
-            "PUBG", "Among Us", "Fall Guys", "Rocket League",
-            "Cities", "Civilization", "Total War", "Age of Empires",
-            "Starcraft", "Command", "Anno", "SimCity"
-        ]
-
-        created_count = 0
-        attempts = 0
-        max_attempts = count * 3
+        if options['reset_frontier']:
+            CandidateFrontier.reset()
+            self.stdout.write(self.style.NOTICE('Candidate frontier reset'))
+
+        generator = ReviewGenerator(
+            IGDBService(), count, min_score, max_score,
+            batch_size=options['batch_size'], warn=self.warn)
+
+        def report(title, outcome, review, message):
+            if outcome == PopulateJobResult.OUTCOME_CREATED:
+                self.stdout.write(self.style.SUCCESS(
+                    f'Created {generator.created}/{count}: '
+                    f'{title} ({review.review_score}/10)'))
+            elif outcome == PopulateJobResult.OUTCOME_SKIPPED:
+                self.stdout.write(self.style.WARNING(
+                    f'Failed to create review for {title}: {message}'))
+            else:
+                self.stdout.write(self.style.ERROR(
+                    f'Review creation error for {title}: {message}'))
 
         with transaction.atomic():
-            while created_count < count and attempts < max_attempts:
-                attempts += 1
-
-                search_term = random.choice(games_list)
-
-                try:
-                    games = igdb.search_games_with_platforms(
-                        search_term, limit=10
-                    )
-
-                    if not games:
-                        self.stdout.write(
-                            self.style.WARNING(
-                                f'No games found for: {search_term}'
-                            )
-                        )
-                        continue
-
-                    game = random.choice(games)
-                    title = game.get('name')
-                    if not title:
-                        continue
-
-                    slug = slugify(title)
-
-                    # Skip if exists
-                    if (Review.objects.filter(title__iexact=title).exists() or
-                            Review.objects.filter(slug=slug).exists()):
-                        self.stdout.write(
-                            self.style.WARNING(f'Skipping duplicate: {title}')
-                        )
-                        continue
-
-                    # Create review using populate_reviews functionality
-                    try:
-                        review = self.create_review_from_game(
-                            game, min_score, max_score, populate_helpers
-                        )
-
-                        if review:
-                            created_count += 1
-                            msg = (
-                                f'Created {created_count}/{count}: '
-                                f'{title} ({review.review_score}/10)'
-                            )
-                            self.stdout.write(self.style.SUCCESS(msg))
-                        else:
-                            self.stdout.write(
-                                self.style.WARNING(
-                                    f'Failed to create review for {title}'
-                                )
-                            )
-                            continue
-                    except Exception as review_error:
-                        self.stdout.write(
-                            self.style.ERROR(
-                                f'Review creation error for {title}: '
-                                f'{review_error}'
-                            )
-                        )
-                        continue
-
-                except Exception as e:
-                    self.stdout.write(
-                        self.style.ERROR(f'Error with {search_term}: {e}')
-                    )
-                    continue
+            created_count = generator.run(report)
+        if generator.stop_reason:
+            self.stdout.write(self.style.WARNING(generator.stop_reason))
 
+        self.stdout.write(
+            f'IGDB search requests used: {generator.frontier.api_calls}'
+        )
         final_msg = f'Created {created_count} reviews'
         self.stdout.write(self.style.SUCCESS(final_msg))
-
-    def create_review_from_game(self, game, min_score, max_score, helpers):
-        """Create a review using populate_reviews functionality"""
-        title = game.get('name')
-        slug = slugify(title)
-
-        # Random score
-        review_score = round(random.uniform(min_score, max_score), 1)
-
-        # Get developer and publisher using populate methods
-        developer_obj = self.get_developer(game, helpers)
-        publisher_obj = self.get_publisher(game, helpers)
-
-        # Create default developer/publisher if none found
-        if not developer_obj:
-            developer_obj, _ = Developer.objects.get_or_create(
-                name="Unknown Developer",
-                defaults={"description": "Developer information not available"}
-            )
-
-        if not publisher_obj:
-            publisher_obj, _ = Publisher.objects.get_or_create(
-                name="Unknown Publisher",
-                defaults={"description": "Publisher information not available"}
-            )
-
-        # Game details
-        description = game.get('summary', '') or f'Great game: {title}'
-        release_date = self.get_release_date(game)
-
-        # Upload cover using populate method
-        featured_image = self.get_cover(game, title, helpers)
-
-        # Generate review text using populate method
-        try:
-            review_text = helpers.generate_ai_review(title)
-            if not review_text:
-                review_text = (
-                    f"Auto-generated review for {title}. This game offers "
-                    "an engaging experience with solid gameplay mechanics."
-                )
-        except Exception as e:
-            self.stdout.write(
-                self.style.WARNING(
-                    f'AI review generation failed for {title}: {e}'
-                )
-            )
-            review_text = (
-                f"Auto-generated review for {title}. This game offers "
-                "an engaging experience with solid gameplay mechanics."
-            )
-
-        reviewer = self.get_reviewer()
-
-        # Create review
-        review = Review.objects.create(
-            title=title,
-            slug=slug,
-            publisher=publisher_obj,
-            developer=developer_obj,
-            description=description,
-            release_date=release_date,
-            review_score=review_score,
-            review_text=review_text,
-            reviewed_by=reviewer,
-            review_date=timezone.now(),
-            featured_image=featured_image,
-            is_featured=False,
-            is_published=True
-        )
-
-        # Add genres
-        self.add_genres(game, review)
-
-        return review
-
-    def get_developer(self, game, helpers):
-        """Get or create developer"""
-        if not game.get('developers'):
-            return None
-
-        dev = game['developers'][0]
-        name = dev.get('name')
-        if not name:
-            return None
-
-        logo_url = dev.get('logo_url', '')
-        if logo_url and logo_url.startswith('//'):
-            logo_url = 'https:' + logo_url
-
-        cloud_logo = None
-        if logo_url:
-            try:
-                cloud_logo = helpers.upload_developer_logo_to_cloudinary(
-                    logo_url, name
-                )
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f'Logo upload failed: {e}')
-                )
-
-        obj, _ = Developer.objects.get_or_create(
-            name=name,
-            defaults={
-                'description': dev.get('description', ''),
-                'website': dev.get('website', ''),
-                'founded_year': dev.get('founded_year') or None,
-                'logo': cloud_logo or logo_url or ''
-            }
-        )
-        return obj
-
-    def get_publisher(self, game, helpers):
-        """Get or create publisher"""
-        if not game.get('publishers'):
-            return None
-
-        pub = game['publishers'][0]
-        name = pub.get('name')
-        if not name:
-            return None
-
-        logo_url = pub.get('logo_url', '')
-        if logo_url and logo_url.startswith('//'):
-            logo_url = 'https:' + logo_url
-
-        cloud_logo = None
-        if logo_url:
-            try:
-                cloud_logo = helpers.upload_publisher_logo_to_cloudinary(
-                    logo_url, name
-                )
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f'Publisher logo upload failed: {e}')
-                )
-
-        obj, _ = Publisher.objects.get_or_create(
-            name=name,
-            defaults={
-                'description': pub.get('description', ''),
-                'website': pub.get('website', ''),
-                'founded_year': pub.get('founded_year') or None,
-                'logo': cloud_logo or logo_url or ''
-            }
-        )
-        return obj
-
-    def get_release_date(self, game):
-        """Get release date"""
-        release_date = datetime.date.today()
-        if game.get('release_dates'):
-            try:
-                timestamp = game['release_dates'][0].get('date')
-                if timestamp:
-                    release_date = datetime.datetime.fromtimestamp(
-                        timestamp
-                    ).date()
-            except Exception:
-                pass
-        return release_date
-
-    def get_cover(self, game, title, helpers):
-        """Get cover image"""
-        cover_url = game.get('cover_url', '')
-        if not cover_url and game.get('cover'):
-            cover_url = game['cover'].get('url', '')
-
-        if cover_url and cover_url.startswith('//'):
-            cover_url = 'https:' + cover_url
-
-        if cover_url:
-            try:
-                cloud_cover = helpers.upload_cover_to_cloudinary(
-                    cover_url, title
-                )
-                if cloud_cover:
-                    return cloud_cover
-            except Exception as e:
-                self.stdout.write(
-                    self.style.WARNING(f'Cover upload failed for {title}: {e}')
-                )
-
-        # Always return placeholder instead of None to avoid failures
-        return 'placeholder'
-
-    def get_reviewer(self):
-        """Get reviewer"""
-        reviewer = User.objects.order_by('?').first()
-        if not reviewer:
-            reviewer = User.objects.create_user(
-                'reviewer', 'reviewer@example.com', 'password'
-            )
-        return reviewer
-
-    def add_genres(self, game, review):
-        """Add genres"""
-        if game.get('genres'):
-            for genre_data in game['genres']:
-                genre_name = genre_data.get('name')
-                if genre_name:
-                    genre_obj, _ = Genre.objects.get_or_create(
-                        name=genre_name
-                    )
-                    review.genres.add(genre_obj)
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.models import Review
+from reviews.igdb_service import IGDBService
+from reviews.game_relations import save_game_relations
+
+
+class Command(BaseCommand):
+    help = ('Store IGDB platforms, release dates and companies for reviews '
+            'created before they were saved at ingest time')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=0,
+            help='Maximum number of reviews to process (default: all)')
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Refresh every review, not only those without platforms')
+
+    def handle(self, *args, **options):
+        reviews = Review.objects.select_related(
+            'developer', 'publisher'
+        ).order_by('pk')
+        if not options['all']:
+            reviews = reviews.filter(platforms__isnull=True)
+        if options['limit']:
+            reviews = reviews[:options['limit']]
+
+        igdb = IGDBService()
+        updated = 0
+        for review in reviews:
+            platform_data = igdb.get_game_platforms_by_name(review.title)
+            if not platform_data:
+                self.stdout.write(self.style.WARNING(
+                    f'No IGDB match for {review.title}'))
+                continue
+            with transaction.atomic():
+                save_game_relations(review, platform_data['game'])
+            updated += 1
+            self.stdout.write(f'Updated {review.title}')
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored IGDB details for {updated} review(s)'))
@@ -0,0 +1,37 @@
+from django.core.management.base import BaseCommand
+from reviews.models import Review
+from reviews.images import store_lqip
+
+
+class Command(BaseCommand):
+    help = ('Store blurred cover previews for reviews created before they '
+            'were computed at ingest time')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--limit', type=int, default=0,
+            help='Maximum number of reviews to process (default: all)')
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Refresh every review, not only those without a preview')
+
+    def handle(self, *args, **options):
+        reviews = Review.objects.exclude(
+            featured_image='placeholder'
+        ).only('id', 'title', 'featured_image', 'image_lqip').order_by('pk')
+        if not options['all']:
+            reviews = reviews.filter(image_lqip='')
+        if options['limit']:
+            reviews = reviews[:options['limit']]
+
+        updated = 0
+        for review in reviews:
+            if store_lqip(review):
+                updated += 1
+                self.stdout.write(f'Updated {review.title}')
+            else:
+                self.stdout.write(self.style.WARNING(
+                    f'Could not fetch a preview for {review.title}'))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored previews for {updated} review(s)'))
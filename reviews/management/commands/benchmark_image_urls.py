@@ -0,0 +1,74 @@
+import copy
+import time
+from itertools import cycle, islice
+from django.core.management.base import BaseCommand, CommandError
+from reviews.models import Review
+from reviews.images import delivery_url
+
+
+class Command(BaseCommand):
+    help = ('Measure per-page cost of building cover image URLs for a grid '
+            'of review cards, before and after the URL cache')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--cards', type=int, default=16,
+            help='Number of cards on the simulated page (default: 16)')
+        parser.add_argument(
+            '--pages', type=int, default=500,
+            help='Number of page renders to time (default: 500)')
+
+    def handle(self, *args, **options):
+        cards = options['cards']
+        pages = options['pages']
+        reviews = list(
+            Review.objects.exclude(featured_image='placeholder')
+            .only('id', 'title', 'featured_image')[:cards]
+        )
+        if not reviews:
+            raise CommandError('No reviews with a cover image to benchmark')
+        reviews = list(islice(cycle(reviews), cards))
+
+        def uncached_page(page):
+            # What the templates did before: .url for the placeholder
+            # check and again for src
+            for review in page:
+                if 'placeholder' not in review.featured_image.url:
+                    review.featured_image.url
+
+        def cached_page(page):
+            for review in page:
+                if not review.card_image.placeholder:
+                    review.card_image.src
+                    review.card_image.srcset
+
+        delivery_url.cache_clear()
+        results = []
+        for label, render in (('featured_image.url', uncached_page),
+                              ('card_image (cold)', cached_page),
+                              ('card_image (warm)', cached_page)):
+            if label == 'card_image (cold)':
+                delivery_url.cache_clear()
+            elapsed = 0.0
+            for page_number in range(pages):
+                # Fresh instances each page, as a new request would load
+                page = [copy.copy(review) for review in reviews]
+                for review in page:
+                    review.__dict__.pop('card_image', None)
+                if label == 'card_image (cold)' and page_number:
+                    delivery_url.cache_clear()
+                start = time.perf_counter()
+                render(page)
+                elapsed += time.perf_counter() - start
+            results.append((label, elapsed / pages))
+
+        self.stdout.write(f'{cards} cards, {pages} pages')
+        for label, per_page in results:
+            self.stdout.write(
+                f'{label:<20} {per_page * 1e6:10.1f} us/page '
+                f'{per_page * 1e6 / cards:8.2f} us/card')
+
+        info = delivery_url.cache_info()
+        self.stdout.write(self.style.SUCCESS(
+            f'URL cache: {info.hits} hits, {info.misses} misses, '
+            f'{info.currsize} entries'))
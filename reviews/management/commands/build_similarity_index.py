@@ -0,0 +1,26 @@
+from django.core.management.base import BaseCommand
+from reviews.detail import clear_review_details
+from reviews.similarity import (
+    SIMILAR_GAMES, WRITE_BATCH_SIZE, build_similarity_index
+)
+
+
+class Command(BaseCommand):
+    help = ('Recompute the "You might also like" games of every published '
+            'review from their genres, companies and scores')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--neighbours', type=int, default=SIMILAR_GAMES,
+            help=f'Similar games stored per review '
+                 f'(default: {SIMILAR_GAMES})')
+        parser.add_argument(
+            '--batch-size', type=int, default=WRITE_BATCH_SIZE,
+            help=f'Reviews per bulk insert (default: {WRITE_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        written = build_similarity_index(
+            k=options['neighbours'], batch_size=options['batch_size'])
+        clear_review_details()
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {written} similar games'))
@@ -0,0 +1,34 @@
+from django.contrib.auth.models import User
+from django.core.management.base import BaseCommand, CommandError
+from reviews.user_feed import USER_FEED_SIZE, build_user_feeds
+
+
+class Command(BaseCommand):
+    help = ('Rank published games for each user by the genres, developers '
+            'and publishers of the games they liked and reviewed, and '
+            'store the top of the ranking as their "For You" feed')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--user', action='append', dest='usernames',
+            help='Only rebuild this user\'s feed (repeatable; default: '
+                 'everyone)')
+        parser.add_argument(
+            '--size', type=int, default=USER_FEED_SIZE,
+            help=f'Games stored per feed (default: {USER_FEED_SIZE})')
+
+    def handle(self, *args, **options):
+        user_ids = None
+        if options['usernames']:
+            found = dict(User.objects.filter(
+                username__in=options['usernames']
+            ).values_list('username', 'pk'))
+            missing = set(options['usernames']) - set(found)
+            if missing:
+                raise CommandError(
+                    f'Unknown user(s): {", ".join(sorted(missing))}')
+            user_ids = list(found.values())
+
+        users, entries = build_user_feeds(user_ids, size=options['size'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Stored {entries} feed entries for {users} users'))
@@ -0,0 +1,29 @@
+from django.core.management.base import BaseCommand
+from config.cache import cache_metrics, namespace
+import reviews.signals  # noqa: F401  registers the review cache namespaces
+import developer.context_processors  # noqa: F401
+import publisher.context_processors  # noqa: F401
+
+
+class Command(BaseCommand):
+    help = 'Show shared cache hit/miss counters per namespace'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--invalidate', metavar='NAMESPACE',
+            help='Bump a namespace version, retiring all of its keys')
+
+    def handle(self, *args, **options):
+        if options['invalidate']:
+            namespace(options['invalidate']).invalidate()
+            self.stdout.write(self.style.SUCCESS(
+                f"Invalidated {options['invalidate']}"))
+
+        for name, metrics in sorted(cache_metrics().items()):
+            hits = metrics.get('hits', 0) + metrics.get('stale_hits', 0)
+            lookups = hits + metrics.get('misses', 0)
+            ratio = f'{hits / lookups:.1%}' if lookups else '-'
+            details = ', '.join(
+                f'{metric}={count}'
+                for metric, count in sorted(metrics.items()))
+            self.stdout.write(f'{name:<12} hit ratio {ratio:>6}  {details}')
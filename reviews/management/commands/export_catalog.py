@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+from reviews.transfer import EXPORT_CHUNK_SIZE, export_catalog, open_catalog
+
+
+class Command(BaseCommand):
+    help = ('Write reviews with their companies, genres, platforms, '
+            'release dates, comments and user reviews as NDJSON, for '
+            'import_catalog')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='File to write, gzipped if it ends in .gz '
+                         '("-" for stdout)')
+        parser.add_argument(
+            '--gzip', action='store_true',
+            help='Gzip the output whatever the file name')
+        parser.add_argument(
+            '--chunk-size', type=int, default=EXPORT_CHUNK_SIZE,
+            help=f'Rows fetched from the database at a time '
+                 f'(default: {EXPORT_CHUNK_SIZE})')
+
+    def handle(self, *args, **options):
+        with open_catalog(options['path'], 'w', options['gzip']) as stream:
+            counts = export_catalog(stream, options['chunk_size'])
+        summary = ', '.join(f'{count} {label}'
+                            for label, count in counts.items())
+        # Keep stdout clean for the catalog itself
+        self.stderr.write(self.style.SUCCESS(f'Exported {summary}'))
@@ -0,0 +1,40 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
+from reviews.transfer import IMPORT_BATCH_SIZE, CatalogImporter, open_catalog
+
+
+class Command(BaseCommand):
+    help = ('Load an export_catalog file, creating the reviews, companies, '
+            'genres and users this database does not have yet')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'path', help='File to read, gunzipped if it ends in .gz '
+                         '("-" for stdin)')
+        parser.add_argument(
+            '--batch-size', type=int, default=IMPORT_BATCH_SIZE,
+            help=f'Rows per bulk insert (default: {IMPORT_BATCH_SIZE})')
+
+    def handle(self, *args, **options):
+        importer = CatalogImporter(batch_size=options['batch_size'])
+        try:
+            with open_catalog(options['path'], 'r') as stream, \
+                    transaction.atomic():
+                counts = importer.run(stream)
+        except (OSError, ValueError) as e:
+            raise CommandError(e)
+
+        # bulk_create sends no signals
+        from reviews.signals import clear_review_caches
+        clear_review_caches()
+        if counts['reviews.review']['created']:
+            from reviews.similarity import build_similarity_index
+            build_similarity_index()
+
+        for label, count in counts.items():
+            self.stdout.write(
+                f'{label}: {count["created"]} created, '
+                f'{count["existing"]} already here, '
+                f'{count["skipped"]} skipped')
+        created = sum(count['created'] for count in counts.values())
+        self.stdout.write(self.style.SUCCESS(f'Imported {created} rows'))
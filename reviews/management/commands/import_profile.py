@@ -0,0 +1,94 @@
+import os
+import subprocess
+import sys
+from collections import namedtuple
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+# What a gunicorn worker imports before serving its first request
+STARTUP_SCRIPT = (
+    'import config.wsgi\n'
+    'from django.urls import get_resolver\n'
+    'get_resolver().url_patterns\n'
+)
+
+ImportTime = namedtuple('ImportTime', 'name depth self_us cumulative_us')
+
+
+def profile_startup(script=STARTUP_SCRIPT):
+    """Run ``script`` in a fresh interpreter under ``-X importtime`` and
+    return one ImportTime per module it imported, in import order"""
+    env = dict(os.environ)
+    env.setdefault('DJANGO_SETTINGS_MODULE', 'config.settings')
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', script],
+        cwd=settings.BASE_DIR, env=env, capture_output=True, text=True,
+    )
+    if result.returncode:
+        raise CommandError(
+            f'Startup failed:\n{result.stderr.strip()[-2000:]}')
+    return parse_importtime(result.stderr)
+
+
+def parse_importtime(output):
+    modules = []
+    for line in output.splitlines():
+        if not line.startswith('import time:'):
+            continue
+        try:
+            self_us, cumulative_us, name = line[12:].split('|')
+            self_us, cumulative_us = int(self_us), int(cumulative_us)
+        except ValueError:
+            # The column header
+            continue
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        modules.append(
+            ImportTime(name.strip(), depth, self_us, cumulative_us))
+    return modules
+
+
+def startup_ms(modules):
+    """Total import time: the sum of the top-level imports"""
+    return sum(m.cumulative_us for m in modules if m.depth == 0) / 1000
+
+
+class Command(BaseCommand):
+    help = ('Profile the imports a web worker makes at startup '
+            '(config.wsgi and the URLconf) and check them against '
+            'STARTUP_IMPORT_BUDGET_MS')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--top', type=int, default=15,
+            help='Number of slowest packages and modules to list '
+                 '(default: 15)')
+        parser.add_argument(
+            '--budget-ms', type=int,
+            default=settings.STARTUP_IMPORT_BUDGET_MS,
+            help='Fail when total import time exceeds this many '
+                 'milliseconds (default: STARTUP_IMPORT_BUDGET_MS)')
+
+    def handle(self, *args, **options):
+        modules = profile_startup()
+        top = options['top']
+
+        packages = {}
+        for module in modules:
+            package = module.name.split('.')[0]
+            packages[package] = packages.get(package, 0) + module.self_us
+        self.stdout.write('Slowest packages (ms, all their modules):')
+        for package, us in sorted(
+                packages.items(), key=lambda item: -item[1])[:top]:
+            self.stdout.write(f'  {us / 1000:8.1f}  {package}')
+
+        self.stdout.write('Slowest modules (self ms):')
+        for module in sorted(modules, key=lambda m: -m.self_us)[:top]:
+            self.stdout.write(f'  {module.self_us / 1000:8.1f}  {module.name}')
+
+        total = startup_ms(modules)
+        budget = options['budget_ms']
+        summary = (f'{len(modules)} modules imported in {total:.0f} ms '
+                   f'(budget {budget} ms)')
+        if total > budget:
+            raise CommandError(f'Over budget: {summary}')
+        self.stdout.write(self.style.SUCCESS(summary))
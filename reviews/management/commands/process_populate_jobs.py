@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand
+from reviews.populate_jobs import claim_next_job, run_job
+from reviews.ingest import GameIngestor
+import time
+
+
+class Command(BaseCommand):
+    help = ('Process review batches submitted from the populate interface. '
+            'Runs as a worker process (see Procfile) unless --once is given')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Process pending jobs and exit instead of polling')
+        parser.add_argument(
+            '--poll-interval', type=float, default=2.0,
+            help='Seconds to wait between polls when idle (default 2)')
+
+    def warn(self, message):
+        self.stdout.write(self.style.WARNING(message))
+
+    def handle(self, *args, **options):
+        once = options['once']
+        poll_interval = options['poll_interval']
+        # One ingestor, with its pooled connections, serves every job this
+        # worker runs
+        ingestor = GameIngestor(warn=self.warn)
+
+        self.stdout.write(self.style.NOTICE('Waiting for populate jobs...'))
+        while True:
+            job = claim_next_job()
+            if job is None:
+                if once:
+                    break
+                time.sleep(poll_interval)
+                continue
+
+            self.stdout.write(f'Processing {job} ({job.total} game(s))')
+            run_job(job, ingestor)
+            job.refresh_from_db()
+            self.stdout.write(self.style.SUCCESS(
+                f'Finished {job}: {job.created_count} created, '
+                f'{job.skipped_count} skipped, {job.error_count} error(s)'))
@@ -0,0 +1,47 @@
+import gzip
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.management.base import BaseCommand, CommandError
+from config.storage import bundle_path
+
+
+class Command(BaseCommand):
+    help = ('Report raw, gzip and Brotli sizes of the collected script '
+            'bundles and stylesheet, failing if any is over budget')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--budget', type=int, default=settings.STATIC_SIZE_BUDGET,
+            help='Largest allowed gzipped size in bytes (default: '
+                 'STATIC_SIZE_BUDGET)')
+
+    def handle(self, *args, **options):
+        budget = options['budget']
+        paths = [bundle_path(name) for name in settings.STATIC_BUNDLES]
+        paths.append('css/style.css')
+
+        over = []
+        self.stdout.write(
+            f'{"file":<36} {"raw":>8} {"gzip":>8} {"brotli":>8}')
+        for path in paths:
+            try:
+                name = staticfiles_storage.stored_name(path)
+            except ValueError:
+                raise CommandError(
+                    f'{path} is not in the manifest; run collectstatic')
+            with staticfiles_storage.open(name) as f:
+                content = f.read()
+            gzipped = len(gzip.compress(content, 9))
+            brotli = '-'
+            if staticfiles_storage.exists(f'{name}.br'):
+                brotli = staticfiles_storage.size(f'{name}.br')
+            self.stdout.write(
+                f'{path:<36} {len(content):>8} {gzipped:>8} {brotli:>8}')
+            if gzipped > budget:
+                over.append(f'{path} ({gzipped} bytes)')
+
+        if over:
+            raise CommandError(
+                f'Over the {budget} byte gzip budget: {", ".join(over)}')
+        self.stdout.write(self.style.SUCCESS(
+            f'All files within the {budget} byte gzip budget'))
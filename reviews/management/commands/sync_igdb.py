@@ -0,0 +1,48 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from reviews.igdb_service import QUERY_LIMIT, IGDBService
+from reviews.ingest.sync import SOURCES, CatalogSync
+
+
+class Command(BaseCommand):
+    help = ('Refresh genres, companies and reviews from IGDB, fetching '
+            'only what changed there since the last sync')
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--endpoint', action='append', choices=list(SOURCES),
+            help='Only sync this IGDB endpoint (repeatable; default: all)')
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Ignore the stored watermarks and compare every row')
+        parser.add_argument(
+            '--link', action='store_true',
+            help='First store IGDB ids on rows that have none, matching '
+                 'them by exact name')
+        parser.add_argument(
+            '--batch-size', type=int, default=QUERY_LIMIT,
+            help=f'IGDB ids per request (default: {QUERY_LIMIT})')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Report what would change without writing anything')
+
+    def handle(self, *args, **options):
+        sync = CatalogSync(
+            IGDBService(),
+            full=options['full'],
+            dry_run=options['dry_run'],
+            batch_size=options['batch_size'],
+            log=self.stdout.write,
+        )
+        with transaction.atomic():
+            if options['link']:
+                sync.link()
+            changed = sync.run(options['endpoint'] or SOURCES)
+
+        summary = ', '.join(
+            f'{count} {endpoint}' for endpoint, count in changed.items())
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING(
+                f'Dry run, nothing saved. Would change: {summary}'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Changed: {summary}'))
@@ -0,0 +1,42 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:14
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0003_genre_review_genres'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='FranchiseCursor',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('search_term', models.CharField(max_length=200, unique=True)),
+                ('offset', models.PositiveIntegerField(default=0)),
+                ('exhausted', models.BooleanField(default=False)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Franchise Cursor',
+                'verbose_name_plural': 'Franchise Cursors',
+                'ordering': ['search_term'],
+            },
+        ),
+        migrations.CreateModel(
+            name='SeenIGDBGame',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('igdb_id', models.PositiveIntegerField(unique=True)),
+                ('title', models.CharField(blank=True, max_length=200)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+            ],
+            options={
+                'verbose_name': 'Seen IGDB Game',
+                'verbose_name_plural': 'Seen IGDB Games',
+                'ordering': ['-created_on'],
+            },
+        ),
+    ]
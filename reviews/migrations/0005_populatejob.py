@@ -0,0 +1,60 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:16
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0004_franchisecursor_seenigdbgame'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PopulateJob',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('running', 'Running'), ('done', 'Done'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('items', models.JSONField(default=list)),
+                ('total', models.PositiveIntegerField(default=0)),
+                ('created_count', models.PositiveIntegerField(default=0)),
+                ('skipped_count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0)),
+                ('error_message', models.TextField(blank=True)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('started_on', models.DateTimeField(blank=True, null=True)),
+                ('finished_on', models.DateTimeField(blank=True, null=True)),
+                ('created_by', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='populate_jobs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Populate Job',
+                'verbose_name_plural': 'Populate Jobs',
+                'ordering': ['-created_on'],
+            },
+        ),
+        migrations.CreateModel(
+            name='PopulateJobResult',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('position', models.PositiveIntegerField()),
+                ('title', models.CharField(max_length=200)),
+                ('outcome', models.CharField(choices=[('created', 'Created'), ('skipped', 'Skipped'), ('error', 'Error')], max_length=10)),
+                ('message', models.TextField(blank=True)),
+                ('created_on', models.DateTimeField(auto_now_add=True)),
+                ('job', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='results', to='reviews.populatejob')),
+                ('review', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='+', to='reviews.review')),
+            ],
+            options={
+                'verbose_name': 'Populate Job Result',
+                'verbose_name_plural': 'Populate Job Results',
+                'ordering': ['job', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='populatejob',
+            index=models.Index(fields=['status', 'created_on'], name='reviews_pop_status_09ff21_idx'),
+        ),
+    ]
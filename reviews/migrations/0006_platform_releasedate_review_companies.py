@@ -0,0 +1,61 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:17
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('developer', '0003_developer_slug'),
+        ('publisher', '0003_publisher_slug'),
+        ('reviews', '0005_populatejob'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Platform',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('slug', models.SlugField(blank=True, max_length=100, unique=True)),
+                ('abbreviation', models.CharField(blank=True, max_length=50)),
+                ('igdb_id', models.PositiveIntegerField(blank=True, null=True, unique=True)),
+            ],
+            options={
+                'verbose_name': 'Platform',
+                'verbose_name_plural': 'Platforms',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='developers',
+            field=models.ManyToManyField(blank=True, related_name='credited_reviews', to='developer.developer'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='publishers',
+            field=models.ManyToManyField(blank=True, related_name='credited_reviews', to='publisher.publisher'),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='platforms',
+            field=models.ManyToManyField(blank=True, related_name='reviews', to='reviews.platform'),
+        ),
+        migrations.CreateModel(
+            name='ReleaseDate',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField()),
+                ('platform', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='release_dates', to='reviews.platform')),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='release_dates', to='reviews.review')),
+            ],
+            options={
+                'verbose_name': 'Release Date',
+                'verbose_name_plural': 'Release Dates',
+                'ordering': ['date'],
+                'constraints': [models.UniqueConstraint(fields=('review', 'platform', 'date'), name='unique_release_per_platform_date')],
+            },
+        ),
+    ]
@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:20
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0006_platform_releasedate_review_companies'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='usercomment',
+            index=models.Index(fields=['approved', 'created_on'], name='reviews_use_approve_4f64fd_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='userreview',
+            index=models.Index(fields=['approved', 'created_on'], name='reviews_use_approve_f518d5_idx'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0007_usercomment_reviews_use_approve_4f64fd_idx_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='image_lqip',
+            field=models.TextField(blank=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:38
+
+from django.db import migrations, models
+from reviews.html import plain_excerpt, sanitize_html
+
+FIELDS = {
+    'description': 'description_html',
+    'review_text': 'review_html',
+}
+
+
+def render_stored_html(apps, schema_editor):
+    """Fill the new fields for existing rows"""
+    model = apps.get_model('reviews', 'Review')
+    batch = []
+    for row in model.objects.only('id', *FIELDS).iterator(chunk_size=500):
+        for source, target in FIELDS.items():
+            setattr(row, target, sanitize_html(getattr(row, source)))
+        row.excerpt = plain_excerpt(row.description)
+        batch.append(row)
+        if len(batch) == 500:
+            model.objects.bulk_update(batch, [*FIELDS.values(), 'excerpt'])
+            batch = []
+    model.objects.bulk_update(batch, [*FIELDS.values(), 'excerpt'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0008_review_image_lqip'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='review',
+            name='description_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='excerpt',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='review_html',
+            field=models.TextField(blank=True, editable=False),
+        ),
+        migrations.RunPython(
+            render_stored_html, migrations.RunPython.noop),
+    ]
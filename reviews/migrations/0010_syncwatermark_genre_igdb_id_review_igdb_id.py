@@ -0,0 +1,37 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0009_review_description_html_review_html_excerpt'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SyncWatermark',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('endpoint', models.CharField(max_length=50, unique=True)),
+                ('synced_until', models.DateTimeField(blank=True, null=True)),
+                ('updated_on', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Sync Watermark',
+                'verbose_name_plural': 'Sync Watermarks',
+                'ordering': ['endpoint'],
+            },
+        ),
+        migrations.AddField(
+            model_name='genre',
+            name='igdb_id',
+            field=models.PositiveIntegerField(blank=True, null=True, unique=True),
+        ),
+        migrations.AddField(
+            model_name='review',
+            name='igdb_id',
+            field=models.PositiveIntegerField(blank=True, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 5.2.4 on 2026-10-19 16:51
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def mark_first_releases(apps, schema_editor):
+    """Flag the earliest release per game and platform, and move each
+    game's release date to its earliest release"""
+    ReleaseDate = apps.get_model('reviews', 'ReleaseDate')
+    Review = apps.get_model('reviews', 'Review')
+    earliest = ReleaseDate.objects.filter(
+        review_id=OuterRef('review_id'), platform_id=OuterRef('platform_id')
+    ).order_by('date', 'id').values('id')[:1]
+    ReleaseDate.objects.filter(id=Subquery(earliest)).update(is_first=True)
+
+    dates = ReleaseDate.objects.filter(
+        review_id=OuterRef('pk')
+    ).order_by('date').values('date')[:1]
+    Review.objects.filter(
+        pk__in=ReleaseDate.objects.values('review_id')
+    ).update(release_date=Subquery(dates))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('developer', '0005_developer_igdb_id'),
+        ('publisher', '0005_publisher_igdb_id'),
+        ('reviews', '0010_syncwatermark_genre_igdb_id_review_igdb_id'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='releasedate',
+            name='is_first',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddIndex(
+            model_name='releasedate',
+            index=models.Index(fields=['platform', 'is_first', 'date'], name='reviews_rel_platfor_76653e_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='review',
+            index=models.Index(fields=['is_published', 'release_date'], name='reviews_rev_is_publ_02e784_idx'),
+        ),
+        migrations.RunPython(
+            mark_first_releases, migrations.RunPython.noop),
+    ]
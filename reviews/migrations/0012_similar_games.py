@@ -0,0 +1,31 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:01
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0011_release_browse'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SimilarGame',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('score', models.FloatField()),
+                ('rank', models.PositiveSmallIntegerField()),
+                ('review', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='similar_games', to='reviews.review')),
+                ('similar', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='reviews.review')),
+            ],
+            options={
+                'verbose_name': 'Similar Game',
+                'verbose_name_plural': 'Similar Games',
+                'ordering': ['review', 'rank'],
+                'indexes': [models.Index(fields=['review', 'rank'], name='reviews_sim_review__70cf11_idx')],
+                'constraints': [models.UniqueConstraint(fields=('review', 'similar'), name='unique_similar_game')],
+            },
+        ),
+    ]
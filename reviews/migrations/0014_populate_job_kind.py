@@ -0,0 +1,23 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:21
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0013_user_feed'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='populatejob',
+            name='kind',
+            field=models.CharField(choices=[('selection', 'Selected games'), ('auto', 'Auto-generate')], default='selection', max_length=10),
+        ),
+        migrations.AddField(
+            model_name='populatejob',
+            name='options',
+            field=models.JSONField(blank=True, default=dict),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-19 17:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reviews', '0014_populate_job_kind'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='populatejob',
+            name='heartbeat_on',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+    ]
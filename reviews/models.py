@@ -1,15 +1,19 @@
 
 from django.db import models
 from django.contrib.auth.models import User
+from django.utils.functional import cached_property
 from cloudinary.models import CloudinaryField
 from developer.models import Developer
 from publisher.models import Publisher
+from .html import store_rendered_html
+from .images import responsive_image
 # Create your models here.
 
 
 class Review(models.Model):
     title = models.CharField(max_length=200, unique=True)
     slug = models.SlugField(max_length=200, unique=True)
+    igdb_id = models.PositiveIntegerField(unique=True, blank=True, null=True)
     publisher = models.ForeignKey(
         Publisher, on_delete=models.CASCADE, related_name='reviews')
     developer = models.ForeignKey(
@@ -18,18 +22,40 @@ class Review(models.Model):
     genres = models.ManyToManyField(
         'Genre', related_name='reviews', blank=True
     )
+    # Earliest release on any platform once release dates are stored
     release_date = models.DateField()
 
+    # IGDB details stored at ingest so the detail page needs no API calls.
+    # ``developer``/``publisher`` above stay the primary credit; these hold
+    # every company IGDB lists for the game.
+    platforms = models.ManyToManyField(
+        'Platform', related_name='reviews', blank=True
+    )
+    developers = models.ManyToManyField(
+        Developer, related_name='credited_reviews', blank=True
+    )
+    publishers = models.ManyToManyField(
+        Publisher, related_name='credited_reviews', blank=True
+    )
+
     # Review fields
     review_score = models.DecimalField(
         max_digits=3, decimal_places=1, blank=True, null=True)  # 0.0 to 10.0
     review_text = models.TextField(blank=True)
+    # Sanitized copies of description/review_text and the plain-text
+    # start of the description for cards, filled in by save()
+    description_html = models.TextField(blank=True, editable=False)
+    review_html = models.TextField(blank=True, editable=False)
+    excerpt = models.TextField(blank=True, editable=False)
     reviewed_by = models.ForeignKey(
         User, on_delete=models.SET_NULL, null=True, blank=True)
     review_date = models.DateTimeField(blank=True, null=True)
 
     # Media
     featured_image = CloudinaryField('image', default='placeholder')
+    # Blurred low-quality preview of featured_image as a data URI, shown
+    # while the real image loads. Filled in at ingest by store_lqip().
+    image_lqip = models.TextField(blank=True)
 
     # Metadata
     is_featured = models.BooleanField(default=False)
@@ -45,6 +71,10 @@ class Review(models.Model):
         ordering = ['-created_on']
         verbose_name = 'Game'
         verbose_name_plural = 'Games'
+        indexes = [
+            # Browse by release year
+            models.Index(fields=['is_published', 'release_date']),
+        ]
 
     def __str__(self):
         if self.review_score is not None:
@@ -53,12 +83,43 @@ class Review(models.Model):
             score_display = "No Score"
         return f"{self.title} | Score: {score_display}"
 
+    def save(self, *args, **kwargs):
+        kwargs['update_fields'] = store_rendered_html(
+            self,
+            {'description': 'description_html', 'review_text': 'review_html'},
+            kwargs.get('update_fields'))
+        super().save(*args, **kwargs)
+
+    # Stored values the save signals compare with, to tell which listings,
+    # detail pages and similar games a save moves the review out of
+    TRACKED_FIELDS = ('developer_id', 'publisher_id', 'release_date', 'slug',
+                      'is_published', 'review_score')
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        review = super().from_db(db, field_names, values)
+        review._saved_state = review.tracked_state()
+        return review
+
+    def tracked_state(self):
+        """The ``TRACKED_FIELDS`` values held now, or None when some were
+        deferred"""
+        if any(name not in self.__dict__ for name in self.TRACKED_FIELDS):
+            return None
+        return tuple(self.__dict__[name] for name in self.TRACKED_FIELDS)
+
     def number_of_likes(self):
         return self.likes.count()
 
+    @cached_property
+    def card_image(self):
+        """Cover image delivery URLs, built once per instance"""
+        return responsive_image(self.featured_image)
+
 
 class Genre(models.Model):
     name = models.CharField(max_length=100, unique=True)
+    igdb_id = models.PositiveIntegerField(unique=True, blank=True, null=True)
 
     class Meta:
         verbose_name = 'Genre'
@@ -74,6 +135,56 @@ class Genre(models.Model):
         return self.reviews.count()
 
 
+class Platform(models.Model):
+    name = models.CharField(max_length=100, unique=True)
+    slug = models.SlugField(max_length=100, unique=True, blank=True)
+    abbreviation = models.CharField(max_length=50, blank=True)
+    igdb_id = models.PositiveIntegerField(unique=True, blank=True, null=True)
+
+    class Meta:
+        verbose_name = 'Platform'
+        verbose_name_plural = 'Platforms'
+        ordering = ['name']
+
+    def __str__(self):
+        return self.name
+
+    def save(self, *args, **kwargs):
+        from django.utils.text import slugify
+        if not self.slug:
+            self.slug = slugify(self.name)
+        super().save(*args, **kwargs)
+
+
+class ReleaseDate(models.Model):
+    """One IGDB release of a game on a platform"""
+    review = models.ForeignKey(
+        Review, on_delete=models.CASCADE, related_name='release_dates')
+    platform = models.ForeignKey(
+        Platform, on_delete=models.CASCADE, related_name='release_dates')
+    date = models.DateField()
+    # Whether this is the game's earliest release on the platform, worked
+    # out at ingest so pages don't have to
+    is_first = models.BooleanField(default=False)
+
+    class Meta:
+        verbose_name = 'Release Date'
+        verbose_name_plural = 'Release Dates'
+        ordering = ['date']
+        indexes = [
+            # Browse a platform by release date
+            models.Index(fields=['platform', 'is_first', 'date']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['review', 'platform', 'date'],
+                name='unique_release_per_platform_date'),
+        ]
+
+    def __str__(self):
+        return f"{self.review.title} on {self.platform.name}: {self.date}"
+
+
 class UserComment(models.Model):
     review = models.ForeignKey(
         Review, on_delete=models.CASCADE, related_name="user_comments")
@@ -85,6 +196,7 @@ class UserComment(models.Model):
 
     class Meta:
         ordering = ["created_on"]
+        indexes = [models.Index(fields=['approved', 'created_on'])]
         verbose_name = 'User Comment'
         verbose_name_plural = 'User Comments'
 
@@ -106,8 +218,210 @@ class UserReview(models.Model):
 
     class Meta:
         unique_together = ('game', 'user')  # One review per user per game
+        indexes = [models.Index(fields=['approved', 'created_on'])]
         verbose_name = 'User Review'
         verbose_name_plural = 'User Reviews'
 
     def __str__(self):
         return f"{self.user.username}'s review of {self.game.title}"
+
+
+class SimilarGame(models.Model):
+    """One of a review's nearest neighbours by genres, companies and
+    scores, stored by ``build_similarity_index``"""
+    review = models.ForeignKey(
+        Review, on_delete=models.CASCADE, related_name='similar_games')
+    similar = models.ForeignKey(
+        Review, on_delete=models.CASCADE, related_name='+')
+    # Cosine similarity of the two games' feature vectors
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['review', 'rank']
+        indexes = [
+            # "You might also like" on the detail page
+            models.Index(fields=['review', 'rank']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['review', 'similar'], name='unique_similar_game'),
+        ]
+        verbose_name = 'Similar Game'
+        verbose_name_plural = 'Similar Games'
+
+    def __str__(self):
+        return f"{self.review.title}: #{self.rank} {self.similar.title}"
+
+
+class UserFeedEntry(models.Model):
+    """One game in a user's "For You" feed, ranked by how well it matches
+    the games they liked and rated highly. Stored by
+    ``build_user_feeds``."""
+    user = models.ForeignKey(
+        User, on_delete=models.CASCADE, related_name='feed_entries')
+    review = models.ForeignKey(
+        Review, on_delete=models.CASCADE, related_name='+')
+    score = models.FloatField()
+    rank = models.PositiveSmallIntegerField()
+
+    class Meta:
+        ordering = ['user', 'rank']
+        indexes = [
+            # The feed page
+            models.Index(fields=['user', 'rank']),
+        ]
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'review'], name='unique_user_feed_entry'),
+        ]
+        verbose_name = 'User Feed Entry'
+        verbose_name_plural = 'User Feed Entries'
+
+    def __str__(self):
+        return f"{self.user.username}: #{self.rank} {self.review.title}"
+
+
+class FranchiseCursor(models.Model):
+    """Paging position through the IGDB search results for one franchise
+    used by auto_generate_reviews"""
+    search_term = models.CharField(max_length=200, unique=True)
+    offset = models.PositiveIntegerField(default=0)
+    exhausted = models.BooleanField(default=False)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['search_term']
+        verbose_name = 'Franchise Cursor'
+        verbose_name_plural = 'Franchise Cursors'
+
+    def __str__(self):
+        state = "exhausted" if self.exhausted else f"offset {self.offset}"
+        return f"{self.search_term} ({state})"
+
+
+class SeenIGDBGame(models.Model):
+    """IGDB game already offered as a candidate, so it is never fetched
+    and checked against the catalog twice"""
+    igdb_id = models.PositiveIntegerField(unique=True)
+    title = models.CharField(max_length=200, blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['-created_on']
+        verbose_name = 'Seen IGDB Game'
+        verbose_name_plural = 'Seen IGDB Games'
+
+    def __str__(self):
+        return f"{self.title} ({self.igdb_id})"
+
+
+class SyncWatermark(models.Model):
+    """How far sync_igdb has refreshed one IGDB endpoint: rows updated on
+    IGDB after ``synced_until`` are fetched on the next run"""
+    endpoint = models.CharField(max_length=50, unique=True)
+    synced_until = models.DateTimeField(blank=True, null=True)
+    updated_on = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['endpoint']
+        verbose_name = 'Sync Watermark'
+        verbose_name_plural = 'Sync Watermarks'
+
+    def __str__(self):
+        return f"{self.endpoint} (synced until {self.synced_until or 'never'})"
+
+
+class PopulateJob(models.Model):
+    """A batch of IGDB games submitted from the populate interface, or a
+    request to auto-generate reviews, processed outside the request cycle
+    by ``process_populate_jobs``"""
+    KIND_SELECTION = 'selection'
+    KIND_AUTO = 'auto'
+    KIND_CHOICES = [
+        (KIND_SELECTION, 'Selected games'),
+        (KIND_AUTO, 'Auto-generate'),
+    ]
+
+    STATUS_PENDING = 'pending'
+    STATUS_RUNNING = 'running'
+    STATUS_DONE = 'done'
+    STATUS_FAILED = 'failed'
+    STATUS_CHOICES = [
+        (STATUS_PENDING, 'Pending'),
+        (STATUS_RUNNING, 'Running'),
+        (STATUS_DONE, 'Done'),
+        (STATUS_FAILED, 'Failed'),
+    ]
+
+    created_by = models.ForeignKey(
+        User, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='populate_jobs')
+    status = models.CharField(
+        max_length=10, choices=STATUS_CHOICES, default=STATUS_PENDING)
+    kind = models.CharField(
+        max_length=10, choices=KIND_CHOICES, default=KIND_SELECTION)
+    # List of {"game": <IGDB game dict>, "review_score": float,
+    # "is_published": bool, "is_featured": bool}
+    items = models.JSONField(default=list)
+    # Auto-generate jobs: {"count": int, "min_score": float,
+    # "max_score": float}
+    options = models.JSONField(default=dict, blank=True)
+    total = models.PositiveIntegerField(default=0)
+    created_count = models.PositiveIntegerField(default=0)
+    skipped_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(default=0)
+    error_message = models.TextField(blank=True)
+    created_on = models.DateTimeField(auto_now_add=True)
+    started_on = models.DateTimeField(blank=True, null=True)
+    # Last sign of life from the worker running the job
+    heartbeat_on = models.DateTimeField(blank=True, null=True)
+    finished_on = models.DateTimeField(blank=True, null=True)
+
+    class Meta:
+        ordering = ['-created_on']
+        indexes = [models.Index(fields=['status', 'created_on'])]
+        verbose_name = 'Populate Job'
+        verbose_name_plural = 'Populate Jobs'
+
+    def __str__(self):
+        return f"Populate job #{self.pk} ({self.status})"
+
+    @property
+    def is_finished(self):
+        return self.status in (self.STATUS_DONE, self.STATUS_FAILED)
+
+    @property
+    def processed_count(self):
+        return self.created_count + self.skipped_count + self.error_count
+
+
+class PopulateJobResult(models.Model):
+    """Outcome of one game within a :model:`reviews.PopulateJob`"""
+    OUTCOME_CREATED = 'created'
+    OUTCOME_SKIPPED = 'skipped'
+    OUTCOME_ERROR = 'error'
+    OUTCOME_CHOICES = [
+        (OUTCOME_CREATED, 'Created'),
+        (OUTCOME_SKIPPED, 'Skipped'),
+        (OUTCOME_ERROR, 'Error'),
+    ]
+
+    job = models.ForeignKey(
+        PopulateJob, on_delete=models.CASCADE, related_name='results')
+    position = models.PositiveIntegerField()
+    title = models.CharField(max_length=200)
+    outcome = models.CharField(max_length=10, choices=OUTCOME_CHOICES)
+    message = models.TextField(blank=True)
+    review = models.ForeignKey(
+        Review, on_delete=models.SET_NULL, null=True, blank=True,
+        related_name='+')
+    created_on = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        ordering = ['job', 'id']
+        verbose_name = 'Populate Job Result'
+        verbose_name_plural = 'Populate Job Results'
+
+    def __str__(self):
+        return f"{self.title}: {self.outcome}"
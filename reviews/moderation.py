@@ -0,0 +1,122 @@
+from datetime import datetime
+from django.db.models import Count, Q
+from .models import UserComment, UserReview
+
+
+class ModerationQueue:
+    """Filtered, keyset-paginated view over comments or user reviews.
+
+    Pages are ordered newest first on ``(created_on, id)`` and addressed by
+    a cursor of the last row shown, so deep pages cost the same as the
+    first one. Bulk actions run as one UPDATE or DELETE over whatever the
+    current filter matches.
+    """
+
+    page_size = 25
+
+    def __init__(self, model, author_field, game_field, text_field,
+                 extra_fields=()):
+        self.model = model
+        self.author_field = author_field
+        self.game_field = game_field
+        self.text_field = text_field
+        self.extra_fields = extra_fields
+
+    def base_queryset(self):
+        return self.model.objects.select_related(
+            self.author_field, self.game_field
+        ).only(
+            'id', 'approved', 'created_on', self.text_field,
+            f'{self.author_field}__username', f'{self.author_field}__email',
+            f'{self.game_field}__title', f'{self.game_field}__slug',
+            *self.extra_fields,
+        )
+
+    def filter_queryset(self, queryset, filters):
+        """Apply the ``q``, ``author`` and ``game`` filters"""
+        if filters.get('q'):
+            queryset = queryset.filter(
+                **{f'{self.text_field}__icontains': filters['q']})
+        if filters.get('author'):
+            queryset = queryset.filter(
+                **{f'{self.author_field}__username__iexact':
+                   filters['author']})
+        if filters.get('game'):
+            queryset = queryset.filter(
+                Q(**{f'{self.game_field}__slug': filters['game']}) |
+                Q(**{f'{self.game_field}__title__icontains':
+                     filters['game']}))
+        return queryset
+
+    def matching(self, filters, approved=False):
+        """Unordered queryset of rows matching the filter, for bulk
+        actions"""
+        return self.filter_queryset(
+            self.model.objects.filter(approved=approved), filters)
+
+    def page(self, filters, approved=False, cursor=None):
+        """Return ``(rows, next_cursor)`` for one page of the queue"""
+        queryset = self.filter_queryset(
+            self.base_queryset().filter(approved=approved), filters
+        ).order_by('-created_on', '-id')
+
+        position = decode_cursor(cursor)
+        if position is not None:
+            created_on, pk = position
+            queryset = queryset.filter(
+                Q(created_on__lt=created_on) |
+                Q(created_on=created_on, id__lt=pk))
+
+        rows = list(queryset[:self.page_size + 1])
+        next_cursor = None
+        if len(rows) > self.page_size:
+            rows = rows[:self.page_size]
+            next_cursor = encode_cursor(rows[-1])
+        return rows, next_cursor
+
+    def counts(self):
+        """Pending and approved totals from one grouped query"""
+        totals = {True: 0, False: 0}
+        for row in self.model.objects.values('approved').annotate(
+                total=Count('id')).order_by():
+            totals[row['approved']] = row['total']
+        return {'pending': totals[False], 'approved': totals[True]}
+
+    def approve_matching(self, filters):
+        return self.matching(filters).update(approved=True)
+
+    def delete_matching(self, filters, approved=False):
+        deleted, _ = self.matching(filters, approved=approved).delete()
+        return deleted
+
+
+def encode_cursor(row):
+    return f'{row.created_on.isoformat()}_{row.pk}'
+
+
+def decode_cursor(cursor):
+    """Parse a cursor back into ``(created_on, id)``, or None if invalid"""
+    if not cursor:
+        return None
+    created_on, _, pk = cursor.rpartition('_')
+    try:
+        return datetime.fromisoformat(created_on), int(pk)
+    except ValueError:
+        return None
+
+
+def moderation_filters(params):
+    """Pull the supported filter values out of GET/POST data"""
+    return {
+        key: params.get(key, '').strip()
+        for key in ('q', 'author', 'game')
+        if params.get(key, '').strip()
+    }
+
+
+comment_queue = ModerationQueue(
+    UserComment, author_field='author', game_field='review',
+    text_field='body')
+review_queue = ModerationQueue(
+    UserReview, author_field='user', game_field='game',
+    text_field='review_text', extra_fields=('rating',))
@@ -0,0 +1,165 @@
+import itertools
+from datetime import timedelta
+from django.db import transaction
+from django.db.models import F, Q
+from django.utils import timezone
+from .auto_generate import ReviewGenerator
+from .igdb_service import IGDBService
+from .ingest import GameIngestor, SkipGame
+from .models import PopulateJob, PopulateJobResult
+
+# A running job whose worker hasn't reported for this long is taken to
+# have died with it
+JOB_STALE_AFTER = timedelta(minutes=10)
+
+
+def queue_auto_generate(user, count, min_score=5.0, max_score=10.0):
+    """Queue an auto-generate job for ``count`` reviews"""
+    return PopulateJob.objects.create(
+        created_by=user,
+        kind=PopulateJob.KIND_AUTO,
+        options={'count': count, 'min_score': min_score,
+                 'max_score': max_score},
+        total=count,
+    )
+
+
+def claim_next_job():
+    """Mark the oldest pending job as running and return it, or None.
+
+    ``skip_locked`` lets several workers poll the same table without
+    picking up the same job. Jobs left running by a dead worker are
+    failed first.
+    """
+    fail_stale_jobs()
+    with transaction.atomic():
+        job = (PopulateJob.objects
+               .select_for_update(skip_locked=True)
+               .filter(status=PopulateJob.STATUS_PENDING)
+               .order_by('created_on')
+               .first())
+        if job is None:
+            return None
+        job.status = PopulateJob.STATUS_RUNNING
+        job.started_on = job.heartbeat_on = timezone.now()
+        job.save(update_fields=['status', 'started_on', 'heartbeat_on'])
+    return job
+
+
+def fail_stale_jobs():
+    """Fail running jobs whose worker stopped reporting, returning how
+    many. Results stored before it stopped are kept."""
+    now = timezone.now()
+    cutoff = now - JOB_STALE_AFTER
+    return PopulateJob.objects.filter(
+        Q(heartbeat_on__lt=cutoff)
+        | Q(heartbeat_on__isnull=True, started_on__lt=cutoff),
+        status=PopulateJob.STATUS_RUNNING,
+    ).update(
+        status=PopulateJob.STATUS_FAILED,
+        error_message='The worker stopped before finishing the job',
+        finished_on=now,
+    )
+
+
+def run_job(job, ingestor=None):
+    """Process every item of a job, or generate its reviews, storing one
+    result row per game.
+
+    Each game is committed on its own so progress is visible to the
+    event stream while the batch is still running. A job failed as stale
+    in the meantime keeps that status.
+    """
+    if ingestor is None:
+        ingestor = GameIngestor()
+    ingestor.reset()
+
+    try:
+        if job.kind == PopulateJob.KIND_AUTO:
+            generate_reviews(job, ingestor)
+        else:
+            create_reviews(job, ingestor)
+    except Exception as e:
+        status, error_message = PopulateJob.STATUS_FAILED, str(e)
+    else:
+        status, error_message = PopulateJob.STATUS_DONE, job.error_message
+    PopulateJob.objects.filter(
+        pk=job.pk, status=PopulateJob.STATUS_RUNNING
+    ).update(status=status, error_message=error_message,
+             finished_on=timezone.now())
+    job.refresh_from_db()
+    return job
+
+
+def create_reviews(job, ingestor):
+    for position, item in enumerate(job.items):
+        game = item.get('game', {})
+        title = game.get('name') or 'Unknown'
+        try:
+            with transaction.atomic():
+                outcome, review, message = create_review_from_item(
+                    item, ingestor
+                )
+        except Exception as e:
+            outcome = PopulateJobResult.OUTCOME_ERROR
+            review = None
+            message = str(e)
+        record_result(job, position, title, outcome, review, message)
+
+
+def generate_reviews(job, ingestor):
+    """Run an auto-generate job, with one result row per attempt"""
+    generator = ReviewGenerator(
+        IGDBService(), job.options['count'],
+        job.options.get('min_score', 5.0), job.options.get('max_score', 10.0),
+        ingestor=ingestor)
+    positions = itertools.count()
+
+    def report(title, outcome, review, message):
+        record_result(job, next(positions), title, outcome, review, message)
+    # Generated reviews get placeholders where IGDB has gaps, as with
+    # auto_generate_reviews; the worker's ingestor is strict otherwise
+    lenient, ingestor.lenient = ingestor.lenient, True
+    try:
+        generator.run(report)
+    finally:
+        ingestor.lenient = lenient
+    if generator.stop_reason:
+        job.error_message = generator.stop_reason
+
+
+def record_result(job, position, title, outcome, review, message=''):
+    """Store a per-game result, bump the matching job counter and the
+    job's heartbeat"""
+    PopulateJobResult.objects.create(
+        job=job,
+        position=position,
+        title=title[:200],
+        outcome=outcome,
+        review=review,
+        message=message,
+    )
+    counter = {
+        PopulateJobResult.OUTCOME_CREATED: 'created_count',
+        PopulateJobResult.OUTCOME_SKIPPED: 'skipped_count',
+        PopulateJobResult.OUTCOME_ERROR: 'error_count',
+    }[outcome]
+    PopulateJob.objects.filter(pk=job.pk).update(
+        heartbeat_on=timezone.now(), **{counter: F(counter) + 1})
+
+
+def create_review_from_item(item, ingestor):
+    """Create a review for one submitted game.
+
+    Returns ``(outcome, review, message)``.
+    """
+    try:
+        review = ingestor.create_review(
+            item['game'],
+            item['review_score'],
+            is_published=item.get('is_published', False),
+            is_featured=item.get('is_featured', False),
+        )
+    except SkipGame as skip:
+        return PopulateJobResult.OUTCOME_SKIPPED, skip.review, str(skip)
+    return PopulateJobResult.OUTCOME_CREATED, review, ''
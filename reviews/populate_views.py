@@ -1,21 +1,22 @@
-from django.shortcuts import render, redirect
+from django.shortcuts import render, redirect, get_object_or_404
+from django.http import HttpResponse, JsonResponse
 from django.contrib.auth.decorators import user_passes_test
 from django.contrib import messages
 from django.views.decorators.http import require_http_methods
-from django.db import transaction
 from django.db.models import Q
 from django.utils.text import slugify
-from django.contrib.auth.models import User
 from django.core.paginator import Paginator
 from django.urls import reverse
 from .igdb_service import IGDBService
-from .models import Review, Genre
-from developer.models import Developer
-from publisher.models import Publisher
-from .management.commands.populate_reviews import Command as PopulateCommand
+from .models import Review, PopulateJob, PopulateJobResult
+from .populate_jobs import queue_auto_generate
+from .signals import clear_review_caches, refresh_similar_games
 import json
 import datetime
 
+# How long the browser waits before asking for new job events again
+JOB_STREAM_RETRY_MS = 2000
+
 
 def is_superuser(user):
     return user.is_superuser
@@ -59,8 +60,12 @@ def populate_reviews_interface(request):
         elif action == 'publish_selected':
             if existing_review_ids:
                 try:
-                    count = Review.objects.filter(
-                        id__in=existing_review_ids).update(is_published=True)
+                    reviews = Review.objects.filter(
+                        id__in=existing_review_ids)
+                    review_ids = list(reviews.values_list('pk', flat=True))
+                    count = reviews.update(is_published=True)
+                    clear_review_caches()
+                    refresh_similar_games(*review_ids)
                     messages.success(
                         request, f'Successfully published {count} review(s)')
                 except Exception as e:
@@ -73,8 +78,12 @@ def populate_reviews_interface(request):
         elif action == 'unpublish_selected':
             if existing_review_ids:
                 try:
-                    count = Review.objects.filter(
-                        id__in=existing_review_ids).update(is_published=False)
+                    reviews = Review.objects.filter(
+                        id__in=existing_review_ids)
+                    review_ids = list(reviews.values_list('pk', flat=True))
+                    count = reviews.update(is_published=False)
+                    clear_review_caches()
+                    refresh_similar_games(*review_ids)
                     messages.success(
                         request, f'Successfully unpublished {count} review(s)')
                 except Exception as e:
@@ -89,6 +98,7 @@ def populate_reviews_interface(request):
                 try:
                     count = Review.objects.filter(
                         id__in=existing_review_ids).update(is_featured=True)
+                    clear_review_caches()
                     messages.success(
                         request, f'Successfully featured {count} review(s)')
                 except Exception as e:
@@ -103,6 +113,7 @@ def populate_reviews_interface(request):
                 try:
                     count = Review.objects.filter(
                         id__in=existing_review_ids).update(is_featured=False)
+                    clear_review_caches()
                     messages.success(
                         request, f'Successfully unfeatured {count} review(s)')
                 except Exception as e:
@@ -225,201 +236,163 @@ def populate_reviews_interface(request):
 @user_passes_test(is_superuser)
 @require_http_methods(["POST"])
 def create_reviews_from_selection(request):
-    """Create reviews from selected games"""
-    try:
-        selected_games_data = request.POST.getlist('selected_games')
-        review_scores = request.POST.getlist('review_scores')
+    """Queue the selected games as a populate job.
 
-        if not selected_games_data:
-            messages.error(request, 'No games selected')
-            return redirect('reviews:populate_interface')
+    The reviews are created by the ``process_populate_jobs`` worker; this
+    view only validates the selection and returns the job id.
+    """
+    selected_games_data = request.POST.getlist('selected_games')
+    review_scores = request.POST.getlist('review_scores')
 
-        created_reviews = 0
-        skipped_reviews = 0
-        populate_command = PopulateCommand()
+    if not selected_games_data:
+        messages.error(request, 'No games selected')
+        return redirect('reviews:populate_interface')
 
-        with transaction.atomic():
-            for i, game_json in enumerate(selected_games_data):
-                try:
-                    game = json.loads(game_json)
-                    if i < len(review_scores):
-                        score_str = review_scores[i]
-                        if not score_str.strip():
-                            # silently skip if no score entered
-                            continue
-                        try:
-                            review_score = float(score_str)
-                        except ValueError:
-                            # silently skip if invalid score
-                            continue
-                    else:
-                        review_score = 5.0
-
-                    # Get published and featured status for this game
-                    is_published_key = f'is_published_{i}'
-                    is_featured_key = f'is_featured_{i}'
-
-                    # HTML checkboxes only send data when checked
-                    is_published = is_published_key in request.POST
-                    is_featured = is_featured_key in request.POST
-
-                    title = game.get('name')
-                    slug = slugify(title)
-
-                    # Check if review already exists
-                    existing_review = Review.objects.filter(
-                        Q(title__iexact=title) | Q(slug=slug)
-                    ).first()
-
-                    if existing_review:
-                        skipped_reviews += 1
-                        continue
-
-                    description = game.get('summary', '')
-                    release_date = None
-                    if 'release_dates' in game and game['release_dates']:
-                        try:
-                            timestamp = game['release_dates'][0]['date']
-                            release_date = datetime.datetime.fromtimestamp(
-                                timestamp).date()
-                        except Exception:
-                            release_date = None
-
-                    # Handle developer
-                    developer_obj = None
-                    if game.get('developers'):
-                        dev_data = game['developers'][0]
-                        logo_url = dev_data.get('logo_url', '')
-                        if logo_url and logo_url.startswith('//'):
-                            logo_url = 'https:' + logo_url
-                        cloudinary_logo_id = (
-                            populate_command
-                            .upload_developer_logo_to_cloudinary(
-                                logo_url, dev_data['name']
-                            )
-                        )
-                        developer_obj, _ = Developer.objects.get_or_create(
-                            name=dev_data['name'],
-                            defaults={
-                                'description': dev_data.get('description', ''),
-                                'website': dev_data.get('website', ''),
-                                'founded_year': (
-                                    dev_data.get('founded_year') or None
-                                ),
-                                'logo': (
-                                    cloudinary_logo_id if cloudinary_logo_id
-                                    else logo_url
-                                )
-                            }
-                        )
-
-                    # Handle publisher
-                    publisher_obj = None
-                    if game.get('publishers'):
-                        pub_data = game['publishers'][0]
-                        logo_url = pub_data.get('logo_url', '')
-                        if logo_url and logo_url.startswith('//'):
-                            logo_url = 'https:' + logo_url
-                        cloudinary_logo_id = (
-                            populate_command
-                            .upload_publisher_logo_to_cloudinary(
-                                logo_url, pub_data['name']
-                            )
-                        )
-                        publisher_obj, _ = Publisher.objects.get_or_create(
-                            name=pub_data['name'],
-                            defaults={
-                                'description': pub_data.get('description', ''),
-                                'website': pub_data.get('website', ''),
-                                'founded_year': (
-                                    pub_data.get('founded_year') or None
-                                ),
-                                'logo': (
-                                    cloudinary_logo_id if cloudinary_logo_id
-                                    else logo_url
-                                )
-                            }
-                        )
-
-                    # Create review if both developer and publisher exist
-                    if developer_obj and publisher_obj:
-                        user = User.objects.order_by('?').first()
-
-                        # Generate AI review
-                        ai_review_text = populate_command.generate_ai_review(
-                            title)
-                        if ai_review_text:
-                            review_text = ai_review_text
-                        else:
-                            review_text = f"Auto-generated review for {title}."
-                        review_date = datetime.datetime.now()
-
-                        # Download and upload cover image
-                        cover_url = game.get('cover_url', '')
-                        if cover_url.startswith('//'):
-                            cover_url = 'https:' + cover_url
-                        cloudinary_id = (
-                            populate_command.upload_cover_to_cloudinary(
-                                cover_url, title
-                            )
-                        )
-                        featured_image = (
-                            cloudinary_id if cloudinary_id else 'placeholder'
-                        )
-
-                        review, created = Review.objects.get_or_create(
-                            title=title,
-                            slug=slug,
-                            defaults={
-                                'publisher': publisher_obj,
-                                'developer': developer_obj,
-                                'description': description,
-                                'release_date': (
-                                    release_date or datetime.date.today()
-                                ),
-                                'review_score': review_score,
-                                'review_text': review_text,
-                                'reviewed_by': user,
-                                'review_date': review_date,
-                                'featured_image': featured_image,
-                                'is_featured': is_featured,
-                                'is_published': is_published
-                            }
-                        )
-
-                        # Add genres to review
-                        genre_objs = []
-                        for genre in game.get('genres', []):
-                            genre_name = genre.get('name')
-                            if genre_name:
-                                genre_obj, _ = Genre.objects.get_or_create(
-                                    name=genre_name
-                                )
-                                genre_objs.append(genre_obj)
-                        if genre_objs:
-                            review.genres.set(genre_objs)
-
-                        if created:
-                            created_reviews += 1
+    items = []
+    for i, game_json in enumerate(selected_games_data):
+        try:
+            game = json.loads(game_json)
+        except ValueError:
+            messages.error(request, f'Invalid game data at position {i + 1}')
+            continue
+
+        if i < len(review_scores):
+            score_str = review_scores[i]
+            if not score_str.strip():
+                # silently skip if no score entered
+                continue
+            try:
+                review_score = float(score_str)
+            except ValueError:
+                # silently skip if invalid score
+                continue
+        else:
+            review_score = 5.0
+
+        # HTML checkboxes only send data when checked
+        items.append({
+            'game': game,
+            'review_score': review_score,
+            'is_published': f'is_published_{i}' in request.POST,
+            'is_featured': f'is_featured_{i}' in request.POST,
+        })
 
-                except Exception as e:
-                    # Only show error modal for actual errors, not skipped
-                    messages.error(
-                        request, f'Error processing {title}: {str(e)}')
-                    continue
+    if not items:
+        messages.error(request, 'No games with a valid score were selected')
+        return redirect('reviews:populate_interface')
 
-        # Build success message
-        success_message = f'Successfully created {created_reviews} review(s)'
-        if skipped_reviews > 0:
-            success_message += (f' (skipped {skipped_reviews} '
-                                f'existing review(s))')
+    job = PopulateJob.objects.create(
+        created_by=request.user,
+        items=items,
+        total=len(items),
+    )
 
-        messages.success(request, success_message)
-        return redirect('reviews:populate_interface')
+    if request.headers.get('Accept', '').startswith('application/json'):
+        return JsonResponse({
+            'job_id': job.pk,
+            'status_url': reverse('reviews:populate_job', args=[job.pk]),
+            'events_url': reverse(
+                'reviews:populate_job_events', args=[job.pk]),
+        }, status=202)
 
-    except Exception as e:
-        messages.error(request, f'Error creating reviews: {str(e)}')
-        return redirect('reviews:populate_interface')
+    messages.success(
+        request, f'Queued {len(items)} game(s) as populate job #{job.pk}')
+    return redirect('reviews:populate_job', job_id=job.pk)
+
+
+@user_passes_test(is_superuser)
+def populate_jobs(request):
+    """List recent populate jobs"""
+    paginator = Paginator(PopulateJob.objects.select_related('created_by'), 25)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    return render(request, 'reviews/populate_jobs.html', {
+        'jobs': page_obj,
+        'page_obj': page_obj,
+        'paginator': paginator,
+        'is_paginated': page_obj.has_other_pages(),
+    })
+
+
+@user_passes_test(is_superuser)
+def populate_job_detail(request, job_id):
+    """Show the stored per-game outcome table of a populate job"""
+    job = get_object_or_404(PopulateJob, pk=job_id)
+    results = job.results.select_related('review')
+    return render(request, 'reviews/populate_job.html', {
+        'job': job,
+        'results': results,
+        'last_result_id': results.last().pk if results else 0,
+    })
+
+
+def job_event(event, data, event_id=None):
+    """Format one Server-Sent Event"""
+    lines = []
+    if event_id is not None:
+        lines.append(f'id: {event_id}')
+    lines.append(f'event: {event}')
+    lines.append(f'data: {json.dumps(data)}')
+    return '\n'.join(lines) + '\n\n'
+
+
+def job_progress(job):
+    return {
+        'status': job.status,
+        'total': job.total,
+        'created': job.created_count,
+        'skipped': job.skipped_count,
+        'errors': job.error_count,
+    }
+
+
+def job_events(job_id, last_id):
+    """Yield the result rows newer than ``last_id`` and the job's progress.
+
+    Each request answers once and closes, so no worker waits on a running
+    job. EventSource reconnects after ``JOB_STREAM_RETRY_MS`` and resumes
+    from the Last-Event-ID header.
+    """
+    yield f'retry: {JOB_STREAM_RETRY_MS}\n\n'
+    results = PopulateJobResult.objects.filter(
+        job_id=job_id, pk__gt=last_id
+    ).select_related('review').order_by('pk')
+    for result in results:
+        yield job_event('result', {
+            'position': result.position,
+            'title': result.title,
+            'outcome': result.outcome,
+            'message': result.message,
+            'review_url': (
+                reverse('reviews:review_detail', args=[result.review.slug])
+                if result.review else None
+            ),
+        }, event_id=result.pk)
+
+    job = PopulateJob.objects.only(
+        'status', 'total', 'created_count', 'skipped_count', 'error_count'
+    ).get(pk=job_id)
+    yield job_event('progress', job_progress(job))
+    if job.is_finished:
+        yield job_event('done', job_progress(job))
+
+
+@user_passes_test(is_superuser)
+def populate_job_events(request, job_id):
+    """Populate job progress as Server-Sent Events, polled by the
+    browser"""
+    get_object_or_404(PopulateJob.objects.only('pk'), pk=job_id)
+    try:
+        last_id = int(request.headers.get(
+            'Last-Event-ID', request.GET.get('after', 0)))
+    except ValueError:
+        last_id = 0
+
+    response = HttpResponse(
+        ''.join(job_events(job_id, last_id)),
+        content_type='text/event-stream'
+    )
+    response['Cache-Control'] = 'no-cache'
+    return response
 
 
 @user_passes_test(is_superuser)
@@ -431,75 +404,27 @@ def auto_generate_interface(request):
 @user_passes_test(is_superuser)
 @require_http_methods(["POST"])
 def auto_generate_reviews_view(request):
-    """Auto-generate reviews using the management command"""
-    from django.core.management import call_command
-    from io import StringIO
-
+    """Queue an auto-generate job for the ``process_populate_jobs``
+    worker"""
     try:
         count = int(request.POST.get('count', 50))
         min_score = float(request.POST.get('min_score', 5.0))
         max_score = float(request.POST.get('max_score', 10.0))
-
-        # Validate input
-        if count <= 0 or count > 100:
-            messages.error(request, 'Count must be between 1 and 100')
-            return redirect('reviews:auto_generate')
-
-        if min_score < 1 or max_score > 10 or min_score >= max_score:
-            messages.error(request, 'Invalid score range (1-10, min < max)')
-            return redirect('reviews:auto_generate')
-
-        # Limit count for web interface to prevent timeouts
-        if count > 25:
-            messages.warning(
-                request,
-                'Limiting to 25 reviews to prevent timeout. Use Django '
-                'admin command for larger batches.'
-            )
-            count = 25
-
-        # Capture output
-        output = StringIO()
-
-        try:
-            # Run the management command with output capture
-            call_command('auto_generate_reviews',
-                         count=count,
-                         min_score=min_score,
-                         max_score=max_score,
-                         stdout=output)
-
-            output_text = output.getvalue()
-
-            # Parse success count from output
-            import re
-            success_match = re.search(r'Created (\d+) reviews', output_text)
-            if success_match:
-                created_count = success_match.group(1)
-                messages.success(
-                    request,
-                    f'Successfully generated {created_count} reviews! '
-                    f'(Requested: {count}, Scores: {min_score}-{max_score})'
-                )
-            else:
-                messages.success(
-                    request,
-                    'Auto-generation completed! Check the reviews list '
-                    'for new entries.'
-                )
-
-        except Exception as cmd_error:
-            messages.error(
-                request, f'Error during review generation: {str(cmd_error)}'
-            )
-            # Also show any captured output for debugging
-            output_text = output.getvalue()
-            if output_text:
-                messages.info(
-                    request, f'Command output: {output_text[:200]}...'
-                )
-
-    except Exception as e:
+    except ValueError as e:
         messages.error(request, f'Error with input validation: {str(e)}')
-
-    return redirect('reviews:auto_generate')
+        return redirect('reviews:auto_generate')
+
+    if count <= 0 or count > 100:
+        messages.error(request, 'Count must be between 1 and 100')
+        return redirect('reviews:auto_generate')
+
+    if min_score < 1 or max_score > 10 or min_score >= max_score:
+        messages.error(request, 'Invalid score range (1-10, min < max)')
+        return redirect('reviews:auto_generate')
+
+    job = queue_auto_generate(request.user, count, min_score, max_score)
+    messages.success(
+        request,
+        f'Queued auto-generation of {count} review(s) as populate job '
+        f'#{job.pk} (scores {min_score}-{max_score})')
+    return redirect('reviews:populate_job', job_id=job.pk)
@@ -0,0 +1,75 @@
+import time
+from datetime import timedelta
+from django.utils import timezone
+from config.cache import namespace
+from .models import Review
+
+# Day ranges offered by the home page filter; anything else falls back to
+# DEFAULT_RECENT_DAYS so arbitrary values can't force a full table scan
+RECENT_WINDOWS = (7, 30, 90, 365)
+DEFAULT_RECENT_DAYS = 7
+
+RECENT_CACHE_SECONDS = 60 * 60
+
+recent_cache = namespace('recent', RECENT_CACHE_SECONDS)
+
+
+def parse_recent_days(value):
+    """Validate a ``?days=`` value against RECENT_WINDOWS"""
+    try:
+        days = int(value)
+    except (TypeError, ValueError):
+        return DEFAULT_RECENT_DAYS
+    return days if days in RECENT_WINDOWS else DEFAULT_RECENT_DAYS
+
+
+def recent_review_ids(days):
+    """Ids of reviews published in the last ``days`` days, newest first.
+
+    Every window is a prefix of the largest one, so a single cached list
+    of ``(timestamp, id)`` pairs covering max(RECENT_WINDOWS) serves all
+    of them.
+    """
+    entries = recent_cache.get_or_compute(
+        'entries', compute=build_recent_entries)
+    cutoff = time.time() - days * 24 * 60 * 60
+    ids = []
+    for timestamp, pk in entries:
+        if timestamp < cutoff:
+            break
+        ids.append(pk)
+    return ids
+
+
+def build_recent_entries():
+    since = timezone.now() - timedelta(days=max(RECENT_WINDOWS))
+    rows = Review.objects.filter(
+        is_published=True, review_date__gte=since
+    ).order_by('-review_date', '-pk').values_list('review_date', 'pk')
+    return [(review_date.timestamp(), pk) for review_date, pk in rows]
+
+
+def update_recent_reviews(review_ids):
+    """Add, move or drop reviews in the cached list after they are saved
+    or deleted, from their committed rows.
+
+    Leaves the cache alone when it hasn't been built yet; the next read
+    builds it from the database.
+    """
+    if recent_cache.get('entries') is None:
+        return
+    rows = Review.objects.filter(
+        pk__in=review_ids, is_published=True, review_date__isnull=False
+    ).values_list('review_date', 'pk')
+
+    def change(entries):
+        entries = [entry for entry in entries if entry[1] not in review_ids]
+        entries.extend(
+            (review_date.timestamp(), pk) for review_date, pk in rows)
+        entries.sort(reverse=True)
+        return entries
+    recent_cache.update('entries', change=change)
+
+
+def clear_recent_reviews():
+    recent_cache.delete('entries')
@@ -0,0 +1,387 @@
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import partial
+from itertools import batched
+from weakref import WeakKeyDictionary
+from django.db.models.signals import (
+    m2m_changed, post_delete, post_save, pre_delete, pre_save
+)
+from django.db import transaction
+from django.dispatch import receiver
+from config.cache import namespace
+from developer.models import Developer
+from publisher.models import Publisher
+from .models import Genre, Review, SimilarGame, UserComment, UserReview
+from .api import clear_api_cache
+from .detail import clear_review_detail, clear_review_details
+from .featured import clear_featured_slots
+from .listings import (
+    clear_all_listings, clear_listing_keys, clear_listings, review_listing_keys
+)
+from .recent import clear_recent_reviews, update_recent_reviews
+from .similarity import (
+    recompute_around, recompute_similar_games, update_similar_games
+)
+from .sitemaps import clear_sitemaps
+
+
+def clear_review_caches():
+    """Drop cached review selections after a bulk ``update()``, which
+    sends no signals"""
+    after_commit(clear_featured_slots)
+    after_commit(clear_recent_reviews)
+    after_commit(clear_all_listings)
+    after_commit(clear_review_details)
+    after_commit(namespace('navigation').invalidate)
+    after_commit(clear_api_cache)
+    after_commit(clear_sitemaps)
+
+
+class CommitCall:
+    """``func(*args)``, run once the transaction commits"""
+
+    def __init__(self, func, args=()):
+        self.func = func
+        self.args = args
+
+    def __call__(self):
+        self.func(*self.args)
+
+
+class CommitBatch:
+    """``func(ids)`` for the ids collected during one transaction"""
+
+    def __init__(self, func):
+        self.func = func
+        self.ids = set()
+
+    def __call__(self):
+        self.func(self.ids)
+
+
+# Calls collected for each connection's open transaction, by key
+_pending = WeakKeyDictionary()
+
+
+def run_pending(connection, key):
+    call = _pending.get(connection, {}).pop(key, None)
+    if call is not None:
+        call()
+
+
+def pending_call(key, make):
+    """The call collected under ``key`` for this transaction, made with
+    ``make()`` on first use.
+
+    Every use registers its own commit callback, and the first one to run
+    makes the call, so a callback dropped with a rolled-back savepoint
+    can't lose calls collected after it. A call left over from a
+    rolled-back transaction runs at the next commit instead, re-reading
+    committed rows.
+    """
+    connection = transaction.get_connection()
+    calls = _pending.setdefault(connection, {})
+    if key not in calls:
+        calls[key] = make()
+    call = calls[key]
+    transaction.on_commit(partial(run_pending, connection, key))
+    return call
+
+
+def after_commit(func, *args):
+    """Call ``func(*args)`` once the transaction commits. Cached pages are
+    dropped then, not before, so a request reading the old rows in the
+    meantime can't cache them again. Identical calls made during one
+    transaction run once."""
+    # Lists of keys or ids are compared by their contents
+    key = tuple(
+        tuple(arg) if isinstance(arg, list)
+        else frozenset(arg) if isinstance(arg, set) else arg
+        for arg in args)
+    pending_call((func, key), lambda: CommitCall(func, args))
+
+
+def on_commit_batch(func, *ids):
+    """Call ``func`` once the transaction commits, with every id passed
+    for it during the transaction, or at once outside a transaction"""
+    if not transaction.get_connection().in_atomic_block:
+        func(set(ids))
+        return
+    batch = pending_call(('batch', func), lambda: CommitBatch(func))
+    batch.ids.update(ids)
+
+
+@receiver(pre_save, sender=Review)
+def remember_review_listings(sender, instance, **kwargs):
+    """Keep the developer/publisher and release date a review had before
+    this save so their listings can be cleared if it moves, and its slug
+    so the old detail page is dropped if it is renamed.
+
+    Those are the values it was loaded or last saved with; only a review
+    loaded with some of them deferred costs a query.
+    """
+    if instance.pk:
+        previous = getattr(instance, '_saved_state', None)
+        if previous is None:
+            previous = Review.objects.filter(
+                pk=instance.pk
+            ).values_list(*Review.TRACKED_FIELDS).first()
+        if previous:
+            instance._previous_listings = previous[:3]
+            instance._previous_slug = previous[3]
+            instance._previous_similarity = (
+                previous[4], previous[0], previous[1], previous[5])
+
+
+@receiver(post_save, sender=Review)
+def remember_saved_state(sender, instance, update_fields, **kwargs):
+    """The values just saved are what the next save compares with"""
+    state = instance.tracked_state()
+    previous = getattr(instance, '_saved_state', None)
+    if update_fields is not None and state is not None:
+        if previous is None:
+            state = None
+        else:
+            # Fields left out of the save still hold their old values
+            saved = {Review._meta.get_field(name).attname
+                     for name in update_fields}
+            state = tuple(
+                value if name in saved else old
+                for name, value, old in zip(
+                    Review.TRACKED_FIELDS, state, previous))
+    instance._saved_state = state
+
+
+@receiver(post_save, sender=Review)
+def review_saved(sender, instance, **kwargs):
+    """Rebuild the featured carousel, move the review within the cached
+    recent list and drop the listings it appears in"""
+    after_commit(clear_featured_slots)
+    # After commit, so a rollback can't leave the review in the list
+    on_commit_batch(update_recent_reviews, instance.pk)
+    after_commit(clear_listing_keys, review_listing_keys(
+        instance, getattr(instance, '_previous_listings', None)))
+    after_commit(clear_review_detail,
+                 instance.slug, getattr(instance, '_previous_slug', None))
+    after_commit(namespace('navigation').invalidate)
+
+
+@receiver(pre_delete, sender=Review)
+def review_deleting(sender, instance, **kwargs):
+    # Genres are still attached here, unlike in post_delete
+    after_commit(clear_listing_keys, review_listing_keys(instance))
+
+
+@receiver(post_delete, sender=Review)
+def review_deleted(sender, instance, **kwargs):
+    after_commit(clear_featured_slots)
+    on_commit_batch(update_recent_reviews, instance.pk)
+    after_commit(clear_review_detail, instance.slug)
+    after_commit(namespace('navigation').invalidate)
+
+
+@receiver(m2m_changed, sender=Review.genres.through)
+def review_genres_changed(sender, instance, action, reverse, pk_set,
+                          **kwargs):
+    if action in ('post_add', 'post_remove', 'post_clear'):
+        if reverse:
+            after_commit(clear_review_details)
+        else:
+            after_commit(clear_review_detail, instance.slug)
+    if action == 'pre_clear':
+        if reverse:
+            after_commit(clear_listings, 'genre', [instance.pk])
+        else:
+            after_commit(clear_listings, 'genre', list(
+                instance.genres.values_list('pk', flat=True)))
+    elif action in ('post_add', 'post_remove'):
+        after_commit(clear_listings, 'genre',
+                     [instance.pk] if reverse else set(pk_set))
+        after_commit(namespace('navigation').invalidate)
+
+
+@receiver(post_save, sender=Genre)
+@receiver(post_save, sender=Developer)
+@receiver(post_save, sender=Publisher)
+@receiver(post_delete, sender=Genre)
+@receiver(post_delete, sender=Developer)
+@receiver(post_delete, sender=Publisher)
+def navigation_changed(sender, **kwargs):
+    """Rebuild the genre/developer/publisher menus and the detail pages
+    that show them"""
+    after_commit(namespace('navigation').invalidate)
+    after_commit(clear_review_details)
+
+
+@receiver(m2m_changed, sender=Review.platforms.through)
+def review_platforms_changed(sender, instance, action, reverse, pk_set,
+                             **kwargs):
+    """Platform listings and the platform index's game counts"""
+    if action == 'pre_clear':
+        if reverse:
+            after_commit(clear_listings, 'platform', [instance.pk])
+        else:
+            after_commit(clear_listings, 'platform', list(
+                instance.platforms.values_list('pk', flat=True)))
+    elif action in ('post_add', 'post_remove'):
+        after_commit(clear_listings, 'platform',
+                     [instance.pk] if reverse else set(pk_set))
+        after_commit(namespace('navigation').invalidate)
+
+
+@receiver(m2m_changed, sender=Review.platforms.through)
+@receiver(m2m_changed, sender=Review.developers.through)
+@receiver(m2m_changed, sender=Review.publishers.through)
+def review_relations_changed(sender, instance, action, reverse, **kwargs):
+    if action not in ('post_add', 'post_remove', 'post_clear'):
+        return
+    if reverse:
+        after_commit(clear_review_details)
+    else:
+        after_commit(clear_review_detail, instance.slug)
+
+
+@receiver(post_save, sender=UserComment)
+@receiver(post_delete, sender=UserComment)
+def user_comment_changed(sender, instance, **kwargs):
+    """Approved comments are part of the cached detail page. Rows
+    deleted together clear their pages in one go after commit."""
+    on_commit_batch(clear_review_details_by_id, instance.review_id)
+
+
+@receiver(post_save, sender=UserReview)
+@receiver(post_delete, sender=UserReview)
+def user_review_changed(sender, instance, **kwargs):
+    """Approved user reviews and their average score are part of the
+    cached detail page"""
+    on_commit_batch(clear_review_details_by_id, instance.game_id)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Developer)
+@receiver(post_delete, sender=Developer)
+@receiver(post_save, sender=Publisher)
+@receiver(post_delete, sender=Publisher)
+@receiver(m2m_changed, sender=Review.genres.through)
+@receiver(m2m_changed, sender=Review.platforms.through)
+def api_rows_changed(sender, action='post_save', **kwargs):
+    """Cached API responses embed these rows and their genres and
+    platforms"""
+    if action.startswith('post_'):
+        after_commit(clear_api_cache)
+
+
+@receiver(post_save, sender=Review)
+@receiver(post_delete, sender=Review)
+@receiver(post_save, sender=Genre)
+@receiver(post_delete, sender=Genre)
+@receiver(post_save, sender=Developer)
+@receiver(post_delete, sender=Developer)
+@receiver(post_save, sender=Publisher)
+@receiver(post_delete, sender=Publisher)
+@receiver(m2m_changed, sender=Review.genres.through)
+def sitemap_rows_changed(sender, action='post_save', **kwargs):
+    """Only the sitemap sections built from the changed model are
+    rebuilt"""
+    if action.startswith('post_'):
+        after_commit(clear_sitemaps, sender)
+
+
+def similarity_features(review):
+    return (review.is_published, review.developer_id, review.publisher_id,
+            review.review_score)
+
+
+def update_similar_games_for(review_ids):
+    changed = set()
+    for pk in review_ids:
+        changed |= update_similar_games(pk)
+    clear_review_details_by_id(changed)
+
+
+def recompute_similar_games_for(review_ids):
+    recompute_similar_games(review_ids)
+    clear_review_details_by_id(review_ids)
+
+
+def recompute_around_for(review_ids):
+    clear_review_details_by_id(recompute_around(review_ids))
+
+
+# Ids collected by an open deferred_similarity() block
+_deferred_similarity = ContextVar('deferred_similarity', default=None)
+
+
+def refresh_similar_games(*review_ids):
+    """Update the reviews' similar games, and those they appear among,
+    once the transaction commits, so genres set in the same transaction
+    count. Each review is refreshed once however often it changes.
+
+    Bulk ``update(is_published=...)`` sends no signals; call this with the
+    updated ids.
+    """
+    deferred = _deferred_similarity.get()
+    if deferred is not None:
+        deferred.update(review_ids)
+        return
+    on_commit_batch(update_similar_games_for, *review_ids)
+
+
+@contextmanager
+def deferred_similarity():
+    """Hold back the similar games refreshes of reviews changed inside the
+    block and recompute them together when it ends, for batch jobs that
+    save reviews one by one outside a transaction"""
+    review_ids = set()
+    token = _deferred_similarity.set(review_ids)
+    try:
+        yield
+    finally:
+        _deferred_similarity.reset(token)
+        # Rows written before an error are committed and still need it
+        if review_ids:
+            on_commit_batch(recompute_around_for, *review_ids)
+
+
+def clear_review_details_by_id(review_ids):
+    for pks in batched(review_ids, 500):
+        clear_review_detail(*Review.objects.filter(
+            pk__in=pks).values_list('slug', flat=True))
+
+
+@receiver(post_save, sender=Review)
+def review_similarity_changed(sender, instance, created, **kwargs):
+    """Publishing a review, withdrawing it or changing its companies or
+    score moves it in the similar games index"""
+    previous = getattr(instance, '_previous_similarity', None)
+    if created and not instance.is_published:
+        return
+    if created or previous != similarity_features(instance):
+        refresh_similar_games(instance.pk)
+
+
+@receiver(m2m_changed, sender=Review.genres.through)
+def review_genres_similarity_changed(sender, instance, action, reverse,
+                                     **kwargs):
+    # Genres edited from the genre's side are picked up by the next
+    # build_similarity_index
+    if (action in ('post_add', 'post_remove', 'post_clear')
+            and not reverse and instance.is_published):
+        refresh_similar_games(instance.pk)
+
+
+@receiver(pre_delete, sender=Review)
+def remember_similar_games(sender, instance, **kwargs):
+    # The cascade removes the review from these lists, leaving them short
+    instance._similar_to = list(SimilarGame.objects.filter(
+        similar_id=instance.pk).values_list('review_id', flat=True))
+
+
+@receiver(post_delete, sender=Review)
+def review_similarity_deleted(sender, instance, **kwargs):
+    sources = getattr(instance, '_similar_to', [])
+    if sources:
+        on_commit_batch(recompute_similar_games_for, *sources)
@@ -0,0 +1,302 @@
+"""
+"You might also like" on the review detail page.
+
+Each published review is a sparse feature vector: its genres, developer,
+publisher, review score bucket and average approved user rating bucket.
+Features are weighted by how rare they are across the catalog (a shared
+developer says more than a shared "Adventure"), and vectors are
+normalised so the dot product of two is their cosine similarity.
+
+Only games sharing a genre, developer or publisher are compared, found
+through an inverted index from those features to the games that have
+them; scores and ratings then refine the ranking between them. Each
+review's top ``SIMILAR_GAMES`` are stored as :model:`reviews.SimilarGame`
+rows, so the detail page reads them with one indexed query.
+
+``build_similarity_index`` rebuilds every list. ``update_similar_games``
+refreshes one review's list when it is published or changes, and merges
+it into the lists of the other games. It only loads the review's
+candidates, with the catalog-wide counts of their features.
+``recompute_around`` does the same for a batch of reviews in one load.
+"""
+import heapq
+import math
+from collections import defaultdict
+from itertools import batched
+from django.db import transaction
+from django.db.models import Avg, Count, Q
+from .models import Review, SimilarGame, UserReview
+
+SIMILAR_GAMES = 6
+WRITE_BATCH_SIZE = 1000
+
+# Relative weight of each kind of feature before rarity weighting
+FEATURE_WEIGHTS = {
+    'genre': 1.0,
+    'developer': 1.0,
+    'publisher': 1.0,
+    'score': 0.5,
+    'rating': 0.5,
+}
+# Features that make two games candidates for each other
+CANDIDATE_FEATURES = ('genre', 'developer', 'publisher')
+
+
+def rating_buckets(reviews):
+    return UserReview.objects.filter(
+        approved=True, game__in=reviews
+    ).values('game_id').annotate(rating=Avg('rating')).values_list(
+        'game_id', 'rating')
+
+
+def raw_features(reviews=None):
+    """``{review_id: set of (kind, value)}`` for every published review,
+    or those in the ``reviews`` queryset"""
+    published = Review.objects.filter(is_published=True)
+    if reviews is not None:
+        published = published.filter(pk__in=reviews.values('pk'))
+    features = {}
+    for pk, developer_id, publisher_id, review_score in (
+            published.values_list(
+                'pk', 'developer_id', 'publisher_id', 'review_score')):
+        features[pk] = {('developer', developer_id),
+                        ('publisher', publisher_id)}
+        if review_score is not None:
+            features[pk].add(('score', round(review_score)))
+    for review_id, genre_id in Review.genres.through.objects.filter(
+            review__in=published).values_list('review_id', 'genre_id'):
+        features[review_id].add(('genre', genre_id))
+    for game_id, rating in rating_buckets(published):
+        features[game_id].add(('rating', round(rating)))
+    return features
+
+
+def candidates(review_ids):
+    """Published reviews among ``review_ids`` or sharing a genre,
+    developer or publisher with one of them"""
+    published = Review.objects.filter(is_published=True)
+    seeds = published.filter(pk__in=review_ids)
+    links = Review.genres.through.objects
+    return published.filter(
+        Q(pk__in=seeds.values('pk'))
+        | Q(developer__in=seeds.values('developer_id'))
+        | Q(publisher__in=seeds.values('publisher_id'))
+        | Q(pk__in=links.filter(genre__in=links.filter(
+            review__in=seeds).values('genre_id')).values('review_id'))
+    )
+
+
+def feature_counts(features):
+    """``{feature: published reviews with it}`` across the catalog, for
+    the features in ``features``"""
+    wanted = defaultdict(set)
+    for review_features in features.values():
+        for kind, value in review_features:
+            wanted[kind].add(value)
+    published = Review.objects.filter(is_published=True).order_by()
+    counts = {}
+    for kind in ('developer', 'publisher'):
+        for values in batched(wanted[kind], WRITE_BATCH_SIZE):
+            counts.update(
+                ((kind, value), count)
+                for value, count in published.filter(**{
+                    f'{kind}_id__in': values
+                }).values(f'{kind}_id').annotate(
+                    count=Count('pk')).values_list(f'{kind}_id', 'count'))
+    for values in batched(wanted['genre'], WRITE_BATCH_SIZE):
+        counts.update(
+            (('genre', value), count)
+            for value, count in Review.genres.through.objects.filter(
+                genre_id__in=values, review__is_published=True
+            ).values('genre_id').annotate(
+                count=Count('review_id')).values_list('genre_id', 'count'))
+    # Scores and ratings have a handful of buckets each
+    buckets = defaultdict(int)
+    for review_score, count in published.filter(
+            review_score__isnull=False).values('review_score').annotate(
+            count=Count('pk')).values_list('review_score', 'count'):
+        buckets[('score', round(review_score))] += count
+    for _, rating in rating_buckets(published):
+        buckets[('rating', round(rating))] += 1
+    counts.update(buckets)
+    return counts
+
+
+def weighted_vectors(features, counts=None, total=None):
+    """Rarity-weighted unit vectors, as ``{review_id: {feature: w}}``.
+
+    Rarity comes from ``counts`` out of ``total`` reviews when ``features``
+    is only part of the catalog.
+    """
+    if counts is None:
+        counts = defaultdict(int)
+        for review_features in features.values():
+            for feature in review_features:
+                counts[feature] += 1
+        total = len(features)
+    vectors = {}
+    for pk, review_features in features.items():
+        vector = {
+            feature: FEATURE_WEIGHTS[feature[0]]
+            * math.log(1 + total / counts[feature])
+            for feature in review_features
+        }
+        norm = math.sqrt(sum(w * w for w in vector.values())) or 1.0
+        vectors[pk] = {feature: w / norm for feature, w in vector.items()}
+    return vectors
+
+
+class SimilarityIndex:
+    """Feature vectors of the published catalog with the inverted index
+    used to find each game's candidates"""
+
+    def __init__(self, vectors):
+        self.vectors = vectors
+        self.postings = defaultdict(list)
+        for pk, vector in vectors.items():
+            for feature in vector:
+                if feature[0] in CANDIDATE_FEATURES:
+                    self.postings[feature].append(pk)
+
+    @classmethod
+    def load(cls, review_ids=None):
+        """The index of the whole catalog, or of ``review_ids`` and their
+        candidates, enough to score each of ``review_ids``"""
+        if review_ids is None:
+            return cls(weighted_vectors(raw_features()))
+        features = raw_features(candidates(review_ids))
+        return cls(weighted_vectors(
+            features, feature_counts(features),
+            Review.objects.filter(is_published=True).count()))
+
+    def scores(self, pk):
+        """``{other_id: cosine similarity}`` for every candidate of
+        ``pk``"""
+        vector = self.vectors[pk]
+        candidates = {
+            other for feature in vector
+            for other in self.postings.get(feature, ())
+        }
+        candidates.discard(pk)
+        return {
+            other: sum(w * self.vectors[other].get(feature, 0.0)
+                       for feature, w in vector.items())
+            for other in candidates
+        }
+
+    def nearest(self, pk, k=SIMILAR_GAMES):
+        """``[(other_id, score)]`` of ``pk``'s top ``k``, best first"""
+        return top(self.scores(pk).items(), k)
+
+
+def top(items, k=SIMILAR_GAMES):
+    # Ties go to the older game so rebuilds are stable
+    return heapq.nlargest(k, items, key=lambda item: (item[1], -item[0]))
+
+
+def similar_rows(pk, neighbours):
+    return [
+        SimilarGame(review_id=pk, similar_id=other, score=score, rank=rank)
+        for rank, (other, score) in enumerate(neighbours, 1)
+    ]
+
+
+def build_similarity_index(k=SIMILAR_GAMES, batch_size=WRITE_BATCH_SIZE):
+    """Recompute every published review's similar games, returning the
+    number of rows written"""
+    index = SimilarityIndex.load()
+    written = 0
+    with transaction.atomic():
+        SimilarGame.objects.all().delete()
+        for pks in batched(index.vectors, batch_size):
+            rows = [row for pk in pks
+                    for row in similar_rows(pk, index.nearest(pk, k))]
+            SimilarGame.objects.bulk_create(rows)
+            written += len(rows)
+    return written
+
+
+def update_similar_games(review_id, k=SIMILAR_GAMES):
+    """Refresh one review's similar games after it is published, changed
+    or withdrawn, and the lists of the games it enters or leaves.
+
+    Other games' stored lists are only merged with the review's score for
+    them, so the rest of the catalog isn't recomputed. Returns the ids of
+    the reviews whose lists were rewritten, for clearing their cached
+    detail pages.
+    """
+    # Games whose lists have the review now; recomputed if it drops out
+    previous = set(SimilarGame.objects.filter(
+        similar_id=review_id).values_list('review_id', flat=True))
+    index = SimilarityIndex.load(previous | {review_id})
+    changed = {}
+
+    if review_id in index.vectors:
+        scores = index.scores(review_id)
+        changed[review_id] = top(scores.items(), k)
+        lists = defaultdict(list)
+        for pks in batched(scores, WRITE_BATCH_SIZE):
+            for source, similar, score in SimilarGame.objects.filter(
+                    review_id__in=pks).exclude(
+                    similar_id=review_id).values_list(
+                    'review_id', 'similar_id', 'score'):
+                lists[source].append((similar, score))
+        for other, score in scores.items():
+            neighbours = top(lists[other] + [(review_id, score)], k)
+            if any(pk == review_id for pk, _ in neighbours):
+                changed[other] = neighbours
+
+    for other in previous - changed.keys():
+        if other in index.vectors:
+            changed[other] = index.nearest(other, k)
+
+    with transaction.atomic():
+        for pks in batched(changed.keys() | {review_id}, WRITE_BATCH_SIZE):
+            SimilarGame.objects.filter(review_id__in=pks).delete()
+        SimilarGame.objects.bulk_create(
+            [row for pk, neighbours in changed.items()
+             for row in similar_rows(pk, neighbours)],
+            batch_size=WRITE_BATCH_SIZE)
+    return changed.keys() | previous
+
+
+def recompute_similar_games(review_ids, k=SIMILAR_GAMES):
+    """Rewrite the lists of ``review_ids`` from scratch, e.g. after a game
+    in them is deleted"""
+    review_ids = set(review_ids)
+    # Past a batch the candidates are most of the catalog anyway
+    index = SimilarityIndex.load(
+        review_ids if len(review_ids) <= WRITE_BATCH_SIZE else None)
+    with transaction.atomic():
+        for pks in batched(review_ids, WRITE_BATCH_SIZE):
+            SimilarGame.objects.filter(review_id__in=pks).delete()
+            SimilarGame.objects.bulk_create(
+                [row for pk in pks if pk in index.vectors
+                 for row in similar_rows(pk, index.nearest(pk, k))])
+
+
+def recompute_around(review_ids, k=SIMILAR_GAMES):
+    """Rewrite the lists of ``review_ids`` and of every game they may
+    enter or leave in one pass, for changes to many reviews at once where
+    ``update_similar_games`` would load an index per review. Returns the
+    ids of the reviews whose lists were rewritten."""
+    review_ids = set(review_ids)
+    affected = set(review_ids)
+    for pks in batched(review_ids, WRITE_BATCH_SIZE):
+        affected.update(SimilarGame.objects.filter(
+            similar_id__in=pks).values_list('review_id', flat=True))
+        affected.update(candidates(pks).values_list('pk', flat=True))
+    recompute_similar_games(affected, k)
+    return affected
+
+
+def similar_games(review_id, limit=SIMILAR_GAMES):
+    """The published games most like the review, best first"""
+    return [
+        row.similar for row in SimilarGame.objects.filter(
+            review_id=review_id, similar__is_published=True
+        ).select_related('similar').only(
+            'similar__slug', 'similar__title', 'similar__review_score',
+            'similar__featured_image', 'similar__image_lqip',
+        ).order_by('rank')[:limit]
+    ]
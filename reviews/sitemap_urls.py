@@ -0,0 +1,13 @@
+from django.urls import path
+from . import sitemaps
+
+app_name = 'sitemaps'
+
+urlpatterns = [
+    path('robots.txt', sitemaps.robots_txt, name='robots'),
+    path('sitemap.xml', sitemaps.sitemap_index, name='index'),
+    path('sitemap-<slug:name>-<int:page>.xml', sitemaps.sitemap_section,
+         name='section'),
+    path('feeds/reviews.<str:feed_type>', sitemaps.review_feed,
+         name='review_feed'),
+]
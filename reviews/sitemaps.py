@@ -0,0 +1,245 @@
+"""
+Sitemaps and the new reviews feed.
+
+    /sitemap.xml                          index of the section pages
+    /sitemap-<section>-<page>.xml         reviews, developers, publishers
+                                          and genres, SITEMAP_PAGE_SIZE
+                                          URLs per page
+    /feeds/reviews.rss, /feeds/reviews.atom
+
+Every document is rendered from a ``values_list`` projection of its rows
+(slug and last change) kept in the ``sitemaps`` cache. The signals drop a
+projection only when its own rows change, so saving a developer leaves
+the review sitemap cached. Each projection carries an ETag and the
+latest change, and the views answer conditional GETs from those with a
+304 before rendering anything.
+"""
+import hashlib
+import math
+from django.db.models import Max, Q
+from django.http import Http404, HttpResponse
+from django.template.loader import render_to_string
+from django.urls import reverse
+from django.utils.cache import patch_cache_control
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.http import urlencode
+from django.views.decorators.http import condition, require_GET
+from config.cache import namespace
+from config.db_router import read_from_replica
+from developer.models import Developer
+from publisher.models import Publisher
+from .models import Genre, Review
+
+# The protocol allows 50,000; smaller pages keep each one quick to render
+SITEMAP_PAGE_SIZE = 10000
+FEED_SIZE = 20
+SITEMAP_CACHE_SECONDS = 24 * 60 * 60
+# How long crawlers and proxies may reuse a document before revalidating
+SITEMAP_MAX_AGE = 60 * 60
+
+sitemap_cache = namespace('sitemaps', SITEMAP_CACHE_SECONDS)
+
+FEED_TYPES = {
+    'rss': Rss201rev2Feed,
+    'atom': Atom1Feed,
+}
+
+
+def review_rows():
+    return Review.objects.filter(is_published=True).order_by(
+        'pk').values_list('slug', 'updated_on')
+
+
+def company_rows(model):
+    return lambda: model.objects.order_by('pk').values_list(
+        'slug', 'updated_on')
+
+
+def genre_rows():
+    # Genres have no timestamp of their own; their page changes with its
+    # games
+    return Genre.objects.filter(
+        reviews__is_published=True
+    ).annotate(
+        updated_on=Max('reviews__updated_on',
+                       filter=Q(reviews__is_published=True))
+    ).order_by('pk').values_list('name', 'updated_on')
+
+
+def genre_url(name):
+    return f'{reverse("reviews:review_list")}?{urlencode({"genre": name})}'
+
+
+# Section -> (rows, URL of a row's key)
+SECTIONS = {
+    'reviews': (
+        review_rows,
+        lambda slug: reverse('reviews:review_detail', args=[slug])),
+    'developers': (
+        company_rows(Developer),
+        lambda slug: reverse('developer:developer_games', args=[slug])),
+    'publishers': (
+        company_rows(Publisher),
+        lambda slug: reverse('publisher:publisher_games', args=[slug])),
+    'genres': (genre_rows, genre_url),
+}
+
+# Sections (and the feed) built from each model's rows
+MODEL_SECTIONS = {
+    Review: ('reviews', 'genres', 'feed'),
+    Developer: ('developers',),
+    Publisher: ('publishers',),
+    Genre: ('genres',),
+    Review.genres.through: ('genres',),
+}
+
+
+class Projection:
+    """Cached rows of one document with the validators for it"""
+
+    def __init__(self, rows):
+        self.rows = rows
+        self.last_modified = max(
+            (row[-1] for row in rows if row[-1]), default=None)
+        self.etag = hashlib.sha1(repr(rows).encode()).hexdigest()
+
+
+def section(name):
+    """The :class:`Projection` of ``(key, updated_on)`` rows for one
+    sitemap section"""
+    rows, _ = SECTIONS[name]
+    return sitemap_cache.get_or_compute(
+        'section', name, compute=lambda: Projection(list(rows())))
+
+
+def section_page(name, page):
+    rows = section(name).rows
+    start = (page - 1) * SITEMAP_PAGE_SIZE
+    if page < 1 or (start >= len(rows) and page > 1):
+        raise Http404('No such sitemap page')
+    return rows[start:start + SITEMAP_PAGE_SIZE]
+
+
+def feed_entries():
+    """The newest published reviews, as cached ``values_list`` rows"""
+    return sitemap_cache.get_or_compute('feed', compute=lambda: Projection(
+        list(Review.objects.filter(
+            is_published=True, review_date__isnull=False
+        ).order_by('-review_date', '-pk').values_list(
+            'slug', 'title', 'excerpt', 'review_date', 'updated_on'
+        )[:FEED_SIZE])))
+
+
+def index_etag(request):
+    return '-'.join(section(name).etag for name in SECTIONS)
+
+
+def index_last_modified(request):
+    return max((section(name).last_modified for name in SECTIONS
+                if section(name).last_modified), default=None)
+
+
+def section_etag(request, name, page):
+    return section(name).etag if name in SECTIONS else None
+
+
+def section_last_modified(request, name, page):
+    return section(name).last_modified if name in SECTIONS else None
+
+
+def feed_etag(request, feed_type):
+    return f'{feed_type}-{feed_entries().etag}'
+
+
+def feed_last_modified(request, feed_type):
+    return feed_entries().last_modified
+
+
+def xml_response(template, context):
+    # No request, so the site-wide context processors don't run
+    response = HttpResponse(render_to_string(template, context),
+                            content_type='application/xml; charset=utf-8')
+    patch_cache_control(response, public=True, max_age=SITEMAP_MAX_AGE)
+    return response
+
+
+@require_GET
+@read_from_replica
+@condition(etag_func=index_etag, last_modified_func=index_last_modified)
+def sitemap_index(request):
+    sitemaps = []
+    for name in SECTIONS:
+        rows = section(name).rows
+        for page in range(1, max(math.ceil(len(rows) / SITEMAP_PAGE_SIZE),
+                                 1) + 1):
+            chunk = rows[(page - 1) * SITEMAP_PAGE_SIZE:
+                         page * SITEMAP_PAGE_SIZE]
+            sitemaps.append({
+                'location': request.build_absolute_uri(
+                    reverse('sitemaps:section', args=[name, page])),
+                'lastmod': max((row[-1] for row in chunk if row[-1]),
+                               default=None),
+            })
+    return xml_response('reviews/sitemap_index.xml',
+                        {'sitemaps': sitemaps})
+
+
+@require_GET
+@read_from_replica
+@condition(etag_func=section_etag, last_modified_func=section_last_modified)
+def sitemap_section(request, name, page):
+    if name not in SECTIONS:
+        raise Http404('No such sitemap')
+    _, location = SECTIONS[name]
+    urls = [
+        {'location': request.build_absolute_uri(location(key)),
+         'lastmod': updated_on}
+        for key, updated_on in section_page(name, page)
+    ]
+    return xml_response('reviews/sitemap.xml', {'urls': urls})
+
+
+@require_GET
+@read_from_replica
+@condition(etag_func=feed_etag, last_modified_func=feed_last_modified)
+def review_feed(request, feed_type):
+    if feed_type not in FEED_TYPES:
+        raise Http404('No such feed')
+    feed = FEED_TYPES[feed_type](
+        title='The Gaming Verdict: new reviews',
+        link=request.build_absolute_uri(reverse('reviews:review_list')),
+        description='The latest game reviews on The Gaming Verdict',
+        feed_url=request.build_absolute_uri(),
+        language='en',
+    )
+    for slug, title, excerpt, review_date, updated_on in (
+            feed_entries().rows):
+        link = request.build_absolute_uri(
+            reverse('reviews:review_detail', args=[slug]))
+        feed.add_item(
+            title=title, link=link, description=excerpt, unique_id=link,
+            pubdate=review_date, updateddate=updated_on,
+        )
+    response = HttpResponse(content_type=feed.content_type)
+    feed.write(response, 'utf-8')
+    patch_cache_control(response, public=True, max_age=SITEMAP_MAX_AGE)
+    return response
+
+
+def robots_txt(request):
+    sitemap = request.build_absolute_uri(reverse('sitemaps:index'))
+    return HttpResponse(f'User-agent: *\nDisallow:\nSitemap: {sitemap}\n',
+                        content_type='text/plain')
+
+
+def clear_sitemaps(model=None):
+    """Drop the cached projections built from ``model``'s rows, or all
+    of them"""
+    if model is None:
+        sitemap_cache.invalidate()
+        return
+    for name in MODEL_SECTIONS.get(model, ()):
+        if name == 'feed':
+            sitemap_cache.delete('feed')
+        else:
+            sitemap_cache.delete('section', name)
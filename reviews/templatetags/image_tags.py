@@ -0,0 +1,40 @@
+from django import template
+from reviews.images import (
+    CARD_SIZES, image_key, responsive_image as build_responsive_image
+)
+
+register = template.Library()
+
+
+@register.filter
+def responsive_image(image):
+    """Delivery URLs for any CloudinaryField value, e.g. a company logo:
+
+        {% with logo=developer.logo|responsive_image %}
+    """
+    return build_responsive_image(image)
+
+
+@register.filter
+def is_placeholder(image):
+    """True when ``image`` is the default placeholder, without building
+    its URL"""
+    return image_key(image) is None
+
+
+@register.inclusion_tag('reviews/includes/card_image.html')
+def card_image(review, index=0, eager=4, sizes=CARD_SIZES,
+               placeholder_alt='Default image', alt=None):
+    """Render a review cover with srcset, a blurred preview and
+    ``loading="lazy"`` for every image after the first ``eager`` ones.
+
+        {% card_image review forloop.counter0 %}
+    """
+    return {
+        'image': review.card_image,
+        'lqip': review.image_lqip,
+        'lazy': index >= eager,
+        'sizes': sizes,
+        'alt': alt or review.title,
+        'placeholder_alt': placeholder_alt,
+    }
@@ -0,0 +1,21 @@
+from django import template
+from django.conf import settings
+from django.templatetags.static import static
+from django.utils.html import format_html, format_html_join
+from config.storage import bundle_path
+
+register = template.Library()
+
+
+@register.simple_tag
+def js_bundle(name):
+    """Script tag for a page's bundle from STATIC_BUNDLES, or one tag per
+    source file when DEBUG is on:
+
+        {% js_bundle 'review_detail' %}
+    """
+    if settings.DEBUG:
+        return format_html_join(
+            '\n', '<script src="{}"></script>',
+            ((static(source),) for source in settings.STATIC_BUNDLES[name]))
+    return format_html('<script src="{}"></script>', static(bundle_path(name)))
@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from .utils import make_review
+
+
+class ApiTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reviews = [make_review(f'Game {n}', genres=['RPG'])
+                            for n in range(5)]
+            make_review('Draft', is_published=False)
+
+    def get(self, url, **kwargs):
+        return self.client.get(url, **kwargs)
+
+    def test_field_selection(self):
+        data = self.get('/api/reviews/?fields=title,genres').json()
+        self.assertEqual(data['results'][0],
+                         {'title': 'Game 0', 'genres': ['RPG']})
+        response = self.get('/api/reviews/?fields=title,secret')
+        self.assertEqual(response.status_code, 400)
+        self.assertIn('secret', response.json()['error'])
+
+    def test_cursor_pages(self):
+        seen = []
+        url = '/api/reviews/?fields=id&limit=2'
+        while url:
+            data = self.get(url).json()
+            seen.extend(row['id'] for row in data['results'])
+            cursor = data['next_cursor']
+            url = cursor and (
+                f'/api/reviews/?fields=id&limit=2&cursor={cursor}')
+        self.assertEqual(seen, [review.pk for review in self.reviews])
+
+    def test_ids_keep_order(self):
+        ids = [self.reviews[3].pk, self.reviews[1].pk]
+        data = self.get(
+            f'/api/reviews/?fields=id&ids={ids[0]},{ids[1]}').json()
+        self.assertEqual([row['id'] for row in data['results']], ids)
+
+    def test_etag_revalidation(self):
+        response = self.get('/api/genres/')
+        etag = response.headers['ETag']
+        with self.assertNumQueries(0):
+            response = self.get('/api/genres/', HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    @override_settings(ALLOWED_HOSTS=['one.example', 'two.example'])
+    def test_absolute_urls_per_host(self):
+        url = f'/api/reviews/{self.reviews[0].pk}/?fields=url'
+        first = self.get(url, HTTP_HOST='one.example').json()
+        second = self.get(url, HTTP_HOST='two.example').json()
+        self.assertTrue(first['url'].startswith('http://one.example/'))
+        self.assertTrue(second['url'].startswith('http://two.example/'))
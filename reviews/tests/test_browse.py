@@ -0,0 +1,72 @@
+import datetime
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from reviews.game_relations import save_game_relations
+from reviews.models import Platform
+from .utils import make_review, plain_static
+
+SWITCH = {'id': 130, 'name': 'Nintendo Switch'}
+PC = {'id': 6, 'name': 'PC (Microsoft Windows)'}
+
+
+def released(platform, year, month=6):
+    date = datetime.datetime(year, month, 1, 12)
+    return {'date': int(date.timestamp()), 'platform': platform}
+
+
+@plain_static
+class BrowseTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hades = make_review('Hades')
+            save_game_relations(self.hades, {'release_dates': [
+                released(PC, 2018), released(SWITCH, 2020)]})
+            self.celeste = make_review('Celeste')
+            save_game_relations(self.celeste, {'release_dates': [
+                released(SWITCH, 2018, 1), released(PC, 2018, 1)]})
+            draft = make_review('Draft', is_published=False)
+            save_game_relations(draft, {'release_dates': [
+                released(SWITCH, 2021)]})
+        self.switch = Platform.objects.get(igdb_id=130)
+
+    def titles(self, response):
+        return [game.title for game in response.context['games']]
+
+    def test_platform_list_counts_published_games(self):
+        response = self.client.get(reverse('reviews:platform_list'))
+        self.assertContains(response, 'Nintendo Switch (2)')
+        self.assertContains(response, 'PC (Microsoft Windows) (2)')
+
+    def test_platform_games_by_release_on_platform(self):
+        url = reverse('reviews:platform_games', args=[self.switch.slug])
+        response = self.client.get(url)
+        self.assertContains(response, 'Nintendo Switch Games')
+        # Hades came to Switch after Celeste, though it was out earlier
+        self.assertEqual(self.titles(response), ['Hades', 'Celeste'])
+        response = self.client.get(url, {'sort': 'az'})
+        self.assertEqual(self.titles(response), ['Celeste', 'Hades'])
+        self.assertEqual(self.client.get(
+            reverse('reviews:platform_games', args=['dreamcast'])
+        ).status_code, 404)
+
+    def test_release_years(self):
+        response = self.client.get(reverse('reviews:release_year_list'))
+        # Only the year each published game first came out
+        self.assertEqual(response.context['years'], [(2018, 2)])
+        response = self.client.get(
+            reverse('reviews:release_year_games', args=[2018]))
+        self.assertEqual(self.titles(response), ['Hades', 'Celeste'])
+
+    def test_year_listing_follows_release_date(self):
+        url = reverse('reviews:release_year_games', args=[2018])
+        self.client.get(url)
+        self.client.get(reverse('reviews:release_year_list'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hades.release_date = datetime.date(2019, 9, 17)
+            self.hades.save()
+        self.assertEqual(self.titles(self.client.get(url)), ['Celeste'])
+        response = self.client.get(reverse('reviews:release_year_list'))
+        self.assertEqual(response.context['years'], [(2019, 1), (2018, 1)])
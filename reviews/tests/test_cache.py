@@ -0,0 +1,156 @@
+import time
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection, transaction
+from django.contrib import messages
+from django.contrib.messages.storage.fallback import FallbackStorage
+from django.test import RequestFactory, SimpleTestCase, TestCase
+from django.urls import reverse
+from django.test.utils import CaptureQueriesContext
+from config.cache import Namespace
+from reviews.api import api_cache, clear_api_cache
+from reviews.detail import clear_review_detail, detail_cache
+from reviews.models import Review
+from reviews.views import anonymous_review_page
+from .utils import make_review, plain_static
+
+
+class NamespaceTests(SimpleTestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.ns = Namespace('test', 60)
+
+    def test_invalidate_retires_every_key(self):
+        self.ns.set('a', value=1)
+        self.ns.set('b', value=2)
+        self.ns.invalidate()
+        self.assertIsNone(self.ns.get('a'))
+        self.assertEqual(self.ns.get('b', default=0), 0)
+
+    def test_get_or_compute_caches(self):
+        calls = []
+
+        def compute():
+            calls.append(1)
+            return len(calls)
+        self.assertEqual(self.ns.get_or_compute('k', compute=compute), 1)
+        self.assertEqual(self.ns.get_or_compute('k', compute=compute), 1)
+        self.assertEqual(len(calls), 1)
+
+    def test_locked_key_serves_stale_value(self):
+        self.ns.set('k', value='stale', timeout=60)
+        # Expired as far as the entry knows, and another worker is
+        # recomputing it
+        cache.set(self.ns.key('k'), ('stale', 0, time.time() - 1), 60)
+        cache.add(f'{self.ns.key("k")}:lock', 1)
+        self.assertEqual(
+            self.ns.get_or_compute('k', compute=lambda: 'fresh'), 'stale')
+
+    def test_locked_key_waits_then_computes(self):
+        lock_key = f'{self.ns.key("k")}:lock'
+        cache.add(lock_key, 1)
+        self.assertEqual(
+            self.ns.get_or_compute('k', compute=lambda: 'fresh', wait=0.1),
+            'fresh')
+        # The other worker still holds its lock
+        self.assertEqual(cache.get(lock_key), 1)
+
+    def test_evicted_version_doesnt_revive_old_entries(self):
+        self.ns.set('k', value='old')
+        old_key = self.ns.key('k')
+        self.ns.invalidate()
+        self.ns.invalidate()
+        cache.delete('test:version')
+        self.assertNotEqual(self.ns.key('k'), old_key)
+        self.assertIsNone(self.ns.get('k'))
+
+    def test_update(self):
+        self.ns.update('k', change=lambda value: value + 1)
+        self.assertIsNone(self.ns.get('k'))
+        self.ns.set('k', value=1)
+        self.ns.update('k', change=lambda value: value + 1)
+        self.assertEqual(self.ns.get('k'), 2)
+
+
+class SignalInvalidationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review = make_review('Portal')
+
+    def test_detail_and_api_cleared_after_commit(self):
+        detail_cache.set('page', 'portal', value='cached')
+        api_cache.set('response', value='cached')
+        with mock.patch('reviews.signals.clear_review_detail',
+                        wraps=clear_review_detail) as clear_detail, \
+                mock.patch('reviews.signals.clear_api_cache',
+                           wraps=clear_api_cache) as clear_api:
+            with self.captureOnCommitCallbacks() as callbacks:
+                self.review.description = 'Changed'
+                self.review.save()
+                self.review.save()
+                self.assertEqual(
+                    detail_cache.get('page', 'portal'), 'cached')
+                self.assertEqual(api_cache.get('response'), 'cached')
+            for callback in callbacks:
+                callback()
+        # Two saves, one of each invalidation
+        clear_detail.assert_called_once()
+        clear_api.assert_called_once()
+        self.assertIsNone(detail_cache.get('page', 'portal'))
+        self.assertIsNone(api_cache.get('response'))
+
+    def test_rolled_back_savepoint_keeps_later_calls(self):
+        detail_cache.set('page', 'portal', value='cached')
+        with self.captureOnCommitCallbacks(execute=True):
+            with transaction.atomic():
+                try:
+                    with transaction.atomic():
+                        self.review.save()
+                        raise ValueError
+                except ValueError:
+                    pass
+                self.review.save()
+        self.assertIsNone(detail_cache.get('page', 'portal'))
+
+    def test_save_compares_without_reading(self):
+        review = Review.objects.get(pk=self.review.pk)
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks():
+                review.review_score = 9
+                review.save()
+                review.save(update_fields=['review_score'])
+        self.assertFalse([
+            query for query in queries.captured_queries
+            if query['sql'].startswith('SELECT')
+            and 'FROM "reviews_review"' in query['sql']])
+
+
+@plain_static
+class AnonymousPageTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review = make_review('Portal')
+        self.url = reverse('reviews:review_detail', args=['portal'])
+
+    def test_page_cached_for_anonymous_visitors(self):
+        first = self.client.get(self.url)
+        self.assertContains(first, 'Portal')
+        detail_cache.set('page', 'portal', value=b'cached page')
+        self.assertEqual(self.client.get(self.url).content, b'cached page')
+
+    def test_flash_messages_bypass_cache(self):
+        detail_cache.set('page', 'portal', value=b'cached page')
+        request = RequestFactory().get(self.url)
+        request.session = {}
+        request._messages = FallbackStorage(request)
+        messages.info(request, 'You have signed out.')
+        response = anonymous_review_page(request, 'portal')
+        self.assertNotEqual(response.content, b'cached page')
+        self.assertContains(response, 'You have signed out.')
+        # The visitor's page isn't cached for everyone else
+        self.assertEqual(detail_cache.get('page', 'portal'), b'cached page')
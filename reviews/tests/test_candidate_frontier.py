@@ -0,0 +1,67 @@
+from django.test import TestCase
+from reviews.candidate_frontier import CandidateFrontier
+from reviews.models import FranchiseCursor, SeenIGDBGame
+from .utils import make_review
+
+
+class FakeIGDB:
+    """Search results for one franchise, ``count`` games long"""
+
+    def __init__(self, count):
+        self.games = [{'id': n, 'name': f'Halo {n}'}
+                      for n in range(1, count + 1)]
+
+    def search_games_with_platforms(self, term, limit, offset,
+                                    raise_errors=False):
+        return self.games[offset:offset + limit]
+
+
+class CandidateFrontierTests(TestCase):
+
+    def frontier(self, igdb):
+        return CandidateFrontier(igdb, ['Halo'], batch_size=5)
+
+    def cursor(self):
+        return FranchiseCursor.objects.get(search_term='Halo')
+
+    def test_only_consumed_games_are_seen(self):
+        igdb = FakeIGDB(12)
+        frontier = self.frontier(igdb)
+        first = frontier.next_candidate()
+        frontier.next_candidate()
+        frontier.consume(first)
+        self.assertEqual(
+            list(SeenIGDBGame.objects.values_list('igdb_id', flat=True)),
+            [first['id']])
+        self.assertEqual(self.cursor().offset, 0 if first['id'] > 1 else 1)
+
+        # The next run gets everything but the consumed game back
+        frontier = self.frontier(igdb)
+        offered = set()
+        while (game := frontier.next_candidate()) is not None:
+            offered.add(game['id'])
+            frontier.consume(game)
+        self.assertEqual(offered, set(range(1, 13)) - {first['id']})
+        cursor = self.cursor()
+        self.assertEqual(cursor.offset, 12)
+        self.assertTrue(cursor.exhausted)
+
+    def test_cursor_stops_at_failed_candidate(self):
+        igdb = FakeIGDB(3)
+        frontier = self.frontier(igdb)
+        games = [frontier.next_candidate() for _ in range(3)]
+        failed = min(games, key=lambda game: game['id'])
+        for game in games:
+            if game is not failed:
+                frontier.consume(game)
+        self.assertEqual(self.cursor().offset, 0)
+        self.assertFalse(self.cursor().exhausted)
+        self.assertEqual(self.frontier(igdb).next_candidate(), failed)
+
+    def test_reviewed_games_are_skipped_and_seen(self):
+        make_review('Halo 2')
+        frontier = self.frontier(FakeIGDB(3))
+        offered = {frontier.next_candidate()['id'] for _ in range(2)}
+        self.assertEqual(offered, {1, 3})
+        self.assertIsNone(frontier.next_candidate())
+        self.assertTrue(SeenIGDBGame.objects.filter(igdb_id=2).exists())
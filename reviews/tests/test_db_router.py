@@ -0,0 +1,111 @@
+from unittest import mock
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from django.urls import reverse
+from config import db_router
+from config.cache import Namespace
+from config.db_router import (
+    REPLICA_ALIAS, STICKY_COOKIE, PrimaryReplicaRouter,
+    StickyPrimaryMiddleware, primary_reads, read_from_replica, replica_reads,
+)
+from reviews.models import Review
+from .utils import make_review
+
+
+class ReplicaRoutingTests(TestCase):
+    """Runs with a ``replica`` alias mirroring ``default``, as the test
+    runner sets up a configured replica, so reads routed to it see the
+    test's rows"""
+
+    def setUp(self):
+        cache.clear()
+        replica = {**connections['default'].settings_dict,
+                   'TEST': {'MIRROR': 'default'}}
+        patcher = mock.patch.dict(
+            settings.DATABASES, {REPLICA_ALIAS: replica})
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        connections[REPLICA_ALIAS] = connections['default']
+        self.addCleanup(connections.__delitem__, REPLICA_ALIAS)
+        patcher = mock.patch.object(db_router, '_replica_down_until', 0.0)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+        self.review = make_review('Mirror Game')
+        self.factory = RequestFactory()
+        self.router = PrimaryReplicaRouter()
+
+    def test_router_reads_replica_only_when_marked(self):
+        self.assertEqual(self.router.db_for_read(Review), 'default')
+        with replica_reads():
+            self.assertEqual(self.router.db_for_read(Review), REPLICA_ALIAS)
+            self.assertEqual(self.router.db_for_write(Review), 'default')
+            reviews = Review.objects.all()
+            self.assertEqual(reviews.db, REPLICA_ALIAS)
+            self.assertEqual(list(reviews), [self.review])
+        self.assertEqual(self.router.db_for_read(Review), 'default')
+
+    def test_unreachable_replica_falls_back_to_primary(self):
+        with mock.patch.object(db_router, 'replica_available',
+                               return_value=False):
+            with replica_reads():
+                self.assertEqual(self.router.db_for_read(Review), 'default')
+
+    def test_cache_filled_from_primary(self):
+        with replica_reads():
+            with primary_reads():
+                self.assertEqual(Review.objects.all().db, 'default')
+            self.assertEqual(Review.objects.all().db, REPLICA_ALIAS)
+            computed_on = Namespace('test').get_or_compute(
+                'db', compute=lambda: Review.objects.all().db)
+        self.assertEqual(computed_on, 'default')
+
+    def test_api_response_built_from_primary(self):
+        with mock.patch('reviews.api.list_data',
+                        side_effect=lambda request, resource: {
+                            'db': Review.objects.all().db}):
+            response = self.client.get(
+                reverse('api:resource_list', args=['reviews']))
+        self.assertEqual(response.json(), {'db': 'default'})
+
+    def test_migrations_only_on_primary(self):
+        self.assertTrue(self.router.allow_migrate('default', 'reviews'))
+        self.assertFalse(self.router.allow_migrate(REPLICA_ALIAS, 'reviews'))
+
+    def routed_view(self):
+        @read_from_replica
+        def view(request):
+            return HttpResponse(Review.objects.all().db)
+        return view
+
+    def test_view_reads_from_replica(self):
+        response = self.routed_view()(self.factory.get('/'))
+        self.assertEqual(response.content.decode(), REPLICA_ALIAS)
+
+    def test_writes_and_sticky_clients_stay_on_primary(self):
+        view = self.routed_view()
+        self.assertEqual(
+            view(self.factory.post('/')).content.decode(), 'default')
+        request = self.factory.get('/')
+        request.COOKIES[STICKY_COOKIE] = '1'
+        self.assertEqual(view(request).content.decode(), 'default')
+
+    def test_writes_set_sticky_cookie(self):
+        middleware = StickyPrimaryMiddleware(lambda request: HttpResponse())
+        response = middleware(self.factory.post('/'))
+        cookie = response.cookies[STICKY_COOKIE]
+        self.assertEqual(cookie['max-age'], settings.REPLICA_STICKY_SECONDS)
+        self.assertTrue(cookie['httponly'])
+        self.assertNotIn(
+            STICKY_COOKIE, middleware(self.factory.get('/')).cookies)
+
+    def test_no_sticky_cookie_without_replica(self):
+        del settings.DATABASES[REPLICA_ALIAS]
+        middleware = StickyPrimaryMiddleware(lambda request: HttpResponse())
+        self.assertNotIn(
+            STICKY_COOKIE, middleware(self.factory.post('/')).cookies)
+        response = self.routed_view()(self.factory.get('/'))
+        self.assertEqual(response.content.decode(), 'default')
@@ -0,0 +1,63 @@
+import datetime
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from reviews.featured import compute_featured_slots, featured_slots
+from .utils import make_review
+
+
+def reviewed(days_ago):
+    return timezone.now() - datetime.timedelta(days=days_ago)
+
+
+@mock.patch('reviews.featured.FEATURED_SLOTS', 3)
+class FeaturedSlotsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            # Newest first: Game 0 .. Game 4
+            self.games = [
+                make_review(f'Game {n}', is_featured=True,
+                            review_date=reviewed(n))
+                for n in range(5)
+            ]
+            make_review('Unfeatured', review_date=reviewed(0))
+            make_review('Draft', is_featured=True, is_published=False,
+                        review_date=reviewed(0))
+
+    def titles(self, slots):
+        return [review.title for review in slots]
+
+    def test_slots_capped_and_rotated(self):
+        self.assertEqual(self.titles(compute_featured_slots(0)),
+                         ['Game 0', 'Game 1', 'Game 2'])
+        # Each window moves on by a full set and wraps around
+        self.assertEqual(self.titles(compute_featured_slots(1)),
+                         ['Game 3', 'Game 4', 'Game 0'])
+        self.assertEqual(self.titles(compute_featured_slots(5)),
+                         self.titles(compute_featured_slots(0)))
+
+    def test_no_featured_games(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            for game in self.games:
+                game.is_featured = False
+                game.save()
+        self.assertEqual(featured_slots(), [])
+
+    def test_served_from_cache_without_queries(self):
+        slots = featured_slots()
+        with self.assertNumQueries(0):
+            cached = featured_slots()
+            self.assertEqual(self.titles(cached), self.titles(slots))
+            for review in cached:
+                review.card_image
+                review.comment_count, review.user_review_count
+
+    def test_saving_a_review_rebuilds_slots(self):
+        featured_slots()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.games[1].title = 'Renamed'
+            self.games[1].save()
+        self.assertIn('Renamed', self.titles(featured_slots()))
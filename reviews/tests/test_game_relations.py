@@ -0,0 +1,88 @@
+import datetime
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from developer.models import Developer
+from publisher.models import Publisher
+from reviews.game_relations import save_game_relations
+from reviews.models import Platform, ReleaseDate
+from .utils import make_review, plain_static
+
+
+def timestamp(year, month, day):
+    return int(datetime.datetime(year, month, day, 12).timestamp())
+
+
+SWITCH = {'id': 130, 'name': 'Nintendo Switch', 'abbreviation': 'Switch'}
+PC = {'id': 6, 'name': 'PC (Microsoft Windows)', 'abbreviation': 'PC'}
+
+GAME = {
+    'platforms': [SWITCH],
+    'release_dates': [
+        {'date': timestamp(2019, 3, 1), 'platform': SWITCH},
+        {'date': timestamp(2018, 8, 8), 'platform': PC},
+        {'date': timestamp(2020, 1, 1), 'platform': PC},
+        {'platform': PC},
+    ],
+    'developers': [{'id': 10, 'name': 'Motion Twin'},
+                   {'id': 11, 'name': 'Evil Empire'}],
+    'publishers': [],
+}
+
+
+@plain_static
+class GameRelationsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review = make_review('Dead Cells', 'Motion Twin')
+            save_game_relations(self.review, GAME)
+
+    def test_platforms_and_first_releases(self):
+        self.assertEqual(
+            sorted(self.review.platforms.values_list('name', flat=True)),
+            ['Nintendo Switch', 'PC (Microsoft Windows)'])
+        self.assertEqual(Platform.objects.get(igdb_id=130).slug,
+                         'nintendo-switch')
+        self.assertEqual(
+            sorted(ReleaseDate.objects.filter(review=self.review)
+                   .values_list('platform__igdb_id', 'date', 'is_first')),
+            [(6, datetime.date(2018, 8, 8), True),
+             (6, datetime.date(2020, 1, 1), False),
+             (130, datetime.date(2019, 3, 1), True)])
+        self.review.refresh_from_db()
+        # The earliest release on any platform
+        self.assertEqual(self.review.release_date, datetime.date(2018, 8, 8))
+
+    def test_companies(self):
+        self.assertEqual(
+            sorted(self.review.developers.values_list('name', flat=True)),
+            ['Evil Empire', 'Motion Twin'])
+        self.assertEqual(Developer.objects.filter(
+            name__iexact='motion twin').count(), 1)
+        # IGDB listed no publisher, so the review's own one stands
+        self.assertEqual(list(self.review.publishers.all()),
+                         [Publisher.objects.get(name='Label')])
+
+    def test_saving_again_replaces(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            save_game_relations(self.review, {
+                'platforms': [PC],
+                'release_dates': [
+                    {'date': timestamp(2018, 8, 8), 'platform': PC}],
+            })
+        self.assertEqual(
+            list(self.review.platforms.values_list('igdb_id', flat=True)),
+            [6])
+        self.assertEqual(self.review.release_dates.count(), 1)
+
+    @mock.patch('reviews.igdb_service.IGDBService')
+    def test_detail_page_reads_stored_relations(self, igdb):
+        response = self.client.get(
+            reverse('reviews:review_detail', args=[self.review.slug]))
+        self.assertContains(response, 'Nintendo Switch')
+        self.assertContains(response, 'Evil Empire')
+        self.assertContains(response, 'August 08, 2018')
+        igdb.assert_not_called()
@@ -0,0 +1,74 @@
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.urls import reverse
+from reviews.html import plain_excerpt, sanitize_html
+from reviews.models import Review
+from .utils import make_review, plain_static
+
+UNSAFE = (
+    '<p onclick="steal()">Fast <b>and</b> '
+    '<a href="javascript:steal()" onmouseover="steal()">fun</a></p>'
+    '<script>steal()</script><iframe src="https://evil.example"></iframe>'
+    '<img src="https://img.example/x.png" onerror="steal()" '
+    'style="width: 100%">'
+)
+
+
+class SanitizeTests(SimpleTestCase):
+
+    def test_scripts_and_handlers_stripped(self):
+        html = sanitize_html(UNSAFE)
+        for unsafe in ('<script', '<iframe', 'onclick', 'onmouseover',
+                       'onerror', 'javascript:', 'style='):
+            self.assertNotIn(unsafe, html)
+        self.assertIn('<p>Fast <b>and</b> <a>fun</a></p>', html)
+        self.assertIn('<img src="https://img.example/x.png">', html)
+
+    def test_allowed_markup_kept(self):
+        html = ('<h2 class="lead">Verdict</h2><ul><li><a '
+                'href="https://example.com" title="Site">link</a></li></ul>')
+        self.assertEqual(sanitize_html(html), html)
+        self.assertEqual(sanitize_html(None), '')
+
+    def test_excerpt_is_plain_text(self):
+        self.assertEqual(
+            plain_excerpt('<p>Tom &amp; Jerry</p>\n<p>  chase\n</p>'),
+            'Tom & Jerry chase')
+        excerpt = plain_excerpt('<p>' + 'word ' * 100 + '</p>', length=30)
+        self.assertLessEqual(len(excerpt), 30)
+        self.assertTrue(excerpt.endswith('word…'))
+
+
+@plain_static
+class StoredHtmlTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.review = make_review('Unsafe', review_text=UNSAFE)
+
+    def test_save_stores_sanitized_copies(self):
+        self.assertEqual(self.review.review_html, sanitize_html(UNSAFE))
+        self.assertEqual(self.review.description_html, 'About Unsafe')
+        self.assertEqual(self.review.excerpt, 'About Unsafe')
+
+    def test_partial_save_refreshes_only_when_raw_html_changes(self):
+        Review.objects.filter(pk=self.review.pk).update(review_html='stale')
+        self.review.review_score = 9
+        self.review.save(update_fields=['review_score'])
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.review_html, 'stale')
+
+        self.review.description = '<p>New <script>x()</script>text</p>'
+        self.review.save(update_fields=['description'])
+        self.review.refresh_from_db()
+        self.assertEqual(self.review.description_html, '<p>New x()text</p>')
+        self.assertEqual(self.review.excerpt, 'New x()text')
+
+    def test_detail_page_serves_sanitized_html(self):
+        response = self.client.get(
+            reverse('reviews:review_detail', args=[self.review.slug]))
+        self.assertContains(response, '<p>Fast <b>and</b> <a>fun</a></p>')
+        # The script's text is left as harmless text
+        for unsafe in ('<script>steal', 'onclick', 'onerror', 'javascript:'):
+            self.assertNotContains(response, unsafe)
@@ -0,0 +1,126 @@
+from unittest import mock
+import requests
+from cloudinary import CloudinaryResource
+from django.template import Context, Template
+from django.test import SimpleTestCase
+from reviews.images import (
+    CARD_SIZES, CARD_WIDTHS, LQIP_WIDTH, PLACEHOLDER_URL, delivery_url,
+    fetch_lqip, image_key, responsive_image
+)
+from reviews.models import Review
+from reviews.templatetags.image_tags import is_placeholder
+
+COVER = 'image/upload/v1700000000/game_covers/hades.jpg'
+
+
+class ImageKeyTests(SimpleTestCase):
+
+    def test_placeholders_have_no_key(self):
+        for image in ('', None, 'placeholder',
+                      CloudinaryResource('placeholder')):
+            self.assertIsNone(image_key(image))
+            self.assertTrue(is_placeholder(image))
+
+    def test_stored_value_and_resource_agree(self):
+        resource = CloudinaryResource(
+            'game_covers/hades', format='jpg', version='1700000000')
+        self.assertEqual(image_key(COVER), image_key(resource))
+        self.assertEqual(
+            image_key(COVER),
+            ('game_covers/hades', 'jpg', '1700000000', 'upload', 'image'))
+
+    def test_new_version_new_key(self):
+        self.assertNotEqual(
+            image_key(COVER),
+            image_key(COVER.replace('v1700000000', 'v1800000000')))
+
+    def test_remote_url_delivered_as_is(self):
+        url = 'https://images.igdb.com/t_cover_big/hades.jpg'
+        self.assertEqual(delivery_url(image_key(url), 320), url)
+
+
+class DeliveryUrlTests(SimpleTestCase):
+
+    def test_urls_built_once_per_version_and_width(self):
+        delivery_url.cache_clear()
+        with mock.patch.object(
+                CloudinaryResource, 'build_url', autospec=True,
+                side_effect=CloudinaryResource.build_url) as build_url:
+            first = responsive_image(COVER)
+            second = responsive_image(COVER)
+        self.assertEqual(first.srcset, second.srcset)
+        self.assertEqual(build_url.call_count, len(CARD_WIDTHS))
+        self.assertIn('w_320', first.urls[320])
+        self.assertIn('f_auto', first.src)
+
+    def test_card_image_built_once_per_review(self):
+        review = Review(title='Hades', featured_image=COVER)
+        with mock.patch('reviews.models.responsive_image',
+                        wraps=responsive_image) as build:
+            review.card_image
+            review.card_image
+        build.assert_called_once()
+
+    def test_placeholder_builds_no_url(self):
+        with mock.patch.object(CloudinaryResource, 'build_url') as build_url:
+            image = responsive_image('placeholder')
+        build_url.assert_not_called()
+        self.assertTrue(image.placeholder)
+        self.assertEqual(image.src, PLACEHOLDER_URL)
+        self.assertEqual(image.srcset, '')
+
+
+class CardImageTests(SimpleTestCase):
+
+    def render(self, review, index, **options):
+        extra = ' '.join(f'{name}={value}' for name, value in options.items())
+        return Template(
+            '{% load image_tags %}'
+            f'{{% card_image review {index} {extra} %}}'
+        ).render(Context({'review': review}))
+
+    def test_srcset_sizes_and_preview(self):
+        review = Review(title='Hades', featured_image=COVER,
+                        image_lqip='data:image/jpeg;base64,AAAA')
+        html = self.render(review, 0)
+        for width in CARD_WIDTHS:
+            self.assertIn(f' {width}w', html)
+        self.assertIn(f'sizes="{CARD_SIZES}"', html)
+        self.assertIn('alt="Hades"', html)
+        self.assertIn(
+            "background-image: url('data:image/jpeg;base64,AAAA')", html)
+        # Above the fold
+        self.assertNotIn('loading="lazy"', html)
+
+    def test_lazy_after_eager_images(self):
+        review = Review(title='Hades', featured_image=COVER)
+        self.assertNotIn('loading="lazy"', self.render(review, 3))
+        self.assertIn('loading="lazy"', self.render(review, 4))
+        self.assertIn('loading="lazy"', self.render(review, 1, eager=0))
+        self.assertNotIn('lqip', self.render(review, 4))
+
+    def test_placeholder_card(self):
+        html = self.render(Review(title='Hades'), 5)
+        self.assertIn(f'src="{PLACEHOLDER_URL}"', html)
+        self.assertNotIn('srcset', html)
+        self.assertIn('alt="Default image"', html)
+
+
+class LqipTests(SimpleTestCase):
+
+    @mock.patch('reviews.ingest.http.http_session')
+    def test_preview_inlined_as_data_uri(self, session):
+        session.return_value.get.return_value.content = b'jpeg'
+        self.assertEqual(fetch_lqip(COVER), 'data:image/jpeg;base64,anBlZw==')
+        url = session.return_value.get.call_args.args[0]
+        self.assertIn(f'w_{LQIP_WIDTH}', url)
+        self.assertIn('e_blur:1000', url)
+
+    @mock.patch('reviews.ingest.http.http_session')
+    def test_no_preview_without_stored_image(self, session):
+        self.assertEqual(fetch_lqip('placeholder'), '')
+        self.assertEqual(
+            fetch_lqip('https://images.igdb.com/t_cover_big/hades.jpg'), '')
+        session.assert_not_called()
+        session.return_value.get.side_effect = requests.ConnectionError
+        self.assertEqual(fetch_lqip(COVER), '')
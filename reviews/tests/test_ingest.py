@@ -0,0 +1,42 @@
+from unittest import mock
+from django.db import transaction
+from django.test import TestCase
+from developer.models import Developer
+from publisher.models import Publisher
+from reviews.ingest.service import GameIngestor
+from reviews.models import Genre, Review
+
+
+def game(name):
+    return {
+        'name': name,
+        'developers': [{'name': 'New Developer'}],
+        'publishers': [{'name': 'New Publisher'}],
+        'genres': [{'name': 'New Genre'}],
+    }
+
+
+class GameIngestorTests(TestCase):
+
+    @mock.patch('reviews.ingest.service.generate_ai_review')
+    def test_rolled_back_rows_are_forgotten(self, generate):
+        ingestor = GameIngestor()
+        generate.side_effect = RuntimeError('AI down')
+        with self.assertRaises(RuntimeError):
+            with transaction.atomic():
+                ingestor.create_review(game('First'), 8)
+        self.assertFalse(Developer.objects.exists())
+
+        # Rows that may take the rolled-back ids
+        Developer.objects.create(name='Other Developer')
+        Publisher.objects.create(name='Other Publisher')
+        Genre.objects.create(name='Other Genre')
+
+        generate.side_effect = None
+        generate.return_value = 'Text'
+        review = Review.objects.get(
+            pk=ingestor.create_review(game('Second'), 8).pk)
+        self.assertEqual(review.developer.name, 'New Developer')
+        self.assertEqual(review.publisher.name, 'New Publisher')
+        self.assertEqual(
+            [genre.name for genre in review.genres.all()], ['New Genre'])
@@ -0,0 +1,56 @@
+from django.core.cache import cache
+from django.test import TestCase
+from developer.models import Developer
+from reviews.listings import listing_cache, listing_ids
+from reviews.models import Genre
+from .utils import make_review
+
+
+class ListingTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.zelda = make_review('Zelda', 'Nintendo', genres=['Adventure'])
+            self.mario = make_review('Mario', 'Nintendo')
+            make_review('Draft', 'Nintendo', is_published=False)
+        self.nintendo = Developer.objects.get(name='Nintendo')
+
+    def test_orderings(self):
+        self.assertEqual(listing_ids('developer', self.nintendo.pk, 'az'),
+                         [self.mario.pk, self.zelda.pk])
+        self.assertEqual(listing_ids('developer', self.nintendo.pk, 'za'),
+                         [self.zelda.pk, self.mario.pk])
+        # Unknown orderings fall back to A-Z
+        self.assertEqual(listing_ids('all', 0, 'bogus'),
+                         [self.mario.pk, self.zelda.pk])
+
+    def test_cleared_after_commit(self):
+        listing_ids('all')
+        with self.captureOnCommitCallbacks() as callbacks:
+            kirby = make_review('Kirby', 'Nintendo')
+            # Readers keep the committed listing until the commit
+            self.assertIsNotNone(listing_cache.get('all', 0, 'az'))
+        for callback in callbacks:
+            callback()
+        self.assertEqual(listing_ids('all'),
+                         [kirby.pk, self.mario.pk, self.zelda.pk])
+
+    def test_moved_review_leaves_old_listing(self):
+        listing_ids('developer', self.nintendo.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mario.developer = Developer.objects.create(name='Sega')
+            self.mario.save()
+        self.assertEqual(listing_ids('developer', self.nintendo.pk),
+                         [self.zelda.pk])
+
+    def test_genre_changes(self):
+        adventure = Genre.objects.get(name='Adventure')
+        listing_ids('genre', adventure.pk)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.mario.genres.add(adventure)
+        self.assertEqual(listing_ids('genre', adventure.pk),
+                         [self.mario.pk, self.zelda.pk])
+        with self.captureOnCommitCallbacks(execute=True):
+            adventure.reviews.clear()
+        self.assertEqual(listing_ids('genre', adventure.pk), [])
@@ -0,0 +1,83 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from reviews.detail import detail_cache
+from reviews.models import UserComment, UserReview
+from reviews.moderation import comment_queue, review_queue
+from .utils import make_review
+
+
+class ModerationTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        self.spammer = User.objects.create_user('spammer')
+        self.reader = User.objects.create_user('reader')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.games = [make_review(f'Game {n}') for n in range(3)]
+            for n in range(30):
+                UserComment.objects.create(
+                    review=self.games[n % 3], author=self.spammer,
+                    body=f'Buy cheap coins {n}')
+            self.kind = UserComment.objects.create(
+                review=self.games[0], author=self.reader, body='Great game')
+
+    def test_filters(self):
+        self.assertEqual(
+            comment_queue.matching({'q': 'coins'}).count(), 30)
+        self.assertEqual(
+            comment_queue.matching({'author': 'READER'}).get(), self.kind)
+        self.assertEqual(
+            comment_queue.matching({'game': 'game-1'}).count(), 10)
+
+    def test_pages_follow_cursor(self):
+        seen = []
+        cursor = None
+        while True:
+            rows, cursor = comment_queue.page({}, cursor=cursor)
+            seen.extend(row.pk for row in rows)
+            if cursor is None:
+                break
+        self.assertEqual(len(seen), 31)
+        self.assertEqual(seen, sorted(set(seen), reverse=True))
+
+    def test_approve_matching(self):
+        self.client.force_login(self.admin)
+        self.client.post(reverse('reviews:approve_comments'),
+                         {'action': 'approve_matching', 'author': 'reader'})
+        self.kind.refresh_from_db()
+        self.assertTrue(self.kind.approved)
+        self.assertEqual(comment_queue.counts(),
+                         {'pending': 30, 'approved': 1})
+
+    def test_reject_matching_clears_details_once(self):
+        for game in self.games:
+            detail_cache.set('page', game.slug, value='cached')
+        self.client.force_login(self.admin)
+        with CaptureQueriesContext(connection) as queries, \
+                self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('reviews:approve_comments'),
+                             {'action': 'reject_matching', 'q': 'coins'})
+        self.assertEqual(UserComment.objects.count(), 1)
+        self.assertLess(len(queries), 10)
+        for game in self.games:
+            self.assertIsNone(detail_cache.get('page', game.slug))
+
+    def test_reject_user_reviews(self):
+        reviews = [
+            UserReview.objects.create(
+                game=game, user=self.spammer, rating=1, review_text='Bad')
+            for game in self.games
+        ]
+        self.client.force_login(self.admin)
+        self.client.post(reverse('reviews:approve_reviews'), {
+            'action': 'reject',
+            'review_ids': [review.pk for review in reviews[:2]],
+        })
+        self.assertEqual(review_queue.counts(),
+                         {'pending': 1, 'approved': 0})
@@ -0,0 +1,105 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.test import TestCase
+from django.utils import timezone
+from django.urls import reverse
+from developer.models import Developer
+from reviews.ingest import GameIngestor
+from reviews.models import PopulateJob, PopulateJobResult, Review
+from reviews.populate_jobs import JOB_STALE_AFTER, claim_next_job, run_job
+from .test_candidate_frontier import FakeIGDB
+
+
+class FranchiseIGDB(FakeIGDB):
+
+    def __init__(self):
+        super().__init__(3)
+        for game in self.games:
+            game['developers'] = [{'name': 'Bungie'}]
+            game['publishers'] = [{'name': 'Microsoft'}]
+
+
+class PopulateJobTests(TestCase):
+
+    def setUp(self):
+        self.admin = User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password')
+        self.client.force_login(self.admin)
+
+    def test_auto_generate_is_queued(self):
+        response = self.client.post(reverse('reviews:auto_generate_create'),
+                                    {'count': 2, 'min_score': 6,
+                                     'max_score': 9})
+        job = PopulateJob.objects.get()
+        self.assertRedirects(
+            response, reverse('reviews:populate_job', args=[job.pk]),
+            fetch_redirect_response=False)
+        self.assertEqual(job.kind, PopulateJob.KIND_AUTO)
+        self.assertEqual(job.status, PopulateJob.STATUS_PENDING)
+        self.assertEqual(job.options['count'], 2)
+
+    @mock.patch('reviews.ingest.service.generate_ai_review',
+                return_value='Text')
+    @mock.patch('reviews.populate_jobs.IGDBService', FranchiseIGDB)
+    def test_auto_generate_job(self, generate):
+        PopulateJob.objects.create(
+            kind=PopulateJob.KIND_AUTO, total=2,
+            options={'count': 2, 'min_score': 6, 'max_score': 9})
+        ingestor = GameIngestor()
+        job = run_job(claim_next_job(), ingestor)
+        self.assertEqual(job.status, PopulateJob.STATUS_DONE)
+        self.assertEqual(Review.objects.count(), 2)
+        # The worker's ingestor did the work and is strict again
+        self.assertIn((Developer, 'bungie'), ingestor.companies)
+        self.assertFalse(ingestor.lenient)
+        self.assertEqual(
+            list(job.results.values_list('outcome', flat=True)),
+            [PopulateJobResult.OUTCOME_CREATED] * 2)
+
+    def test_events_answer_once(self):
+        job = PopulateJob.objects.create(
+            total=2, status=PopulateJob.STATUS_RUNNING)
+        first = PopulateJobResult.objects.create(
+            job=job, position=0, title='Halo',
+            outcome=PopulateJobResult.OUTCOME_ERROR)
+        url = reverse('reviews:populate_job_events', args=[job.pk])
+        response = self.client.get(url)
+        body = response.content.decode()
+        self.assertIn('retry: ', body)
+        self.assertIn(f'id: {first.pk}', body)
+        self.assertNotIn('event: done', body)
+
+        job.status = PopulateJob.STATUS_DONE
+        job.save()
+        body = self.client.get(
+            url, HTTP_LAST_EVENT_ID=str(first.pk)).content.decode()
+        self.assertNotIn('event: result', body)
+        self.assertIn('event: done', body)
+
+    def test_stale_running_job_is_failed(self):
+        long_ago = timezone.now() - JOB_STALE_AFTER * 2
+        stale = PopulateJob.objects.create(
+            status=PopulateJob.STATUS_RUNNING, started_on=long_ago,
+            heartbeat_on=long_ago)
+        alive = PopulateJob.objects.create(
+            status=PopulateJob.STATUS_RUNNING, started_on=long_ago,
+            heartbeat_on=timezone.now())
+        pending = PopulateJob.objects.create()
+        self.assertEqual(claim_next_job(), pending)
+        stale.refresh_from_db()
+        alive.refresh_from_db()
+        self.assertEqual(stale.status, PopulateJob.STATUS_FAILED)
+        self.assertTrue(stale.error_message)
+        self.assertEqual(alive.status, PopulateJob.STATUS_RUNNING)
+
+    def test_finished_job_keeps_stale_failure(self):
+        job = PopulateJob.objects.create(items=[])
+        claimed = claim_next_job()
+        # The sweeper gave up on the worker before it finished
+        PopulateJob.objects.filter(pk=job.pk).update(
+            status=PopulateJob.STATUS_FAILED,
+            error_message='The worker stopped before finishing the job')
+        job = run_job(claimed)
+        self.assertEqual(job.status, PopulateJob.STATUS_FAILED)
+        self.assertEqual(PopulateJob.objects.get().status,
+                         PopulateJob.STATUS_FAILED)
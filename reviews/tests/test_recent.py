@@ -0,0 +1,42 @@
+from django.core.cache import cache
+from django.db import transaction
+from django.test import TestCase
+from django.utils import timezone
+from reviews.recent import recent_cache, recent_review_ids
+from .utils import make_review
+
+
+class RecentReviewsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.old = make_review('Old', review_date=timezone.now())
+        recent_review_ids(7)
+
+    def test_added_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            new = make_review('New', review_date=timezone.now())
+        self.assertEqual(recent_review_ids(7), [new.pk, self.old.pk])
+
+    def test_rolled_back_review_not_added(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            try:
+                with transaction.atomic():
+                    make_review('Phantom', review_date=timezone.now())
+                    raise RuntimeError
+            except RuntimeError:
+                pass
+        self.assertEqual(recent_review_ids(7), [self.old.pk])
+
+    def test_unpublished_and_deleted_reviews_dropped(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.old.is_published = False
+            self.old.save()
+        self.assertEqual(recent_review_ids(7), [])
+
+    def test_locked_list_is_dropped(self):
+        cache.add(f'{recent_cache.key("entries")}:lock', 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.old.delete()
+        self.assertIsNone(recent_cache.get('entries'))
@@ -0,0 +1,106 @@
+from unittest import mock
+from django.contrib.auth.models import User
+from django.db import connection, transaction
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from reviews.models import Genre, Review, SimilarGame
+from reviews.signals import update_similar_games_for
+from reviews.similarity import (
+    SimilarityIndex, build_similarity_index, similar_games,
+    update_similar_games
+)
+from .utils import make_review
+
+
+def stored_lists():
+    return list(SimilarGame.objects.order_by(
+        'review_id', 'rank').values_list('review_id', 'similar_id'))
+
+
+class SimilarityTests(TestCase):
+
+    def setUp(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.create_reviews()
+
+    def create_reviews(self):
+        self.rpg = make_review('Dragon Quest', 'Square', 'Enix',
+                               ['RPG', 'Adventure'], 9)
+        self.sequel = make_review('Dragon Quest II', 'Square', 'Enix',
+                                  ['RPG', 'Adventure'], 9)
+        self.cousin = make_review('Final Fantasy', 'Square', 'Other',
+                                  ['RPG'], 7)
+        self.stranger = make_review('Tetris', 'Pajitnov', 'Elorg',
+                                    ['Puzzle'], 9)
+        self.adventure = make_review('Myst', 'Cyan', 'Broderbund',
+                                     ['Adventure'], 6)
+        self.draft = make_review('Dragon Quest III', 'Square', 'Enix',
+                                 ['RPG'], 9, is_published=False)
+
+    def test_ranking(self):
+        build_similarity_index()
+        self.assertEqual(similar_games(self.rpg.pk),
+                         [self.sequel, self.cousin, self.adventure])
+        # Nothing in common with anything else
+        self.assertEqual(similar_games(self.stranger.pk), [])
+        self.assertFalse(SimilarGame.objects.filter(
+            review=self.draft).exists())
+
+    def test_partial_index_matches_full(self):
+        full = SimilarityIndex.load()
+        partial = SimilarityIndex.load({self.cousin.pk})
+        self.assertNotIn(self.stranger.pk, partial.vectors)
+        for pk, score in full.scores(self.cousin.pk).items():
+            self.assertAlmostEqual(
+                partial.scores(self.cousin.pk)[pk], score)
+
+    def test_update_matches_rebuild(self):
+        build_similarity_index()
+        self.draft.is_published = True
+        self.draft.save()
+        update_similar_games(self.draft.pk)
+        updated = stored_lists()
+        build_similarity_index()
+        self.assertEqual(updated, stored_lists())
+
+    def test_one_refresh_per_transaction(self):
+        build_similarity_index()
+        refreshes = []
+
+        def refresh(review_ids):
+            with CaptureQueriesContext(connection) as queries:
+                update_similar_games_for(review_ids)
+            refreshes.append((set(review_ids), len(queries)))
+        with mock.patch('reviews.signals.update_similar_games_for',
+                        side_effect=refresh):
+            with self.captureOnCommitCallbacks(execute=True):
+                with transaction.atomic():
+                    self.draft.is_published = True
+                    self.draft.save()
+                    self.draft.genres.add(
+                        Genre.objects.get(name='Adventure'))
+        self.assertEqual(len(refreshes), 1)
+        review_ids, queries = refreshes[0]
+        self.assertEqual(review_ids, {self.draft.pk})
+        self.assertLess(queries, 20)
+        self.assertIn(self.draft, similar_games(self.rpg.pk))
+
+
+class BulkPublishTests(TestCase):
+
+    def test_publish_selected_adds_similar_games(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            first = make_review('Halo', 'Bungie', 'Microsoft', ['Shooter'])
+            second = make_review('Halo 2', 'Bungie', 'Microsoft',
+                                 ['Shooter'], is_published=False)
+        self.client.force_login(User.objects.create_superuser(
+            'admin', 'admin@example.com', 'password'))
+        with self.captureOnCommitCallbacks(execute=True):
+            self.client.post(reverse('reviews:populate_interface'), {
+                'action': 'publish_selected',
+                'existing_review_ids': [second.pk],
+            })
+        self.assertTrue(Review.objects.get(pk=second.pk).is_published)
+        self.assertEqual(similar_games(first.pk), [second])
+        self.assertEqual(similar_games(second.pk), [first])
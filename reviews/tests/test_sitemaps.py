@@ -0,0 +1,89 @@
+from unittest import mock
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from developer.models import Developer
+from .utils import make_review
+
+
+class SitemapTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hades = make_review('Hades', review_date=timezone.now())
+            self.celeste = make_review('Celeste', 'Matt Makes Games',
+                                       review_date=timezone.now())
+            make_review('Draft', is_published=False,
+                        review_date=timezone.now())
+
+    def section(self, name, page=1, etag=None):
+        return self.client.get(
+            reverse('sitemaps:section', args=[name, page]),
+            headers={'If-None-Match': etag} if etag else {})
+
+    def test_index_and_sections(self):
+        response = self.client.get(reverse('sitemaps:index'))
+        for name in ('reviews', 'developers', 'publishers', 'genres'):
+            self.assertContains(response, f'/sitemap-{name}-1.xml')
+        response = self.section('reviews')
+        self.assertContains(response, '/reviews/hades/')
+        self.assertContains(response, '/reviews/celeste/')
+        self.assertNotContains(response, '/reviews/draft/')
+        self.assertContains(self.section('developers'), '/developers/studio/')
+        self.assertEqual(self.section('reviews', 2).status_code, 404)
+        self.assertEqual(self.section('platforms').status_code, 404)
+
+    @mock.patch('reviews.sitemaps.SITEMAP_PAGE_SIZE', 1)
+    def test_sections_paged(self):
+        response = self.client.get(reverse('sitemaps:index'))
+        self.assertContains(response, '/sitemap-reviews-2.xml')
+        self.assertNotContains(self.section('reviews', 2), '/reviews/hades/')
+        self.assertEqual(self.section('reviews', 3).status_code, 404)
+
+    def test_matching_etag_gets_304(self):
+        response = self.section('reviews')
+        etag = response['ETag']
+        self.assertIn('max-age', response['Cache-Control'])
+        # Answered from the cached projection, without rendering
+        with self.assertNumQueries(0):
+            response = self.section('reviews', etag=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(response.content, b'')
+
+    def test_etag_changes_with_own_rows_only(self):
+        etag = self.section('reviews')['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            Developer.objects.get(name='Studio').save()
+        self.assertEqual(
+            self.section('reviews', etag=etag).status_code, 304)
+        with self.captureOnCommitCallbacks(execute=True):
+            self.hades.slug = 'hades-ii'
+            self.hades.save()
+        response = self.section('reviews', etag=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertContains(response, '/reviews/hades-ii/')
+
+    def test_feeds(self):
+        response = self.client.get(
+            reverse('sitemaps:review_feed', args=['rss']))
+        self.assertContains(response, '<title>Hades</title>')
+        self.assertNotContains(response, 'Draft')
+        etag = response['ETag']
+        response = self.client.get(
+            reverse('sitemaps:review_feed', args=['atom']),
+            headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 200)
+        self.assertTrue(response['Content-Type'].startswith(
+            'application/atom+xml'))
+        response = self.client.get(
+            reverse('sitemaps:review_feed', args=['rss']),
+            headers={'If-None-Match': etag})
+        self.assertEqual(response.status_code, 304)
+        self.assertEqual(self.client.get(
+            reverse('sitemaps:review_feed', args=['json'])).status_code, 404)
+
+    def test_robots_points_at_index(self):
+        response = self.client.get(reverse('sitemaps:robots'))
+        self.assertContains(response, 'Sitemap: http://testserver/sitemap.xml')
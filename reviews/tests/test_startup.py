@@ -0,0 +1,19 @@
+from django.test import SimpleTestCase
+from reviews.management.commands.import_profile import profile_startup
+
+
+class StartupImportTests(SimpleTestCase):
+    """A web worker's imports leave the ingestion SDKs until they are
+    used. How long startup takes is reported by the import_profile
+    command; wall-clock time is too noisy to assert on here."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.modules = profile_startup()
+
+    def test_heavy_sdks_not_imported(self):
+        imported = {module.name for module in self.modules}
+        top_level = {name.partition('.')[0] for name in imported}
+        for name in ('azure', 'igdb', 'bleach'):
+            self.assertNotIn(name, top_level)
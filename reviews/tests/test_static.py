@@ -0,0 +1,64 @@
+import os
+import tempfile
+from django.template import Context, Template
+from django.test import SimpleTestCase, override_settings
+from config.storage import StaticStorage, bundle_path
+
+BUNDLES = {'page': ['js/one.js', 'js/two.js']}
+SOURCES = {
+    'js/one.js': 'var total = 1  // no semicolon\n',
+    'js/two.js': '(function () {\n' + '    total += 1;\n' * 50 + '})();\n',
+}
+
+
+@override_settings(STATIC_BUNDLES=BUNDLES)
+class BundleTests(SimpleTestCase):
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = StaticStorage(
+            location=directory.name, base_url='/static/')
+        for path, source in SOURCES.items():
+            os.makedirs(self.storage.path('js'), exist_ok=True)
+            with open(self.storage.path(path), 'w') as f:
+                f.write(source)
+
+    def collect(self):
+        paths = {path: (self.storage, path) for path in SOURCES}
+        for name, hashed, processed in self.storage.post_process(paths):
+            if isinstance(processed, Exception):
+                raise processed
+
+    def test_bundle_minified_and_joined(self):
+        self.collect()
+        with self.storage.open(bundle_path('page')) as f:
+            bundle = f.read().decode()
+        self.assertNotIn('no semicolon', bundle)
+        self.assertNotIn('\n    ', bundle)
+        # The first file's last statement is ended before the second
+        self.assertRegex(bundle, r'var total=1;\n\(function')
+
+    def test_bundle_hashed_and_compressed(self):
+        self.collect()
+        hashed = self.storage.stored_name(bundle_path('page'))
+        self.assertRegex(hashed, r'^js/page\.bundle\.[0-9a-f]{12}\.js$')
+        self.assertTrue(self.storage.exists(hashed + '.gz'))
+        self.assertTrue(self.storage.exists(hashed + '.br'))
+
+    def render(self):
+        return Template(
+            "{% load static_tags %}{% js_bundle 'page' %}").render(Context())
+
+    @override_settings(STORAGES={'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'}})
+    def test_tag_loads_bundle(self):
+        self.assertHTMLEqual(
+            self.render(), '<script src="/static/js/page.bundle.js"></script>')
+
+    @override_settings(DEBUG=True)
+    def test_tag_loads_sources_in_debug(self):
+        self.assertHTMLEqual(
+            self.render(),
+            '<script src="/static/js/one.js"></script>'
+            '<script src="/static/js/two.js"></script>')
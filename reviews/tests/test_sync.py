@@ -0,0 +1,107 @@
+from unittest import mock
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from developer.models import Developer
+from reviews.ingest import CatalogSync
+from reviews.models import Genre, SimilarGame, SyncWatermark
+from reviews.similarity import build_similarity_index, recompute_around
+from .utils import make_review
+
+
+class FakeIGDB:
+    """Answers ``updated_since`` for games with new genres"""
+
+    def __init__(self, genres, companies=()):
+        self.genres = genres
+        self.companies = companies
+
+    def updated_since(self, endpoint, fields, ids, since=None):
+        if endpoint != 'games':
+            return []
+        return [
+            {'id': pk, 'genres': [{'name': name} for name in self.genres[pk]],
+             'involved_companies': [
+                 {'company': company, 'developer': True}
+                 for company in self.companies]}
+            for pk in ids if pk in self.genres
+        ]
+
+
+def stored_lists():
+    return list(SimilarGame.objects.order_by(
+        'review_id', 'rank').values_list('review_id', 'similar_id'))
+
+
+class CatalogSyncTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.games = [
+                make_review(f'Game {n}', f'Studio {n}', f'Label {n}',
+                            ['Puzzle' if n % 2 else 'Racing'], igdb_id=n)
+                for n in range(1, 5)
+            ]
+            build_similarity_index()
+        self.igdb = FakeIGDB({1: ['Racing'], 2: ['Puzzle'], 3: ['Racing']})
+
+    def test_dry_run_writes_nothing(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            changed = CatalogSync(self.igdb, dry_run=True).run()
+        self.assertEqual(changed, {'genres': 0, 'companies': 0, 'games': 0})
+        self.assertFalse(SyncWatermark.objects.exists())
+        self.assertEqual(
+            list(self.games[0].genres.values_list('name', flat=True)),
+            ['Puzzle'])
+
+    def test_watermarks_saved(self):
+        CatalogSync(self.igdb).run()
+        self.assertEqual(
+            set(SyncWatermark.objects.values_list('endpoint', flat=True)),
+            {'genres', 'companies', 'games'})
+        self.assertFalse(
+            SyncWatermark.objects.filter(synced_until__isnull=True).exists())
+
+    def test_similar_games_recomputed_once(self):
+        with mock.patch('reviews.signals.update_similar_games') as single, \
+                mock.patch('reviews.signals.recompute_around',
+                           side_effect=recompute_around) as batch:
+            with self.captureOnCommitCallbacks(execute=True):
+                CatalogSync(self.igdb).run()
+        single.assert_not_called()
+        batch.assert_called_once()
+        self.assertEqual(batch.call_args.args[0],
+                         {game.pk for game in self.games[:3]})
+        self.assertEqual(
+            set(Genre.objects.get(name='Racing').reviews.values_list(
+                'igdb_id', flat=True)), {1, 3, 4})
+
+        synced = stored_lists()
+        build_similarity_index()
+        self.assertEqual(synced, stored_lists())
+
+    @mock.patch('reviews.ingest.service.upload_image',
+                return_value='https://cdn.example/logo.png')
+    def test_unchanged_games_not_rewritten(self, upload):
+        self.igdb.companies = [{
+            'id': 77, 'name': 'Port House',
+            'logo': {'url': '//images.igdb.com/t_thumb/port.png'}}]
+        with self.captureOnCommitCallbacks(execute=True):
+            CatalogSync(self.igdb).run()
+        port_house = Developer.objects.get(name='Port House')
+        upload.assert_called_once()
+        self.assertEqual(upload.call_args.args[0],
+                         'https://images.igdb.com/t_logo_med/port.png')
+        self.assertNotEqual(str(port_house.logo), 'placeholder')
+        self.assertIn(port_house, self.games[0].developers.all())
+
+        with CaptureQueriesContext(connection) as queries:
+            with self.captureOnCommitCallbacks(execute=True):
+                CatalogSync(self.igdb, full=True).run()
+        writes = [q['sql'] for q in queries.captured_queries
+                  if not q['sql'].startswith('SELECT')
+                  and 'syncwatermark' not in q['sql']
+                  and 'SAVEPOINT' not in q['sql']]
+        self.assertEqual(writes, [])
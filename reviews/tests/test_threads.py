@@ -0,0 +1,72 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+from reviews.detail import THREAD_PAGE_SIZE, build_review_snapshot
+from reviews.models import UserComment, UserReview
+from .utils import make_review
+
+
+class ThreadTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user('reader')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.game = make_review('Threaded')
+            for n in range(THREAD_PAGE_SIZE + 5):
+                UserComment.objects.create(
+                    review=self.game, author=self.reader, approved=True,
+                    body=f'Comment {n}')
+            UserComment.objects.create(
+                review=self.game, author=self.reader, body='Pending')
+            UserReview.objects.create(
+                game=self.game, user=self.reader, rating=9, approved=True,
+                review_text='Loved it')
+        # Rows written in the same instant still page in a fixed order
+        UserComment.objects.update(created_on=timezone.now())
+
+    def load(self, kind, cursor=None):
+        url = reverse('reviews:review_thread', args=[self.game.slug, kind])
+        return self.client.get(url, {'cursor': cursor} if cursor else {})
+
+    def bodies(self, html):
+        return [n for n in range(THREAD_PAGE_SIZE + 5)
+                if f'<p>Comment {n}</p>' in html]
+
+    def test_first_page_in_snapshot(self):
+        snapshot = build_review_snapshot(self.game.slug)
+        self.assertEqual(len(snapshot['user_comments']), THREAD_PAGE_SIZE)
+        self.assertIsNotNone(snapshot['comments_cursor'])
+        # Counted in full only when there is more than a page
+        self.assertEqual(snapshot['comment_count'], THREAD_PAGE_SIZE + 5)
+        self.assertIsNone(snapshot['reviews_cursor'])
+        self.assertEqual(snapshot['user_review_count'], 1)
+
+    def test_load_more_follows_cursor(self):
+        first = build_review_snapshot(self.game.slug)
+        shown = [int(comment.body.split()[-1])
+                 for comment in first['user_comments']]
+        data = self.load('comments', first['comments_cursor']).json()
+        self.assertIsNone(data['next_cursor'])
+        rest = self.bodies(data['html'])
+        self.assertEqual(len(rest), 5)
+        # Every comment once, across both pages
+        self.assertEqual(sorted(shown + rest),
+                         list(range(THREAD_PAGE_SIZE + 5)))
+        self.assertNotIn('Pending', data['html'])
+
+    def test_first_page_without_cursor(self):
+        data = self.load('comments').json()
+        self.assertEqual(len(self.bodies(data['html'])), THREAD_PAGE_SIZE)
+        self.assertIsNotNone(data['next_cursor'])
+        data = self.load('reviews').json()
+        self.assertIn('Loved it', data['html'])
+        self.assertIsNone(data['next_cursor'])
+
+    def test_unknown_thread_or_game(self):
+        self.assertEqual(self.load('ratings').status_code, 404)
+        self.game.is_published = False
+        self.game.save()
+        self.assertEqual(self.load('comments').status_code, 404)
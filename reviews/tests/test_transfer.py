@@ -0,0 +1,79 @@
+import datetime
+import io
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from developer.models import Developer
+from publisher.models import Publisher
+from reviews.models import Genre, Review, UserComment, UserReview
+from reviews.transfer import CatalogImporter, export_catalog
+from .utils import company, make_review
+
+
+class CatalogTransferTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.reader = User.objects.create_user('reader')
+            review = make_review('Round Trip', genres=['RPG', 'Indie'])
+            review.developers.add(company(Developer, 'Porting House'))
+            make_review('Sequel', genres=['RPG'], is_published=False)
+            comment = UserComment.objects.create(
+                review=review, author=self.reader, body='Loved it',
+                approved=True)
+            UserReview.objects.create(
+                game=review, user=self.reader, rating=9,
+                review_text='Great', approved=True)
+        self.commented_on = timezone.make_aware(
+            datetime.datetime(2021, 5, 1, 12, 0))
+        UserComment.objects.filter(pk=comment.pk).update(
+            created_on=self.commented_on)
+
+    def export(self):
+        stream = io.StringIO()
+        counts = export_catalog(stream)
+        return stream.getvalue(), counts
+
+    def test_round_trip_into_empty_catalog(self):
+        data, counts = self.export()
+        self.assertEqual(counts['reviews.review'], 2)
+        self.assertEqual(counts['auth.user'], 1)
+        with self.captureOnCommitCallbacks(execute=True):
+            Review.objects.all().delete()
+            for model in (Genre, Developer, Publisher, User):
+                model.objects.all().delete()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            imported = CatalogImporter(batch_size=1).run(
+                io.StringIO(data))
+        self.assertEqual(imported['reviews.review']['created'], 2)
+        review = Review.objects.get(slug='round-trip')
+        self.assertEqual(
+            sorted(review.genres.values_list('name', flat=True)),
+            ['Indie', 'RPG'])
+        self.assertEqual(review.developer.name, 'Studio')
+        self.assertEqual(
+            list(review.developers.values_list('name', flat=True)),
+            ['Porting House'])
+        self.assertFalse(Review.objects.get(slug='sequel').is_published)
+        comment = review.user_comments.get()
+        self.assertEqual(comment.author.username, 'reader')
+        self.assertEqual(comment.created_on, self.commented_on)
+        self.assertEqual(review.user_reviews.get().rating, 9)
+
+    def test_reimport_adds_nothing(self):
+        data, counts = self.export()
+        with self.captureOnCommitCallbacks(execute=True):
+            imported = CatalogImporter().run(io.StringIO(data))
+        for label, count in counts.items():
+            self.assertEqual(imported[label]['created'], 0, label)
+        self.assertEqual(imported['reviews.review']['existing'], 2)
+        self.assertEqual(imported['reviews.usercomment']['skipped'], 1)
+        self.assertEqual(UserComment.objects.count(), 1)
+        self.assertEqual(self.export()[0], data)
+
+    def test_rejects_malformed_lines(self):
+        with self.assertRaisesMessage(ValueError, 'Line 2'):
+            CatalogImporter().run(['', '{"model": "auth.group"}'])
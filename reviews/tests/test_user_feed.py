@@ -0,0 +1,73 @@
+from django.contrib.auth.models import User
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from reviews.models import Review, UserFeedEntry, UserReview
+from reviews.user_feed import build_user_feeds, user_feed
+from .utils import make_review, plain_static
+
+
+def titles(games):
+    return [game.title for game in games]
+
+
+@plain_static
+class UserFeedTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.reader = User.objects.create_user('reader')
+        self.other = User.objects.create_user('other')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.portal = make_review('Portal', 'Valve', 'Valve',
+                                      ['Puzzle', 'Shooter'])
+            make_review('Talos', 'Croteam', 'Devolver', ['Puzzle'])
+            make_review('Half Life', 'Valve', 'Sierra', ['Shooter'])
+            make_review('Forza', 'Turn 10', 'Xbox', ['Racing'])
+            make_review('Portal 3', 'Valve', 'Valve', ['Puzzle'],
+                        is_published=False)
+
+    def test_liked_games_shape_the_feed(self):
+        self.portal.likes.add(self.reader)
+        self.assertEqual(build_user_feeds(), (1, 2))
+        feed = titles(user_feed(self.reader))
+        # Games sharing Portal's features, not Portal itself
+        self.assertEqual(sorted(feed), ['Half Life', 'Talos'])
+        self.assertEqual(user_feed(self.other), [])
+
+    def test_low_rating_counts_against_features(self):
+        UserReview.objects.create(
+            game=self.portal, user=self.reader, rating=1, review_text='No')
+        build_user_feeds()
+        self.assertEqual(user_feed(self.reader), [])
+        # Unapproved ratings count too, as the user's own taste
+        UserReview.objects.filter(user=self.reader).update(rating=10)
+        build_user_feeds()
+        self.assertEqual(len(user_feed(self.reader)), 2)
+
+    def test_rebuilding_some_users(self):
+        self.portal.likes.add(self.reader, self.other)
+        build_user_feeds()
+        self.portal.likes.remove(self.reader)
+        self.assertEqual(build_user_feeds([self.reader.pk]), (0, 0))
+        self.assertFalse(UserFeedEntry.objects.filter(user=self.reader))
+        self.assertEqual(len(user_feed(self.other)), 2)
+
+    def test_unpublished_games_dropped_from_stored_feed(self):
+        self.portal.likes.add(self.reader)
+        build_user_feeds()
+        with self.captureOnCommitCallbacks(execute=True):
+            talos = Review.objects.get(title='Talos')
+            talos.is_published = False
+            talos.save()
+        self.assertEqual(titles(user_feed(self.reader)), ['Half Life'])
+
+    def test_page(self):
+        url = reverse('accounts:for_you')
+        self.assertEqual(self.client.get(url).status_code, 302)
+        self.portal.likes.add(self.reader)
+        build_user_feeds()
+        self.client.force_login(self.reader)
+        response = self.client.get(url)
+        self.assertContains(response, 'Talos')
+        self.assertNotContains(response, 'Forza')
@@ -0,0 +1,39 @@
+import datetime
+from django.test import override_settings
+from developer.models import Developer
+from publisher.models import Publisher
+from reviews.models import Genre, Review
+
+# Pages render with plain static URLs, without collectstatic's manifest
+plain_static = override_settings(STORAGES={
+    'default': {
+        'BACKEND': 'django.core.files.storage.FileSystemStorage',
+    },
+    'staticfiles': {
+        'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage',
+    },
+})
+
+
+def company(model, name):
+    return model.objects.get_or_create(name=name)[0]
+
+
+def make_review(title, developer='Studio', publisher='Label', genres=(),
+                review_score=8, is_published=True, **fields):
+    """A review with companies and genres created by name"""
+    review = Review.objects.create(
+        title=title,
+        slug=title.lower().replace(' ', '-'),
+        developer=company(Developer, developer),
+        publisher=company(Publisher, publisher),
+        description=f'About {title}',
+        release_date=fields.pop('release_date', datetime.date(2020, 1, 1)),
+        review_score=review_score,
+        is_published=is_published,
+        **fields
+    )
+    if genres:
+        review.genres.set(
+            [Genre.objects.get_or_create(name=name)[0] for name in genres])
+    return review
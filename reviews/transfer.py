@@ -0,0 +1,295 @@
+"""
+Moving the catalog between databases as NDJSON.
+
+Each line is one row in the shape of Django's serializers::
+
+    {"model": "reviews.review", "pk": 12, "fields": {...}}
+
+Foreign keys and many-to-many fields hold the pks of the exporting
+database; the importer maps them onto the rows it creates or finds.
+Rows come in ``EXPORT_ORDER`` so every row a line refers to has already
+been read. Users are carried by username only, for comment and review
+authors and reviewers. Likes are not exported.
+
+Both directions stream: the exporter reads with ``iterator()`` and the
+importer writes one ``bulk_create`` per batch, so memory stays flat
+apart from the id maps.
+"""
+import gzip
+import json
+import sys
+from contextlib import nullcontext
+from django.contrib.auth.hashers import make_password
+from django.contrib.auth.models import User
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db.models import Q
+from django.utils.encoding import is_protected_type
+from developer.models import Developer
+from publisher.models import Publisher
+from .models import (
+    Genre, Platform, ReleaseDate, Review, UserComment, UserReview
+)
+
+EXPORT_CHUNK_SIZE = 500
+IMPORT_BATCH_SIZE = 500
+
+EXPORT_ORDER = [
+    User, Genre, Platform, Developer, Publisher, Review,
+    ReleaseDate, UserComment, UserReview,
+]
+
+# Fields exported for each model; all concrete fields when not listed
+EXPORT_FIELDS = {
+    User: ['username'],
+}
+
+EXPORT_M2M = {
+    Review: ['genres', 'platforms', 'developers', 'publishers'],
+}
+
+# An imported row is the existing row that matches it on any of these,
+# and is left as it is
+MATCH_FIELDS = {
+    User: ['username'],
+    Genre: ['name', 'igdb_id'],
+    Platform: ['name', 'slug', 'igdb_id'],
+    Developer: ['name', 'slug', 'igdb_id'],
+    Publisher: ['name', 'slug', 'igdb_id'],
+    Review: ['slug', 'title', 'igdb_id'],
+}
+
+# Rows that belong to a review: imported only with a review the import
+# creates, so importing the same file twice adds nothing
+REVIEW_CHILDREN = {
+    ReleaseDate: 'review',
+    UserComment: 'review',
+    UserReview: 'game',
+}
+
+
+def exported_fields(model):
+    names = EXPORT_FIELDS.get(model)
+    return [
+        field for field in model._meta.concrete_fields
+        if not field.primary_key and (names is None or field.name in names)
+    ]
+
+
+def export_queryset(model):
+    if model is User:
+        return User.objects.filter(
+            Q(review__isnull=False) | Q(user_commenter__isnull=False)
+            | Q(userreview__isnull=False)
+        ).distinct().order_by('pk')
+    queryset = model._default_manager.order_by('pk')
+    if model in EXPORT_M2M:
+        queryset = queryset.prefetch_related(*EXPORT_M2M[model])
+    return queryset
+
+
+def catalog_records(chunk_size=EXPORT_CHUNK_SIZE):
+    """Yield one record dict per exported row, in ``EXPORT_ORDER``"""
+    for model in EXPORT_ORDER:
+        fields = exported_fields(model)
+        m2m = EXPORT_M2M.get(model, [])
+        for row in export_queryset(model).iterator(chunk_size=chunk_size):
+            values = {}
+            for field in fields:
+                value = field.value_from_object(row)
+                if not is_protected_type(value):
+                    value = field.value_to_string(row)
+                values[field.attname] = value
+            for name in m2m:
+                values[name] = [
+                    related.pk for related in getattr(row, name).all()]
+            yield {'model': model._meta.label_lower, 'pk': row.pk,
+                   'fields': values}
+
+
+def export_catalog(stream, chunk_size=EXPORT_CHUNK_SIZE):
+    """Write the catalog to the text ``stream``, returning the number of
+    rows per model"""
+    counts = dict.fromkeys(
+        (model._meta.label_lower for model in EXPORT_ORDER), 0)
+    for record in catalog_records(chunk_size):
+        stream.write(json.dumps(record, cls=DjangoJSONEncoder))
+        stream.write('\n')
+        counts[record['model']] += 1
+    return counts
+
+
+class CatalogImporter:
+    """Create the rows of an exported catalog that this database lacks.
+
+    Records are buffered per model and written with ``bulk_create`` every
+    ``batch_size`` rows. Rows matching an existing one on a
+    ``MATCH_FIELDS`` field are mapped onto it instead, and the rows of
+    reviews that already existed are skipped. ``counts`` holds
+    ``{label: {'created': n, 'existing': n, 'skipped': n}}``.
+    """
+
+    def __init__(self, batch_size=IMPORT_BATCH_SIZE):
+        self.batch_size = batch_size
+        self.models = {model._meta.label_lower: model
+                       for model in EXPORT_ORDER}
+        # Exported pk -> pk here, per model
+        self.ids = {model: {} for model in EXPORT_ORDER}
+        # Exported pks of the reviews this import created
+        self.created_reviews = set()
+        self.counts = {
+            label: {'created': 0, 'existing': 0, 'skipped': 0}
+            for label in self.models
+        }
+        self.model = None
+        self.pending = []
+
+    def run(self, lines):
+        """Import NDJSON ``lines`` and return ``counts``"""
+        for number, line in enumerate(lines, 1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                model = self.models[record['model']]
+            except (ValueError, KeyError) as e:
+                raise ValueError(f'Line {number}: not a catalog record ({e})')
+            self.add(model, record)
+        self.flush()
+        return self.counts
+
+    def add(self, model, record):
+        if model is not self.model or len(self.pending) >= self.batch_size:
+            self.flush()
+            self.model = model
+        self.pending.append(record)
+
+    def flush(self):
+        if self.pending:
+            self.import_batch(self.model, self.pending)
+        self.pending = []
+
+    def import_batch(self, model, records):
+        counts = self.counts[model._meta.label_lower]
+        parent = REVIEW_CHILDREN.get(model)
+        if parent:
+            parent_id = model._meta.get_field(parent).attname
+            kept = [r for r in records
+                    if r['fields'].get(parent_id) in self.created_reviews]
+            counts['skipped'] += len(records) - len(kept)
+            records = kept
+
+        records = self.match_existing(model, records)
+        rows, created = [], []
+        for record in records:
+            row = self.build(model, record)
+            if row is None:
+                counts['skipped'] += 1
+            else:
+                rows.append(row)
+                created.append(record)
+        model._default_manager.bulk_create(rows)
+        counts['created'] += len(rows)
+
+        for record, row in zip(created, rows):
+            self.ids[model][record['pk']] = row.pk
+        if model is Review:
+            self.created_reviews.update(record['pk'] for record in created)
+        self.restore_timestamps(model, created, rows)
+        self.save_m2m(model, created, rows)
+
+    def match_existing(self, model, records):
+        """Map records onto the rows they match here, returning the rest"""
+        fields = MATCH_FIELDS.get(model)
+        if not fields:
+            return records
+        match = Q()
+        for name in fields:
+            values = {r['fields'].get(name) for r in records} - {None, ''}
+            if values:
+                match |= Q(**{f'{name}__in': values})
+        if not match:
+            return records
+        existing = {}
+        for row in model._default_manager.filter(match).values('pk', *fields):
+            for name in fields:
+                if row[name] not in (None, ''):
+                    existing[(name, row[name])] = row['pk']
+
+        new = []
+        for record in records:
+            pk = next((existing[(name, record['fields'].get(name))]
+                       for name in fields
+                       if (name, record['fields'].get(name)) in existing),
+                      None)
+            if pk is None:
+                new.append(record)
+            else:
+                self.ids[model][record['pk']] = pk
+        self.counts[model._meta.label_lower]['existing'] += (
+            len(records) - len(new))
+        return new
+
+    def build(self, model, record):
+        """An unsaved row for ``record`` with its references mapped, or
+        None when a required one can't be"""
+        values = {}
+        for field in exported_fields(model):
+            if field.attname not in record['fields']:
+                continue
+            value = record['fields'][field.attname]
+            if field.is_relation:
+                if value is not None:
+                    value = self.ids[field.related_model].get(value)
+                if value is None and not field.null:
+                    return None
+            elif value is not None:
+                value = field.to_python(value)
+            values[field.attname] = value
+        if model is User:
+            values['password'] = make_password(None)
+        return model(**values)
+
+    def restore_timestamps(self, model, records, rows):
+        """``bulk_create`` stamps auto_now and auto_now_add fields with the
+        current time; put the exported values back"""
+        fields = [
+            field for field in exported_fields(model)
+            if getattr(field, 'auto_now', False)
+            or getattr(field, 'auto_now_add', False)
+        ]
+        if not (fields and rows):
+            return
+        for record, row in zip(records, rows):
+            for field in fields:
+                value = record['fields'].get(field.attname)
+                if value is not None:
+                    setattr(row, field.attname, field.to_python(value))
+        model._default_manager.bulk_update(
+            rows, [field.name for field in fields],
+            batch_size=self.batch_size)
+
+    def save_m2m(self, model, records, rows):
+        for name in EXPORT_M2M.get(model, []):
+            field = model._meta.get_field(name)
+            through = field.remote_field.through
+            source = field.m2m_field_name() + '_id'
+            target = field.m2m_reverse_field_name() + '_id'
+            target_ids = self.ids[field.related_model]
+            links = [
+                through(**{source: row.pk, target: target_ids[pk]})
+                for record, row in zip(records, rows)
+                for pk in record['fields'].get(name, [])
+                if pk in target_ids
+            ]
+            through.objects.bulk_create(
+                links, batch_size=self.batch_size, ignore_conflicts=True)
+
+
+def open_catalog(path, mode, compress=False):
+    """Open an NDJSON catalog file as text, gzipped when ``compress`` is
+    set or the name ends in ``.gz``. ``-`` is stdin or stdout."""
+    if path == '-':
+        return nullcontext(sys.stdin if mode == 'r' else sys.stdout)
+    if compress or path.endswith('.gz'):
+        return gzip.open(path, mode + 't', encoding='utf-8')
+    return open(path, mode, encoding='utf-8')
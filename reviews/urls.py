@@ -2,6 +2,9 @@ from . import views
 from .admin_views import approve_comments, approve_reviews
 from .populate_views import (populate_reviews_interface,
                              create_reviews_from_selection,
+                             populate_jobs,
+                             populate_job_detail,
+                             populate_job_events,
                              auto_generate_interface,
                              auto_generate_reviews_view)
 from django.urls import path
@@ -15,12 +18,27 @@ urlpatterns = [
     path('populate/', populate_reviews_interface, name='populate_interface'),
     path('populate/create/', create_reviews_from_selection,
          name='create_reviews'),
+    path('populate/jobs/', populate_jobs, name='populate_jobs'),
+    path('populate/jobs/<int:job_id>/', populate_job_detail,
+         name='populate_job'),
+    path('populate/jobs/<int:job_id>/events/', populate_job_events,
+         name='populate_job_events'),
     path('auto-generate/', auto_generate_interface, name='auto_generate'),
     path('auto-generate/create/', auto_generate_reviews_view, 
          name='auto_generate_create'),
     path('admin/approve-comments/', approve_comments, name='approve_comments'),
     path('admin/approve-reviews/', approve_reviews, name='approve_reviews'),
+    path('platforms/', views.platform_list, name='platform_list'),
+    path('platforms/<slug:slug>/', views.platform_games,
+         name='platform_games'),
+    path('years/', views.release_year_list, name='release_year_list'),
+    path('years/<int:year>/', views.release_year_games,
+         name='release_year_games'),
     path('<slug:slug>/', views.review_details, name='review_detail'),
+    path('<slug:slug>/mine/', views.review_user_state,
+         name='review_user_state'),
+    path('<slug:slug>/threads/<str:kind>/', views.review_thread,
+         name='review_thread'),
     path('<slug:slug>/edit_comment/<int:comment_id>',
          views.user_comment_edit, name='user_comment_edit'),
     path('<slug:slug>/delete_comment/<int:comment_id>',
@@ -0,0 +1,115 @@
+"""
+The "For You" feed.
+
+A user's taste is a sparse vector over genres, developers and publishers:
+the sum of the feature vectors (see ``reviews.similarity``) of the games
+they liked, plus those they reviewed weighted by their rating, so a low
+rating counts against a game's features. Every published game sharing a
+feature with the taste vector is scored by its dot product with it,
+accumulated feature by feature through the similarity index's inverted
+index. The best ``USER_FEED_SIZE`` games the user hasn't already liked
+or reviewed are stored as :model:`reviews.UserFeedEntry` rows.
+
+``build_user_feeds`` scores every user from one load of the catalog's
+vectors; the feed page reads the stored ranking with one indexed query.
+"""
+import heapq
+from collections import defaultdict
+from itertools import batched
+from django.db import transaction
+from .models import Review, UserFeedEntry, UserReview
+from .similarity import CANDIDATE_FEATURES, SimilarityIndex
+
+USER_FEED_SIZE = 50
+WRITE_BATCH_SIZE = 1000
+
+LIKE_WEIGHT = 1.0
+# Ratings (1-10) above this pull the feed towards a game's features and
+# ratings below push it away
+NEUTRAL_RATING = 5.5
+
+
+def user_preferences(user_ids=None):
+    """``{user_id: {review_id: weight}}`` from likes and user reviews of
+    published games"""
+    likes = Review.likes.through.objects.filter(review__is_published=True)
+    # A user's own rating shows their taste whether or not it has been
+    # approved for display
+    ratings = UserReview.objects.filter(game__is_published=True)
+    if user_ids is not None:
+        likes = likes.filter(user_id__in=user_ids)
+        ratings = ratings.filter(user_id__in=user_ids)
+
+    preferences = defaultdict(dict)
+    for user_id, review_id in likes.values_list('user_id', 'review_id'):
+        preferences[user_id][review_id] = LIKE_WEIGHT
+    for user_id, review_id, rating in ratings.values_list(
+            'user_id', 'game_id', 'rating'):
+        weights = preferences[user_id]
+        weights[review_id] = weights.get(review_id, 0.0) + (
+            (rating - NEUTRAL_RATING) / (10 - NEUTRAL_RATING))
+    return preferences
+
+
+def taste_vector(index, weights):
+    taste = defaultdict(float)
+    for review_id, weight in weights.items():
+        for feature, w in index.vectors.get(review_id, {}).items():
+            if feature[0] in CANDIDATE_FEATURES:
+                taste[feature] += weight * w
+    return taste
+
+
+def rank_games(index, weights, size=USER_FEED_SIZE):
+    """``[(review_id, score)]`` of the best games for one user's
+    ``weights``, best first"""
+    scores = defaultdict(float)
+    for feature, weight in taste_vector(index, weights).items():
+        for pk in index.postings.get(feature, ()):
+            scores[pk] += weight * index.vectors[pk][feature]
+    candidates = (
+        (pk, score) for pk, score in scores.items()
+        if score > 0 and pk not in weights
+    )
+    # Ties go to the newer game
+    return heapq.nlargest(
+        size, candidates, key=lambda item: (item[1], item[0]))
+
+
+def build_user_feeds(user_ids=None, size=USER_FEED_SIZE,
+                     batch_size=WRITE_BATCH_SIZE):
+    """Recompute the feeds of ``user_ids``, or of every user, returning
+    ``(users, entries)`` written. Users with no likes or reviews left get
+    an empty feed."""
+    index = SimilarityIndex.load()
+    preferences = user_preferences(user_ids)
+    entries = 0
+    with transaction.atomic():
+        if user_ids is None:
+            UserFeedEntry.objects.all().delete()
+        else:
+            UserFeedEntry.objects.filter(user_id__in=user_ids).delete()
+        for users in batched(preferences.items(), batch_size):
+            rows = [
+                UserFeedEntry(
+                    user_id=user_id, review_id=pk, score=score, rank=rank)
+                for user_id, weights in users
+                for rank, (pk, score) in enumerate(
+                    rank_games(index, weights, size), 1)
+            ]
+            UserFeedEntry.objects.bulk_create(rows)
+            entries += len(rows)
+    return len(preferences), entries
+
+
+def user_feed(user):
+    """The published games in ``user``'s stored feed, best first"""
+    return [
+        entry.review for entry in UserFeedEntry.objects.filter(
+            user=user, review__is_published=True
+        ).select_related('review').only(
+            'review__slug', 'review__title', 'review__excerpt',
+            'review__review_score', 'review__release_date',
+            'review__featured_image', 'review__image_lqip',
+        ).order_by('rank')
+    ]
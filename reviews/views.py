@@ -1,189 +1,93 @@
 from django.shortcuts import render, get_object_or_404, reverse
 from django.views import generic
 from django.contrib import messages
-from django.http import HttpResponseRedirect
-from django.db.models import Avg, Q
+from django.http import (
+    Http404, HttpResponse, HttpResponseRedirect, JsonResponse
+)
 from django.contrib.auth.decorators import login_required
+from django.core.paginator import Paginator
+from django.utils.decorators import method_decorator
+from django.views.decorators.cache import never_cache
+from config.db_router import primary_reads, read_from_replica
 from publisher.models import Publisher
 from developer.models import Developer
-from .models import Review, UserComment, UserReview
+from .models import Genre, Platform, Review, UserComment, UserReview
 from .forms import UserCommentForm, UserReviewForm
-from .igdb_service import IGDBService
-from datetime import datetime
+from .detail import detail_cache, review_snapshot, threads, user_state
+from .listings import (
+    LISTING_PAGE_SIZE, card_reviews, listing_ids, platform_counts,
+    release_year_counts
+)
+from .user_feed import user_feed
+
+# Sort options on the platform and release year listings
+BROWSE_SORTS = {
+    'released': 'Release Date (Newest)',
+    'az': 'Alphabetical (A-Z)',
+    'za': 'Alphabetical (Z-A)',
+    'newest': 'Date Reviewed (Newest)',
+}
 
 
 # Create your views here.
 
 
-def process_release_dates(release_dates_data):
-    """Process IGDB release dates data to get earliest date per platform"""
-    if not release_dates_data:
-        return []
-
-    # Group release dates by platform, keeping only the earliest date
-    platform_releases = {}
-    for release_date in release_dates_data:
-        if 'date' in release_date:
-            platform_name = "Unknown Platform"
-            if ('platform' in release_date and
-                    'name' in release_date['platform']):
-                platform_name = release_date['platform']['name']
-
-            try:
-                timestamp = release_date['date']
-                date_obj = datetime.fromtimestamp(timestamp)
-                formatted_date = date_obj.strftime('%B %d, %Y')
-
-                # Keep only the earliest date for each platform
-                if (platform_name not in platform_releases or
-                        timestamp <
-                        platform_releases[platform_name]['timestamp']):
-                    platform_releases[platform_name] = {
-                        'platform': platform_name,
-                        'date': formatted_date,
-                        'timestamp': timestamp
-                    }
-            except (ValueError, OSError):
-                continue
-
-    # Sort by timestamp and return list
-    sorted_releases = sorted(
-        platform_releases.values(),
-        key=lambda x: x['timestamp']
-    )
-    return sorted_releases
-
-
+@method_decorator(read_from_replica, name='dispatch')
 class ReviewList(generic.ListView):
     template_name = "reviews/review_list.html"
-    paginate_by = 16
+    context_object_name = 'review_list'
+    paginate_by = LISTING_PAGE_SIZE
 
     def get_queryset(self):
-        # Show all published reviews, optionally filtered by genre and sorted
-        queryset = Review.objects.filter(is_published=True)
+        # Ids of published reviews, optionally in one genre, from the
+        # listing cache; only the current page is loaded from the database
+        genre_id = 0
         genre = self.request.GET.get('genre')
         if genre:
-            queryset = queryset.filter(genres__name__iexact=genre)
-
-        sort = self.request.GET.get('sort')
-        if sort == 'az':
-            queryset = queryset.order_by('title')
-        elif sort == 'za':
-            queryset = queryset.order_by('-title')
-        elif sort == 'newest':
-            queryset = queryset.order_by('-review_date')
-        elif sort == 'oldest':
-            queryset = queryset.order_by('review_date')
-        else:
-            queryset = queryset.order_by('title')  # Default to A-Z sorting
-        return queryset
-
-    def get_context_data(self, **kwargs):
-        context = super().get_context_data(**kwargs)
-        context['featured_reviews'] = Review.objects.filter(
-            is_featured=True, is_published=True
-        )
-        return context
-
-
+            genre_id = Genre.objects.filter(
+                name__iexact=genre
+            ).values_list('pk', flat=True).first() or -1
+        sort = self.request.GET.get('sort') or 'az'
+        if genre_id:
+            return listing_ids('genre', genre_id, sort)
+        return listing_ids('all', 0, sort)
+
+    def paginate_queryset(self, queryset, page_size):
+        paginator, page, object_list, is_paginated = super(
+        ).paginate_queryset(queryset, page_size)
+        page.object_list = card_reviews(object_list)
+        return paginator, page, page.object_list, is_paginated
+
+
+@read_from_replica
 def review_details(request, slug):
     """
     Display an individual :model:`reviews.Review`.
 
+    Everything on the page comes from the cached snapshot built by
+    :func:`reviews.detail.review_snapshot`, so it is the same for every
+    visitor. Anonymous GETs are served the whole rendered page from the
+    cache; a signed-in user's own comments and review are loaded
+    afterwards from :view:`reviews.views.review_user_state`.
+
     **Context**
 
     ``review``
-        An instance of :model:`reviews.Review`.
+        An instance of :model:`reviews.Review`; the page shows its stored
+        ``description_html`` and ``review_html``.
 
     **Template:**
 
     :template:`reviews/review_detail.html`
     """
+    if request.method == "GET" and not request.user.is_authenticated:
+        return anonymous_review_page(request, slug)
+
+    snapshot = review_snapshot(slug)
+    if snapshot is None:
+        raise Http404("No review found")
+    review = snapshot['review']
 
-    queryset = Review.objects.filter(is_published=True)
-    review = get_object_or_404(queryset, slug=slug)
-    user_comments = review.user_comments.all().order_by("-created_on")
-    comment_count = review.user_comments.filter(approved=True).count()
-
-    # Get platforms, release dates, genres, and developers from IGDB
-    # for this game
-    game_platforms = []
-    game_release_dates = []
-    game_genres = []
-    game_developers = []
-    game_publishers = []
-    try:
-        igdb_service = IGDBService()
-        platform_data = igdb_service.get_game_platforms_by_name(review.title)
-        if platform_data and platform_data.get('platforms'):
-            game_platforms = platform_data['platforms']
-        if platform_data and platform_data.get('genres'):
-            game_genres = platform_data['genres']
-        # Map IGDB developers to Django Developer objects
-        if platform_data and platform_data.get('developers'):
-            igdb_developers = platform_data['developers']
-            game_developers = []
-            for dev in igdb_developers:
-                db_dev = Developer.objects.filter(
-                    name__iexact=dev.get('name')
-                ).first()
-                if db_dev:
-                    game_developers.append(db_dev)
-                else:
-                    # fallback: add dict with name/description only
-                    game_developers.append(dev)
-        # Map IGDB publishers to Django Publisher objects
-        if platform_data and platform_data.get('publishers'):
-            igdb_publishers = platform_data['publishers']
-            game_publishers = []
-            for pub in igdb_publishers:
-                db_pub = Publisher.objects.filter(
-                    name__iexact=pub.get('name')
-                ).first()
-                if db_pub:
-                    game_publishers.append(db_pub)
-                else:
-                    # fallback: add dict with name/description only
-                    game_publishers.append(pub)
-        if (platform_data and
-                platform_data.get('game', {}).get('release_dates')):
-            raw_release_dates = platform_data['game']['release_dates']
-            game_release_dates = process_release_dates(raw_release_dates)
-    except Exception as e:
-        # If IGDB fails, we'll just show without platform data
-        print(f"IGDB platform lookup failed: {e}")
-
-    # Get user reviews - show approved ones + current user's unapproved ones
-    if request.user.is_authenticated:
-        user_reviews = review.user_reviews.filter(
-            Q(approved=True) | Q(user=request.user)
-        ).order_by("-created_on")
-    else:
-        user_reviews = review.user_reviews.filter(
-            approved=True
-        ).order_by("-created_on")
-
-    # Count only approved reviews for the public count
-    user_review_count = review.user_reviews.filter(approved=True).count()
-
-    # Calculate average review score - only from approved reviews
-    average_review_score = None
-    if user_review_count > 0:
-        approved_reviews = review.user_reviews.filter(approved=True)
-        average_review_score = approved_reviews.aggregate(
-            Avg('rating')
-        )['rating__avg']
-        # Round to 1 decimal place
-        average_review_score = round(average_review_score, 1)
-
-    # Check if current user has already reviewed this game
-    user_has_reviewed = False
-    if request.user.is_authenticated:
-        user_has_reviewed = UserReview.objects.filter(
-            game=review, user=request.user
-        ).exists()
-
-    # Initialize forms for both GET and POST requests
     user_comment_form = UserCommentForm()
     user_review_form = UserReviewForm()
 
@@ -201,7 +105,9 @@ def review_details(request, slug):
                 )
                 user_comment_form = UserCommentForm()
 
-        elif 'review_submit' in request.POST and not user_has_reviewed:
+        elif 'review_submit' in request.POST and not (
+                UserReview.objects.filter(
+                    game=review, user=request.user).exists()):
             user_review_form = UserReviewForm(data=request.POST)
             if user_review_form.is_valid():
                 user_review = user_review_form.save(commit=False)
@@ -213,31 +119,72 @@ def review_details(request, slug):
                     'Review submitted and awaiting approval'
                 )
                 user_review_form = UserReviewForm()
-                user_has_reviewed = True
 
     return render(
         request,
         "reviews/review_detail.html",
         {
-            "review": review,
-            "user_comments": user_comments,
-            "comment_count": comment_count,
+            **snapshot,
             "user_comment_form": user_comment_form,
-            "user_reviews": user_reviews,
-            "user_review_count": user_review_count,
-            "average_review_score": average_review_score,
             "user_review_form": user_review_form,
-            "user_has_reviewed": user_has_reviewed,
-            "game_platforms": game_platforms,
-            "game_release_dates": game_release_dates,
-            "game_genres": game_genres,
-            "game_developers": game_developers,
-            "game_publishers": game_publishers,
-            "developer_db": Developer.objects.all(),
         },
     )
 
 
+def anonymous_review_page(request, slug):
+    """The detail page as every signed-out visitor sees it, rendered once
+    and then served from the cache"""
+    # Flash messages (e.g. "You have signed out") are for this visitor
+    # only: such a page is rendered for them and never cached
+    cacheable = not len(messages.get_messages(request))
+    content = detail_cache.get('page', slug) if cacheable else None
+    if content is not None:
+        return HttpResponse(content)
+
+    snapshot = review_snapshot(slug)
+    if snapshot is None:
+        raise Http404("No review found")
+    # The page is cached until the next commit clears it, so it is
+    # rendered from the primary like the snapshot
+    with primary_reads():
+        response = render(request, "reviews/review_detail.html", snapshot)
+    if cacheable:
+        detail_cache.set('page', slug, value=response.content)
+    return response
+
+
+@read_from_replica
+def review_thread(request, slug, kind):
+    """
+    One page of approved comments (``kind`` 'comments') or user reviews
+    ('reviews') after ``?cursor=``, for the "Load more" buttons.
+
+    Returns JSON with the rendered ``html`` of the items and the
+    ``next_cursor``, null on the last page.
+    """
+    thread = threads.get(kind)
+    if thread is None:
+        raise Http404("No such thread")
+    review_id = get_object_or_404(
+        Review.objects.filter(is_published=True).only('id'), slug=slug).pk
+    rows, next_cursor = thread.page(review_id, request.GET.get('cursor'))
+    return JsonResponse({
+        'html': thread.render(rows),
+        'next_cursor': next_cursor,
+    })
+
+
+@never_cache
+def review_user_state(request, slug):
+    """The signed-in user's own comments and review on a game, as JSON"""
+    if not request.user.is_authenticated:
+        return JsonResponse(
+            {'user_has_reviewed': False, 'comments': [], 'reviews': []})
+    review_id = get_object_or_404(
+        Review.objects.filter(is_published=True).only('id'), slug=slug).pk
+    return JsonResponse(user_state(review_id, request.user))
+
+
 def user_comment_edit(request, slug, comment_id):
     """
     view to edit user comments
@@ -360,6 +307,61 @@ def user_review_delete(request, slug, review_id):
     )
 
 
+@read_from_replica
+def platform_list(request):
+    """Every platform with published games, and how many"""
+    return render(request, 'reviews/platform_list.html', {
+        'platforms': platform_counts(),
+    })
+
+
+@read_from_replica
+def platform_games(request, slug):
+    """Published games released on one platform, a page at a time"""
+    platform = get_object_or_404(Platform, slug=slug)
+    return render(request, 'reviews/browse_games.html', {
+        'heading': f'{platform.name} Games',
+        **browse_page(request, 'platform', platform.pk),
+    })
+
+
+@read_from_replica
+def release_year_list(request):
+    """Every year published games were first released in, and how many"""
+    return render(request, 'reviews/release_year_list.html', {
+        'years': release_year_counts(),
+    })
+
+
+@read_from_replica
+def release_year_games(request, year):
+    """Published games first released in ``year``, a page at a time"""
+    return render(request, 'reviews/browse_games.html', {
+        'heading': f'Games Released in {year}',
+        **browse_page(request, 'year', year),
+    })
+
+
+def browse_page(request, kind, entity_id):
+    """Template context for one page of a cached browse listing"""
+    sort = request.GET.get('sort')
+    if sort not in BROWSE_SORTS:
+        sort = 'released'
+    paginator = Paginator(
+        listing_ids(kind, entity_id, sort), LISTING_PAGE_SIZE)
+    page_obj = paginator.get_page(request.GET.get('page'))
+    page_obj.object_list = card_reviews(page_obj.object_list)
+    return {
+        'games': page_obj,
+        'page_obj': page_obj,
+        'paginator': paginator,
+        'is_paginated': page_obj.has_other_pages(),
+        'sort': sort,
+        'sorts': BROWSE_SORTS,
+    }
+
+
+@read_from_replica
 def search_games(request):
     """Search for games, publishers, developers and genres"""
     query = request.GET.get('q', '')
@@ -411,3 +413,19 @@ def profile(request):
         'user_comments': user_comments,
     }
     return render(request, 'account/profile.html', context)
+
+
+@login_required
+def for_you(request):
+    """
+    The signed-in user's "For You" games, ranked by
+    :func:`reviews.user_feed.build_user_feeds` from the games they liked
+    and reviewed.
+
+    **Template:**
+
+    :template:`reviews/for_you.html`
+    """
+    return render(request, 'reviews/for_you.html', {
+        'games': user_feed(request.user),
+    })
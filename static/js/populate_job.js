@@ -0,0 +1,93 @@
+// Live progress for a populate job, polled as Server-Sent Events
+
+const OUTCOME_LABELS = {
+    created: 'Created',
+    skipped: 'Skipped',
+    error: 'Error'
+};
+
+const STATUS_LABELS = {
+    pending: 'Pending',
+    running: 'Running',
+    done: 'Done',
+    failed: 'Failed'
+};
+
+/**
+ * Update the counters and progress bar from a progress payload
+ */
+function updateJobProgress(progress) {
+    const processed = progress.created + progress.skipped + progress.errors;
+    document.getElementById('job-status').textContent = STATUS_LABELS[progress.status] || progress.status;
+    document.getElementById('job-processed').textContent = processed;
+    document.getElementById('job-created').textContent = progress.created;
+    document.getElementById('job-skipped').textContent = progress.skipped;
+    document.getElementById('job-errors').textContent = progress.errors;
+
+    const bar = document.getElementById('job-progress-bar');
+    const percent = progress.total ? Math.round(processed / progress.total * 100) : 100;
+    bar.style.width = percent + '%';
+    bar.closest('.progress').setAttribute('aria-valuenow', processed);
+}
+
+/**
+ * Append one result row to the results table
+ */
+function appendJobResult(result) {
+    const row = document.createElement('tr');
+
+    const position = document.createElement('td');
+    position.textContent = result.position + 1;
+
+    const title = document.createElement('td');
+    if (result.review_url) {
+        const link = document.createElement('a');
+        link.href = result.review_url;
+        link.target = '_blank';
+        link.className = 'orange-link';
+        link.textContent = result.title;
+        title.appendChild(link);
+    } else {
+        title.textContent = result.title;
+    }
+
+    const outcome = document.createElement('td');
+    const badge = document.createElement('span');
+    badge.className = 'badge job-outcome-' + result.outcome;
+    badge.textContent = OUTCOME_LABELS[result.outcome] || result.outcome;
+    outcome.appendChild(badge);
+
+    const details = document.createElement('td');
+    const message = document.createElement('span');
+    message.className = 'text-light';
+    message.textContent = result.message || '-';
+    details.appendChild(message);
+
+    row.append(position, title, outcome, details);
+    document.getElementById('job-results').appendChild(row);
+}
+
+document.addEventListener('DOMContentLoaded', function() {
+    const job = document.getElementById('populate-job');
+    if (!job) return;
+
+    const total = parseInt(job.dataset.total, 10);
+    const processed = parseInt(document.getElementById('job-processed').textContent, 10);
+    document.getElementById('job-progress-bar').style.width =
+        (total ? Math.round(processed / total * 100) : 100) + '%';
+
+    if (job.dataset.finished === 'true' || !window.EventSource) return;
+
+    // Rows already rendered by the server are skipped via ?after=
+    const source = new EventSource(job.dataset.eventsUrl + '?after=' + job.dataset.lastResultId);
+    source.addEventListener('result', function(event) {
+        appendJobResult(JSON.parse(event.data));
+    });
+    source.addEventListener('progress', function(event) {
+        updateJobProgress(JSON.parse(event.data));
+    });
+    source.addEventListener('done', function(event) {
+        updateJobProgress(JSON.parse(event.data));
+        source.close();
+    });
+});
@@ -0,0 +1,61 @@
+// Per-user parts of the review detail page.
+//
+// The page itself is the same for every visitor so it can be cached
+// whole. This fetches the signed-in user's own comments and review,
+// approved or awaiting approval, and whether they have reviewed the game.
+
+/**
+ * Put the user's own items into a thread.
+ * 
+ * Items already on the page (approved ones) are replaced by the owner's
+ * version with edit and delete buttons; pending ones are added at the top.
+ * @param {Array} items - {id, html} objects from the user state endpoint
+ * @param {string} prefix - Element id prefix of an item, e.g. "comment-"
+ * @param {string} listId - Id of the thread container
+ * @param {string} emptyMessageId - Id of the "nothing yet" message
+ */
+function placeOwnItems(items, prefix, listId, emptyMessageId) {
+    const list = document.getElementById(listId);
+    // Newest last, so prepending leaves the newest at the top
+    for (const item of [...items].reverse()) {
+        const template = document.createElement("template");
+        template.innerHTML = item.html.trim();
+        const existing = document.getElementById(`${prefix}${item.id}`);
+        if (existing) {
+            existing.replaceWith(template.content);
+        } else {
+            list.prepend(template.content);
+        }
+    }
+    if (items.length) {
+        document.getElementById(emptyMessageId)?.classList.add("d-none");
+    }
+}
+
+/**
+ * Show the "already reviewed" message instead of the review form
+ */
+function showReviewComplete() {
+    document.getElementById("reviewCompleteMessage")?.classList.remove("d-none");
+    document.getElementById("userReviewFormContainer")?.classList.add("d-none");
+}
+
+const userThreads = document.getElementById("userThreads");
+
+if (userThreads && userThreads.dataset.userStateUrl) {
+    fetch(userThreads.dataset.userStateUrl, {
+        credentials: "same-origin",
+        headers: {"Accept": "application/json"},
+    })
+        .then(response => response.ok ? response.json() : null)
+        .then(state => {
+            if (!state) return;
+            placeOwnItems(state.comments, "comment-", "userCommentList", "noCommentsMessage");
+            placeOwnItems(state.reviews, "review-", "userReviewList", "noUserReviewsMessage");
+            // Keep the form open when it is showing errors from an edit
+            if (state.user_has_reviewed && !document.querySelector("#userReviewForm .alert-danger")) {
+                showReviewComplete();
+            }
+        })
+        .catch(error => console.error("Could not load your comments and reviews:", error));
+}
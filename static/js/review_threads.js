@@ -0,0 +1,39 @@
+/**
+ * "Load more" buttons under the comment and user review threads.
+ * 
+ * Each button holds the thread URL and the cursor of the last item shown.
+ * Clicking fetches the next page, appends the items that aren't already
+ * on the page (the user's own items may have been added by
+ * review_detail.js), and moves the button on to the next cursor, or
+ * removes it after the last page.
+ */
+document.addEventListener("click", (e) => {
+    const button = e.target.closest(".btn-load-more");
+    if (!button) return;
+
+    const list = document.getElementById(button.dataset.target);
+    const url = `${button.dataset.url}?cursor=${encodeURIComponent(button.dataset.cursor)}`;
+    button.disabled = true;
+
+    fetch(url, {headers: {"Accept": "application/json"}})
+        .then(response => response.json())
+        .then(page => {
+            const template = document.createElement("template");
+            template.innerHTML = page.html;
+            for (const item of [...template.content.children]) {
+                if (!document.getElementById(item.id)) {
+                    list.append(item);
+                }
+            }
+            if (page.next_cursor) {
+                button.dataset.cursor = page.next_cursor;
+                button.disabled = false;
+            } else {
+                button.remove();
+            }
+        })
+        .catch(error => {
+            console.error("Could not load more:", error);
+            button.disabled = false;
+        });
+});
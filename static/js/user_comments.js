@@ -1,45 +1,42 @@
-const editUserCommentButtons = document.getElementsByClassName("btn-edit-user-comment");
 const userCommentText = document.getElementById("id_body");
 const userCommentForm = document.getElementById("userCommentForm");
 const submitUserCommentButton = document.getElementById("submitUserCommentButton");
 const deleteUserCommentModal = new bootstrap.Modal(document.getElementById("deleteUserCommentModal"));
-const deleteUserCommentButtons = document.getElementsByClassName("btn-delete-user-comment");
 const deleteUserCommentConfirm = document.getElementById("deleteUserCommentConfirm");
 
 /**
-* Initializes edit functionality for the provided edit user comment buttons.
+* Handles clicks on edit and delete user comment buttons.
 * 
-* For each button in the `editUserCommentButtons` collection:
-* - Retrieves the associated comment's ID upon click.
-* - Fetches the content of the corresponding comment.
+* The buttons are added to the page by review_detail.js after it loads,
+* so one listener on the document handles all of them.
+* 
+* Edit:
+* - Retrieves the associated comment's ID.
 * - Populates the `userCommentText` input/textarea with the comment's content for editing.
 * - Updates the submit button's text to "Update".
 * - Sets the form's action attribute to the `edit_comment/{commentId}` endpoint.
-*/
-for (let button of editUserCommentButtons) {
-  button.addEventListener("click", (e) => {
-    let commentId = e.target.getAttribute("comment_id");
-    let commentContent = document.getElementById(`user_comment${commentId}`).innerText;
-    userCommentText.value = commentContent;
-    submitUserCommentButton.innerText = "Update";
-    userCommentForm.setAttribute("action", `edit_comment/${commentId}`);
-  });
-}
-
-/**
-* Initializes deletion functionality for the provided delete user comment buttons.
 * 
-* For each button in the `deleteUserCommentButtons` collection:
-* - Retrieves the associated comment's ID upon click.
+* Delete:
 * - Updates the `deleteUserCommentConfirm` link's href to point to the 
 * deletion endpoint for the specific comment.
 * - Displays a confirmation modal (`deleteUserCommentModal`) to prompt 
 * the user for confirmation before deletion.
 */
-for (let button of deleteUserCommentButtons) {
-  button.addEventListener("click", (e) => {
-    let commentId = e.target.getAttribute("comment_id");
+document.addEventListener("click", (e) => {
+  const editButton = e.target.closest(".btn-edit-user-comment");
+  if (editButton) {
+    let commentId = editButton.dataset.commentId;
+    let commentContent = document.getElementById(`user_comment${commentId}`).innerText;
+    userCommentText.value = commentContent;
+    submitUserCommentButton.innerText = "Update";
+    userCommentForm.setAttribute("action", `edit_comment/${commentId}`);
+    return;
+  }
+
+  const deleteButton = e.target.closest(".btn-delete-user-comment");
+  if (deleteButton) {
+    let commentId = deleteButton.dataset.commentId;
     deleteUserCommentConfirm.href = `delete_comment/${commentId}`;
     deleteUserCommentModal.show();
-  });
-}
+  }
+});